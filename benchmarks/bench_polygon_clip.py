@@ -0,0 +1,122 @@
+# coding:utf-8
+"""
+多边形裁剪耗时对比：原逐点QPointF实现与NumPy向量化实现（单个多边形及批量裁剪）
+
+运行方式（仓库根目录）：
+    python benchmarks/bench_polygon_clip.py [每个多边形的顶点数] [批量裁剪的多边形数]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF, QSize
+
+from common import geometry
+from common.polygon_clip import polygon_clipper
+
+
+IMAGE_SIZE = QSize(1000, 800)
+REPEAT = 5
+
+
+def legacy_clip(points: list[QPointF], image_size: QSize) -> list[QPointF]:
+    """原实现：逐条裁剪边、逐点创建QPointF"""
+
+    def _clean_points(points):
+        cleaned = []
+        eps = 1e-5
+        for p in points:
+            if not (p.x() == p.x() and p.y() == p.y()):
+                continue
+            if not cleaned or (abs(p.x()-cleaned[-1].x()) > eps or abs(p.y()-cleaned[-1].y()) > eps):
+                cleaned.append(p)
+        return cleaned
+
+    w, h = image_size.width(), image_size.height()
+    clip_functions = [
+        lambda p: p.x() >= 0,
+        lambda p1, p2: QPointF(0, p1.y() + (p2.y()-p1.y())*(0 - p1.x())/(p2.x()-p1.x())),
+        lambda p: p.y() >= 0,
+        lambda p1, p2: QPointF(p1.x() + (p2.x()-p1.x())*(0 - p1.y())/(p2.y()-p1.y()), 0),
+        lambda p: p.x() <= w,
+        lambda p1, p2: QPointF(w, p1.y() + (p2.y()-p1.y())*(w - p1.x())/(p2.x()-p1.x())),
+        lambda p: p.y() <= h,
+        lambda p1, p2: QPointF(p1.x() + (p2.x()-p1.x())*(h - p1.y())/(p2.y()-p1.y()), h)
+    ]
+
+    clipped = points.copy()
+    for i in range(0, 8, 2):
+        inside_func, intersect_func = clip_functions[i], clip_functions[i+1]
+        if not clipped:
+            break
+        new_clipped = []
+        for j in range(len(clipped)):
+            curr, prev = clipped[j], clipped[j-1]
+            curr_in, prev_in = inside_func(curr), inside_func(prev)
+            if curr_in:
+                if not prev_in:
+                    try:
+                        new_clipped.append(intersect_func(prev, curr))
+                    except ZeroDivisionError:
+                        pass
+                new_clipped.append(curr)
+            elif prev_in:
+                try:
+                    new_clipped.append(intersect_func(prev, curr))
+                except ZeroDivisionError:
+                    pass
+        clipped = _clean_points(new_clipped)
+    return clipped
+
+
+def build_polygon(point_count: int, seed: int = 0) -> np.ndarray:
+    """中心在图像内、半径超出图像边界的星形多边形，约一半的边需要裁剪"""
+
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * math.pi, point_count, endpoint=False)
+    radius = rng.uniform(300, 700, point_count)
+    center = (rng.uniform(300, 700), rng.uniform(200, 600))
+    return np.column_stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)))
+
+
+def timeit(func) -> float:
+    """REPEAT次中的最短耗时ms"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    point_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    polygon_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    w, h = IMAGE_SIZE.width(), IMAGE_SIZE.height()
+
+    array = build_polygon(point_count)
+    points = geometry.to_qpoints(array)
+
+    print(f"单个多边形：{point_count} 个顶点，图像 {w}x{h}")
+    print(f"{'实现':<16}{'耗时ms':>10}")
+    print(f"{'legacy':<16}{timeit(lambda: legacy_clip(points, IMAGE_SIZE)):>10.2f}")
+    print(f"{'clip_array':<16}{timeit(lambda: polygon_clipper.clip_array(array, w, h)):>10.2f}")
+
+    arrays = [build_polygon(point_count // 100 or 3, seed) for seed in range(polygon_count)]
+    points_list = [geometry.to_qpoints(a) for a in arrays]
+
+    print(f"\n批量裁剪：{polygon_count} 个多边形，每个 {point_count // 100 or 3} 个顶点")
+    print(f"{'实现':<16}{'耗时ms':>10}")
+    print(f"{'legacy':<16}{timeit(lambda: [legacy_clip(p, IMAGE_SIZE) for p in points_list]):>10.2f}")
+    print(f"{'clip_array':<16}{timeit(lambda: [polygon_clipper.clip_array(a, w, h) for a in arrays]):>10.2f}")
+    print(f"{'clip_arrays':<16}{timeit(lambda: polygon_clipper.clip_arrays(arrays, w, h)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# coding:utf-8
+"""
+多边形分割对比：原索引拼接实现（每段分割线扫描所有边）与PolygonSplitter（边的网格索引）
+
+分别统计分割线每一段求交点的耗时、完整分割的耗时，以及分割结果无效（面积之和与原多边形不一致或自相交）、
+拒绝分割的次数；第二组分割线的内部顶点分布更广，相邻顶点之间的线段可能穿出多边形的凹口
+
+运行方式（仓库根目录）：
+    python benchmarks/bench_polygon_split.py [多边形顶点数] [分割次数]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF
+
+from common import geometry
+from common.utils import Utils
+from common.polygon_split import polygon_splitter
+from common.polygon_validity import polygon_validator
+
+
+CUT_VERTICES = 4 # 每条分割线在多边形内部的顶点数
+
+
+def legacy_split(points: list[QPointF], cut: list[QPointF], start: int, end: int):
+    """原DataManager.finish_split：按分割线两端所在边的索引拼接顶点列表"""
+
+    item_data_1 = []
+    item_data_2 = []
+
+    if start > end:
+        item_data_1.extend(points[0:end])
+        item_data_1.extend(cut[::-1])
+        item_data_1.extend(points[start:])
+    elif start == end:
+        item_data_1.extend(points[0:end])
+        if Utils.compare_points_on_line(cut[0], cut[-1], points[end-1], points[end if end < len(points)-1 else 0]) == -1:
+            item_data_1.extend(cut)
+        else:
+            item_data_1.extend(cut[::-1])
+        item_data_1.extend(points[end:])
+    else:
+        item_data_1.extend(points[0:start])
+        item_data_1.extend(cut)
+        item_data_1.extend(points[end:])
+
+    if start > end:
+        item_data_2.extend(cut)
+        item_data_2.extend(points[end:start])
+    elif start == end:
+        item_data_2 = cut
+    else:
+        item_data_2.extend(cut[::-1])
+        item_data_2.extend(points[start:end])
+
+    return item_data_1, item_data_2
+
+
+def build_polygon(point_count: int, seed: int = 0) -> np.ndarray:
+    """花瓣状的凹多边形（轮廓加少量抖动，接近手工标注的轮廓），半径不小于180，中心附近始终在多边形内部"""
+
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * math.pi, point_count, endpoint=False)
+    phase = rng.uniform(0, 2 * math.pi)
+    radius = 300 + 80 * np.sin(5 * angles + phase) + 30 * np.sin(13 * angles) + rng.uniform(-2, 2, point_count)
+    return np.column_stack((500 + radius * np.cos(angles), 500 + radius * np.sin(angles)))
+
+
+def build_cuts(array: np.ndarray, count: int, spread: float, seed: int = 0) -> list[tuple[int, int, np.ndarray]]:
+    """
+    模拟界面上的分割操作：从某条边上的点出发，经过内部的若干顶点（界面只允许在多边形内部点击），
+    最后一段与边界的第一个交点结束
+
+    Returns:
+        [(起点所在边, 终点所在边, 分割线顶点), ...]
+    """
+    rng = np.random.default_rng(seed)
+    cuts = []
+
+    while len(cuts) < count:
+        edge = int(rng.integers(len(array)))
+        start = (array[edge] + array[(edge + 1) % len(array)]) / 2
+
+        # 内部顶点沿“起点→中心”方向单调排列并在垂直方向上随机偏移，分割线不自交
+        direction = (start - 500) / np.hypot(*(start - 500))
+        normal = np.array((-direction[1], direction[0]))
+        along = np.sort(rng.uniform(-spread, spread, CUT_VERTICES))[::-1]
+        inner = 500 + along[:, None] * direction + rng.uniform(-40, 40, (CUT_VERTICES, 1)) * normal
+        if not all(geometry.contains_point(array, x, y) for x, y in inner):
+            continue
+
+        end_edge, end = geometry.first_intersection(array, tuple(inner[-1]), tuple(inner[-1] - direction * 1000))
+        if end is None:
+            continue
+
+        cuts.append((edge, end_edge, np.vstack((start, inner, end))))
+
+    return cuts
+
+
+def timeit(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(array: np.ndarray, cuts: list[tuple[int, int, np.ndarray]]):
+
+    points = geometry.to_qpoints(array)
+    area = abs(polygon_validator.area(array))
+
+    def legacy_lookup():
+        for _, _, cut in cuts:
+            for p1, p2 in zip(cut[:-1], cut[1:]):
+                geometry.first_intersection(array, tuple(p1), tuple(p2))
+
+    def splitter_lookup():
+        for _, _, cut in cuts:
+            for p1, p2 in zip(cut[:-1], cut[1:]):
+                polygon_splitter.first_crossing(array, tuple(p1), tuple(p2))
+
+    legacy_results = []
+    splitter_results = []
+
+    def legacy_all():
+        legacy_results.clear()
+        for start, end, cut in cuts:
+            legacy_results.append(legacy_split(points, geometry.to_qpoints(cut), start + 1, end + 1))
+
+    def splitter_all():
+        splitter_results.clear()
+        for _, _, cut in cuts:
+            splitter_results.append(polygon_splitter.split(array, cut))
+
+    def count_results(results) -> tuple[int, int]:
+        invalid = rejected = 0
+        for pieces in results:
+            if pieces is None:
+                rejected += 1
+                continue
+            pieces = [geometry.to_array(piece) for piece in pieces]
+            total = sum(abs(polygon_validator.area(piece)) for piece in pieces)
+            invalid += abs(total - area) > area * 1e-9 or any(polygon_validator.find_self_intersection(piece) for piece in pieces)
+        return invalid, rejected
+
+    print(f"{'实现':<12}{'求交点ms':>12}{'分割ms':>12}{'结果无效':>10}{'拒绝':>8}")
+    for name, lookup, split_all, results in (("legacy", legacy_lookup, legacy_all, legacy_results),
+                                            ("splitter", splitter_lookup, splitter_all, splitter_results)):
+        lookup_ms, split_ms = timeit(lookup), timeit(split_all)
+        invalid, rejected = count_results(results)
+        print(f"{name:<12}{lookup_ms:>12.2f}{split_ms:>12.2f}{invalid:>10}{rejected:>8}")
+
+
+def main():
+    point_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    split_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    array = build_polygon(point_count)
+    array.flags.writeable = False
+
+    print(f"多边形：{point_count} 个顶点，每条分割线 {CUT_VERTICES + 2} 个顶点")
+    print(f"建立边索引：{timeit(lambda: polygon_splitter.edge_index(array)):.2f} ms")
+
+    for title, spread in (("内部分割线", 120), ("穿出凹口的分割线", 260)):
+        print(f"\n{title}：分割 {split_count} 次")
+        run(array, build_cuts(array, split_count, spread))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# coding:utf-8
+"""
+拖动顶点时保存路径的内存分配对比：deepcopy(DataInfo) 与 DataInfo.snapshot()
+
+运行方式（仓库根目录）：
+    python benchmarks/bench_snapshot.py [标注项数量] [每项顶点数]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF
+
+from common.data_structure import DataInfo, DataItemInfo
+
+
+DRAG_EVENTS = 50
+
+
+def build_data_info(item_count: int, point_count: int) -> DataInfo:
+    items = []
+    for i in range(item_count):
+        points = [QPointF(i + j, i * 2 + j) for j in range(point_count)]
+        items.append(DataItemInfo(str(i), "polygon", "default", points, []))
+    return DataInfo("bench.jpg", items)
+
+
+def measure(data_info: DataInfo, save) -> tuple[float, float, float]:
+    """模拟拖动：每次事件移动一个顶点后执行一次保存，返回(每次新增内存块数, 每次峰值KiB, 每次耗时ms)"""
+
+    item = data_info.items[0]
+
+    # 耗时（不开启tracemalloc，避免其开销干扰计时）
+    start = time.perf_counter()
+    for i in range(DRAG_EVENTS):
+        item.move_point(0, QPointF(i, i))
+        save(data_info)
+    elapsed = time.perf_counter() - start
+
+    # 内存分配
+    kept = [] # 保留每次的结果，模拟缓存/写入线程持有的数据，使新增分配不会被立即回收
+    blocks = 0
+    peak = 0
+
+    for i in range(DRAG_EVENTS):
+        item.move_point(0, QPointF(i, i))
+
+        tracemalloc.start()
+        before = sys.getallocatedblocks()
+
+        kept.append(save(data_info))
+
+        blocks += sys.getallocatedblocks() - before
+        peak += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    del kept
+    return blocks / DRAG_EVENTS, peak / DRAG_EVENTS / 1024, elapsed / DRAG_EVENTS * 1000
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    point_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    data_info = build_data_info(item_count, point_count)
+    data_info.snapshot() # 预热：首次快照需要物化全部标注项
+
+    print(f"标注项 {item_count} 个，每项 {point_count} 个顶点，拖动事件 {DRAG_EVENTS} 次")
+    print(f"{'方式':<12}{'新增内存块/次':>14}{'峰值KiB/次':>14}{'耗时ms/次':>12}")
+
+    for name, save in (("deepcopy", deepcopy), ("snapshot", lambda d: d.snapshot())):
+        blocks, peak_kib, ms = measure(data_info, save)
+        print(f"{name:<12}{blocks:>14.0f}{peak_kib:>14.1f}{ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
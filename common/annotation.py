@@ -1,10 +1,13 @@
 # coding=utf-8
 from enum import Enum
+import math
+import numpy as np
 from PyQt5.QtCore import QPointF, Qt
 from PyQt5.QtGui import QPolygonF,QPainter,QColor,QBrush,QPen
 from abc import ABC, abstractmethod
 from common.utils import Utils
 from common.message import message
+from common import geometry
 class AnnotationType(Enum):
     """ 标注类型枚举 """
     BBOX = "bbox" # 矩形框
@@ -12,6 +15,16 @@ class AnnotationType(Enum):
     LINE = "line" # 线
     POINT = "point" # 点
     DEFAULT = "default" # 默认标注框
+
+    @property
+    def min_points(self) -> int:
+        """标注点的最少数量（不弹出提示，可在后台线程使用）"""
+
+        if self in (AnnotationType.POLYGON, AnnotationType.DEFAULT):
+            return 3
+        if self in (AnnotationType.BBOX, AnnotationType.LINE):
+            return 2
+        return 1
     
     def validate_points(self, length:int) -> bool:
 
@@ -34,14 +47,35 @@ class AnnotationType(Enum):
         
         return True
 
+class BatchKind(Enum):
+    """ 批量绘制时的图形类别，同一标签、同一类别的标注项合并为一次绘制调用 """
+    FILL = "fill" # 填充的闭合图形（多边形、矩形框）
+    STROKE = "stroke" # 折线
+    POINTS = "points" # 只绘制顶点
+
+
 class AnnotationFrameBase(ABC):
 
     annotation_items={}
+
+    BATCH_KIND = BatchKind.FILL
+    CLOSED = True # 是否为闭合图形
+
+    LOD_TOLERANCE_PX = 0.75 # 细节层次简化的容差（屏幕像素）
+    LOD_MIN_VERTEX_SPACING_PX = 6.0 # 顶点在屏幕上的平均间距小于该值时不绘制顶点
+    LOD_BUCKETS_PER_OCTAVE = 2 # 缩放每变化一倍划分的档位数，同一档位内复用简化结果
     
     def __init__(self):
         self._points = []
         self._temp_point = None
 
+        self._polygon_cache_key = None # QPolygonF缓存的键：标注项修订号
+        self._polygon_cache = None
+
+        self._lod_cache_key = None # 简化结果缓存的键：标注项修订号
+        self._lod_cache = {} # {缩放档位: 简化后的QPolygonF}
+        self._perimeter = 0.0 # 图像坐标下的周长，用于估算顶点的屏幕间距
+
     @property
     def points(self) -> list[QPointF]:
         return self._points
@@ -56,22 +90,139 @@ class AnnotationFrameBase(ABC):
     def set_point(self, point: QPointF):
         self._points.append(point)
 
-    @abstractmethod # 绘制标注框
-    def draw(self, painter: QPainter, scale: float, offset: QPointF,color: QColor,
-             func: callable = None,selected: bool = False,item_points: list[QPointF] = None) -> list[QPointF]:
+    def _polygon(self, item_points: np.ndarray = None, cache_key: int = None) -> QPolygonF:
+        """图像坐标下的QPolygonF，item_points为空时使用正在创建的点；cache_key不变时直接复用上一次的结果"""
+
+        if item_points is None:
+            return QPolygonF(self.all_points())
+
+        if cache_key is not None and cache_key == self._polygon_cache_key:
+            return self._polygon_cache
+
+        polygon = geometry.to_qpolygonf(item_points)
+
+        if cache_key is not None:
+            self._polygon_cache_key = cache_key
+            self._polygon_cache = polygon
+
+        return polygon
+
+    @staticmethod
+    def _painter_scale(painter: QPainter) -> float:
+        """painter当前变换的缩放倍数（图像像素 -> 屏幕像素）"""
+        return math.sqrt(abs(painter.transform().determinant())) or 1.0
+
+    def _lod_polygon(self, scale: float, item_points: np.ndarray = None, cache_key: int = None,
+                     selected: bool = False) -> tuple[QPolygonF, bool]:
+        """
+        按当前缩放选择细节层次
+
+        缩小查看时把折线/多边形按屏幕像素容差简化（结果按缩放档位缓存），顶点过密时不绘制顶点；
+        选中项、正在创建的标注框以及放大到无需简化时使用完整细节
+
+        Returns:
+            (绘制用的QPolygonF, 是否绘制顶点)
+        """
+        full = self._polygon(item_points, cache_key)
+
+        if item_points is None or selected or cache_key is None:
+            return full, True
+
+        if cache_key != self._lod_cache_key:
+            self._lod_cache_key = cache_key
+            self._lod_cache = {}
+            self._perimeter = geometry.perimeter(item_points, self.CLOSED)
+
+        count = len(item_points)
+
+        show_vertices = self._perimeter * scale >= self.LOD_MIN_VERTEX_SPACING_PX * count
+
+        bucket = math.floor(math.log2(scale) * self.LOD_BUCKETS_PER_OCTAVE)
+        tolerance = self.LOD_TOLERANCE_PX / 2 ** ((bucket + 1) / self.LOD_BUCKETS_PER_OCTAVE) # 取档位内的最大缩放，保证误差不超过容差
+
+        if tolerance * count < self._perimeter * 0.01: # 放大后简化几乎删不掉点，直接使用完整细节
+            return full, show_vertices
+
+        polygon = self._lod_cache.get(bucket)
+        if polygon is None:
+            simplified = geometry.simplify(item_points, tolerance, self.CLOSED)
+            polygon = full if simplified is item_points else geometry.to_qpolygonf(simplified)
+            self._lod_cache[bucket] = polygon
+
+        return polygon, show_vertices
+
+    def batch_shape(self, scale: float, item_points: np.ndarray, cache_key: int) -> tuple[QPolygonF, bool]:
+        """未选中时在当前缩放下绘制的图形，供draw_batch合并绘制，返回(QPolygonF, 是否绘制顶点)"""
+        return self._lod_polygon(scale, item_points, cache_key)
+
+    @staticmethod
+    def draw_batch(painter: QPainter, kind: BatchKind, style, shapes: list[QPolygonF], vertex_shapes: list[QPolygonF]):
+        """
+        把同一标签、同一类别的多个未选中标注项合并绘制：画笔、画刷只设置一次，所有顶点合并为一次drawPoints
+
+        轮廓仍逐项绘制：把大量子路径合并为一个QPainterPath后描边比逐项drawPolygon慢得多
+
+        Args:
+            kind: 图形类别
+            style: 标签绘制样式（CaseLabel.get_style）
+            shapes: 各标注项的图形
+            vertex_shapes: 需要绘制顶点的标注项的图形
+        """
+        if kind == BatchKind.FILL:
+            painter.setPen(style.pen)
+            painter.setBrush(style.fill_brush)
+            for polygon in shapes:
+                painter.drawPolygon(polygon)
+
+        elif kind == BatchKind.STROKE:
+            painter.setPen(style.pen)
+            painter.setBrush(Qt.NoBrush)
+            for polygon in shapes:
+                painter.drawPolyline(polygon)
+
+        else:
+            vertex_shapes = shapes
+
+        if not vertex_shapes:
+            return
+
+        vertices = QPolygonF()
+        for polygon in vertex_shapes:
+            vertices += polygon
+
+        painter.setPen(style.vertex_pen)
+        painter.drawPoints(vertices)
+
+    @staticmethod
+    def _cosmetic_pen(color: QColor, width: float) -> QPen:
+        """线宽固定为屏幕像素、不随画布缩放变化的画笔"""
+        pen = QPen(color, width)
+        pen.setCosmetic(True)
+        return pen
+
+    def _draw_vertices(self, painter: QPainter, color: QColor, polygon: QPolygonF):
+        """绘制顶点：用圆头的cosmetic画笔一次绘制所有点，半径不随缩放变化"""
+        pen = self._cosmetic_pen(color, 8)
+        pen.setCapStyle(Qt.RoundCap)
+        painter.setPen(pen)
+        painter.drawPoints(polygon)
+
+    @abstractmethod # 绘制标注框（painter已设置图像坐标到屏幕坐标的变换）
+    def draw(self, painter: QPainter, color: QColor, selected: bool = False,
+             item_points: np.ndarray = None, cache_key: int = None):
         pass    
         
-    # 检查点击是否在标注框内
-    def check_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> bool:
+    # 检查点击是否在标注框内（item为DataItemInfo，使用其缓存的包围盒与点击检测图形）
+    def check_click(self, item, clamped_point: QPointF,scale: float) -> bool:
         return False
 
-    def check_edge_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> int:
+    def check_edge_click(self, item, clamped_point: QPointF,scale: float) -> int:
         return -1
 
 
     # 拖动顶点
     def drag_vertex(self, item , vertex_idx: int, clamped_point: QPointF):
-        item.points[vertex_idx] = clamped_point
+        item.move_point(vertex_idx, clamped_point)
     
     # 拖动框
     def drag_frame(self, item, clamped_point: QPointF):
@@ -107,19 +258,9 @@ class PolygonAnnotation(AnnotationFrameBase):
         super().__init__(**kwargs)
         self.annotation_type = annotation_type
     
-    def draw(self, painter: QPainter, scale: float, offset: QPointF, color: QColor, func: callable = None,selected: bool = False,item_points: list[QPointF] = None):
+    def draw(self, painter: QPainter, color: QColor, selected: bool = False, item_points: np.ndarray = None, cache_key: int = None):
             
-            if not item_points:
-
-                points = self.all_points()
-            else:
-                points = item_points
-
-            rotated_points = [func(point) for point in points]
-
-            new_points = [QPointF(point.x() * scale + offset.x(), 
-                            point.y() * scale + offset.y()) 
-                    for point in rotated_points]
+            polygon, show_vertices = self._lod_polygon(self._painter_scale(painter), item_points, cache_key, selected)
             
             transparent_color = QColor(color)
 
@@ -128,40 +269,30 @@ class PolygonAnnotation(AnnotationFrameBase):
             else:
                 transparent_color.setAlpha(20)
             
-            painter.setPen(QPen(color, 2))
+            painter.setPen(self._cosmetic_pen(color, 2))
 
             painter.setBrush(QBrush(transparent_color, Qt.SolidPattern))
-            painter.drawPolygon(QPolygonF(new_points)) # 绘制多边形
+            painter.drawPolygon(polygon) # 绘制多边形
             
-            painter.setBrush(QBrush(color, Qt.SolidPattern))
-            for point in new_points:
-                painter.drawEllipse(point, 3, 3)
+            if show_vertices:
+                self._draw_vertices(painter, color, polygon)
     
-    def check_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> bool:
+    def check_click(self, item, clamped_point: QPointF,scale: float) -> bool:
     
-
-        polyf = QPolygonF(points)
-        if polyf.containsPoint(clamped_point, Qt.WindingFill):
-            return True
-        return False
+        return item.contains(clamped_point)
 
 
-    def check_edge_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> int:
+    def check_edge_click(self, item, clamped_point: QPointF,scale: float) -> int:
     
         threshold = max(4,4/scale)
-        min_dist = float("inf") 
-
-
-        for j in range(len(points)):
-            p1 = points[j]
-            p2 = points[(j + 1) % len(points)]
-            dist = Utils.point_to_line_distance(clamped_point, p1, p2) # 计算点到线的距离
-            if dist < threshold and dist < min_dist:
-                min_dist = dist
-                best_edge_idx = j + 1  # 插入到边的后面
-                
-        if min_dist < threshold:
-            return best_edge_idx
+
+        if not item.in_bounds(clamped_point.x(), clamped_point.y(), threshold):
+            return -1
+
+        edge_idx, dist, _ = geometry.nearest_segment(item.coords, clamped_point.x(), clamped_point.y()) # 一次计算到所有边的距离
+
+        if dist < threshold:
+            return edge_idx + 1  # 插入到边的后面
         
         return -1
     
@@ -169,79 +300,53 @@ class PolygonAnnotation(AnnotationFrameBase):
 @AnnotationFrameBase.register(AnnotationType.LINE)
 class LineAnnotation(AnnotationFrameBase):
 
+    BATCH_KIND = BatchKind.STROKE
+    CLOSED = False
 
     def __init__(self,annotation_type: AnnotationType = AnnotationType.DEFAULT,**kwargs):
         super().__init__(**kwargs)
         self.annotation_type = annotation_type
 
-    def draw(self, painter: QPainter, scale: float, offset: QPointF, color: QColor,func: callable = None,selected: bool = False,item_points: list[QPointF] = None):
-        
-        if not item_points:
-            points = self.all_points()
-        else:
-            points = item_points
-
-
-       
-
-        rotated_points = [func(point) for point in points]
-
-        new_points = [QPointF(point.x() * scale + offset.x(), 
-                        point.y() * scale + offset.y()) 
-                for point in rotated_points]
+    def draw(self, painter: QPainter, color: QColor, selected: bool = False, item_points: np.ndarray = None, cache_key: int = None):
         
+        polygon, show_vertices = self._lod_polygon(self._painter_scale(painter), item_points, cache_key, selected)
 
         transparent_color = QColor(color)
 
         if selected:
             transparent_color.setAlpha(200)
        
-        painter.setPen(QPen(transparent_color, 2))
-
-
-        length = len(new_points)
+        painter.setPen(self._cosmetic_pen(transparent_color, 2))
+        painter.setBrush(Qt.NoBrush)
 
-        for i in range(1, length):
-            painter.drawLine(new_points[i-1], new_points[i]) 
+        painter.drawPolyline(polygon) 
         
-        painter.setBrush(QBrush(color, Qt.SolidPattern))
-        for point in new_points:
-            painter.drawEllipse(point, 3, 3) 
+        if show_vertices:
+            self._draw_vertices(painter, color, polygon)
         
-    def check_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> bool:
+    def check_click(self, item, clamped_point: QPointF,scale: float) -> bool:
         
 
         threshold = max(6,6/scale)
-        min_dist = float("inf") 
-
-
-        for j in range(len(points)):
-            p1 = points[j]
-            p2 = points[(j + 1) % len(points)]
-            dist = Utils.point_to_line_distance(clamped_point, p1, p2) # 计算点到线的距离
-            if dist < threshold and dist < min_dist:
-                min_dist = dist
-               
-        if min_dist < threshold:
-            return True
-        
-        return False
+
+        if not item.in_bounds(clamped_point.x(), clamped_point.y(), threshold):
+            return False
+
+        _, dist, _ = geometry.nearest_segment(item.coords, clamped_point.x(), clamped_point.y()) # 与原逐边计算一致，包含末点到首点的边
+
+        return dist < threshold
     
-    def check_edge_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> int:
+    def check_edge_click(self, item, clamped_point: QPointF,scale: float) -> int:
         
         threshold = max(6,6/scale)
-        min_dist = float("inf") 
-
-        for j in range(len(points)-1):
-            p1 = points[j]
-            p2 = points[j + 1]
-            dist = Utils.point_to_line_distance(clamped_point, p1, p2) # 计算点到线的距离
-            if dist < threshold and dist < min_dist:
-                min_dist = dist
-                best_edge_idx = j + 1  # 插入到边的后面
-                
-        if min_dist < threshold:
-            return best_edge_idx
+
+        if not item.in_bounds(clamped_point.x(), clamped_point.y(), threshold):
+            return -1
+
+        edge_idx, dist, _ = geometry.nearest_segment(item.coords, clamped_point.x(), clamped_point.y(), closed=False)
+
+        if dist < threshold:
+            return edge_idx + 1  # 插入到边的后面
         
         return -1
 
@@ -256,18 +361,9 @@ class BboxAnnotation(AnnotationFrameBase):
         self._start_point = None
         
 
-    def draw(self, painter: QPainter, scale: float, offset: QPointF, color: QColor,func: callable = None,selected: bool = False,item_points: list[QPointF] = None):
+    def draw(self, painter: QPainter, color: QColor, selected: bool = False, item_points: np.ndarray = None, cache_key: int = None):
 
-        if not item_points:
-            points = self.all_points()
-        else:
-            points = item_points
-
-        rotated_points = [func(point) for point in points]
-
-        new_points = [QPointF(point.x() * scale + offset.x(), 
-                        point.y() * scale + offset.y()) 
-                for point in rotated_points]
+        polygon, show_vertices = self._lod_polygon(self._painter_scale(painter), item_points, cache_key, selected)
         
         transparent_color = QColor(color)
 
@@ -276,24 +372,18 @@ class BboxAnnotation(AnnotationFrameBase):
         else:
             transparent_color.setAlpha(20)
         
-        painter.setPen(QPen(color, 2))
+        painter.setPen(self._cosmetic_pen(color, 2))
         
         painter.setBrush(QBrush(transparent_color, Qt.SolidPattern))
-        painter.drawPolygon(QPolygonF(new_points)) 
+        painter.drawPolygon(polygon) 
         
-        painter.setBrush(QBrush(color, Qt.SolidPattern))
-        for point in new_points:
-            painter.drawEllipse(point, 3, 3)
+        if show_vertices:
+            self._draw_vertices(painter, color, polygon)
     
 
-    def check_click(self, points: list[QPointF], clamped_point: QPointF,scale: float) -> bool:
+    def check_click(self, item, clamped_point: QPointF,scale: float) -> bool:
         
-
-        polyf = QPolygonF(points)
-        if polyf.containsPoint(clamped_point, Qt.WindingFill): # 检查点击是否在矩形框内
-            return True
-        
-        return False
+        return item.contains(clamped_point) # 检查点击是否在矩形框内
 
 
     def drag_vertex(self, item , vertex_idx: int, clamped_point: QPointF):
@@ -331,30 +421,19 @@ class BboxAnnotation(AnnotationFrameBase):
 @AnnotationFrameBase.register(AnnotationType.POINT)
 class PointAnnotation(AnnotationFrameBase):
 
+    BATCH_KIND = BatchKind.POINTS
+    CLOSED = False
+
     def __init__(self,annotation_type: AnnotationType = AnnotationType.DEFAULT,**kwargs):
         super().__init__(**kwargs)
         self.annotation_type = annotation_type
             
 
-    def draw(self, painter: QPainter, scale: float, offset: QPointF, color: QColor,func: callable = None,selected: bool = False,item_points: list[QPointF] = None):
-        
-
-        if not item_points:
-                points = self.all_points()
-        else:
-            points = item_points
+    def draw(self, painter: QPainter, color: QColor, selected: bool = False, item_points: np.ndarray = None, cache_key: int = None):
 
+        polygon = self._polygon(item_points, cache_key)
 
-        rotated_points = [func(point) for point in points]
+        self._draw_vertices(painter, color, polygon)
 
-        new_points = [QPointF(point.x() * scale + offset.x(), 
-                        point.y() * scale + offset.y()) 
-                for point in rotated_points]
-        
-
-        painter.setPen(QPen(color, 2))
-        painter.setBrush(QBrush(color, Qt.SolidPattern))
-
-        for point in new_points:
-            painter.drawEllipse(point, 3, 3) 
-    
+    def batch_shape(self, scale: float, item_points: np.ndarray, cache_key: int) -> tuple[QPolygonF, bool]:
+        return self._polygon(item_points, cache_key), True
@@ -0,0 +1,95 @@
+# coding:utf-8
+import threading
+from typing import Callable
+
+from common.data_structure import jsonFileManager
+
+
+class AnnotationPrefetcher:
+    """
+    标注预取：按浏览方向在后台线程提前解析后续图像的标注文件并写入jsonFileManager缓存，
+    切换图像时load_json直接命中缓存，界面线程无需等待JSON解析
+
+    每次切换图像都会重新生成预取队列，尚未开始的旧任务随之作废，正在解析的文件完成后照常写入缓存
+    """
+
+    PREFETCH_AHEAD = 5 # 浏览方向上预取的图像数
+    PREFETCH_BEHIND = 2 # 反方向预取的图像数（回看上一张）
+
+    def __init__(self, json_path: Callable[[str], str]):
+        self._json_path = json_path
+
+        self._queue = [] # 待预取的标注文件路径，按优先级排列
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        self._last_index = -1
+        self._direction = 1 # 1: 向后（D），-1: 向前（A）
+
+        self._thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def direction(self) -> int:
+        return self._direction
+
+    def _targets(self, image_paths: list[str], index: int) -> list[str]:
+        """按优先级排列的预取目标：先浏览方向上的PREFETCH_AHEAD张，再反方向的PREFETCH_BEHIND张"""
+
+        count = len(image_paths)
+        offsets = [self._direction * i for i in range(1, self.PREFETCH_AHEAD + 1)]
+        offsets += [-self._direction * i for i in range(1, self.PREFETCH_BEHIND + 1)]
+
+        targets = []
+        for offset in offsets:
+            position = index + offset
+            if 0 <= position < count:
+                targets.append(self._json_path(image_paths[position]))
+        return targets
+
+    def request(self, image_paths: list[str], index: int):
+        """当前图像切换到index，更新浏览方向并重新安排预取（取消尚未开始的旧任务）"""
+
+        if index < 0 or not image_paths:
+            self.cancel()
+            return
+
+        if self._last_index != -1 and index != self._last_index: # 滑块跳转同样按位置变化判断方向
+            self._direction = 1 if index > self._last_index else -1
+        self._last_index = index
+
+        targets = [path for path in self._targets(image_paths, index) if not jsonFileManager.is_cached(path)]
+
+        with self._cond:
+            self._queue = targets # 直接替换队列，旧请求中尚未开始的任务被丢弃
+            self._cond.notify()
+
+    def cancel(self):
+        """取消所有尚未开始的预取（如切换文件夹）"""
+        with self._cond:
+            self._queue = []
+        self._last_index = -1
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._queue = []
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _worker_loop(self):
+
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+
+                if self._stopped:
+                    return
+
+                json_path = self._queue.pop(0)
+
+            try:
+                jsonFileManager.prefetch(json_path)
+            except Exception as e: # 预取失败不影响正常加载，切换到该图像时由load_json报告错误
+                print(f"标注文件预取失败：{json_path} {e}")
@@ -9,6 +9,26 @@ from QtUniversalToolFrameWork.common.config import qconfig
 
 from common.utils import Utils
 
+class LabelStyle:
+    """ 标签的绘制样式：批量绘制未选中标注项时共用的画笔和画刷 """
+
+    __slots__ = ("color", "pen", "fill_brush", "vertex_pen")
+
+    def __init__(self, color: QColor):
+        self.color = QColor(color)
+
+        self.pen = QPen(self.color, 2) # 轮廓，cosmetic画笔线宽不随缩放变化
+        self.pen.setCosmetic(True)
+
+        fill_color = QColor(self.color)
+        fill_color.setAlpha(20)
+        self.fill_brush = QBrush(fill_color, Qt.SolidPattern)
+
+        self.vertex_pen = QPen(self.color, 8) # 顶点
+        self.vertex_pen.setCosmetic(True)
+        self.vertex_pen.setCapStyle(Qt.RoundCap)
+
+
 class CaseLabel(QObject):
 
 
@@ -39,9 +59,19 @@ class CaseLabel(QObject):
 
         self._label = {} # 标签字典，key为标签值,color为颜色,show为是否选中
 
+        self._revision = 0 # 标签颜色/显示状态的修订号，任何变化都会递增，用于判断绘制缓存是否失效
+
+        self._styles = {} # {标签值: LabelStyle}，颜色变化时清空
+
 
         qconfig.themeColor.valueChanged.connect(lambda: self._set_color("default", themeColor()))
 
+        self.color_label_changed.connect(self._clear_styles)
+
+
+    @property
+    def revision(self) -> int:
+        return self._revision
 
     def get_color(self, label_value: str) -> QColor:
 
@@ -49,6 +79,17 @@ class CaseLabel(QObject):
             return self._label[label_value]["color"]
         return themeColor()
     
+    def get_style(self, label_value: str) -> LabelStyle:
+        """标签的绘制样式（缓存，颜色变化后重建）"""
+
+        style = self._styles.get(label_value)
+        if style is None:
+            style = self._styles[label_value] = LabelStyle(self.get_color(label_value))
+        return style
+
+    def _clear_styles(self, label_value: str = None):
+        self._styles.clear() # 未登记的标签使用主题色，任何颜色变化都可能影响，全部清空
+
     def set_label(self, label_value: str, color: QColor= None, is_show: bool = True):
 
 
@@ -57,6 +98,8 @@ class CaseLabel(QObject):
         
         if label_value == "default":
             self._label[label_value] = {"color": themeColor(), "show": is_show}
+            self._revision += 1
+            self._styles.pop(label_value, None)
             self.add_label_changed.emit(label_value)
             return
         
@@ -64,11 +107,15 @@ class CaseLabel(QObject):
             color = Utils.generate_random_color()
 
         self._label[label_value] = {"color": color, "show": is_show}
+        self._revision += 1
+        self._styles.pop(label_value, None)
         self.add_label_changed.emit(label_value)
 
     def remove_label(self, label_value: str):
         if label_value in self._label.keys():
             del self._label[label_value]
+            self._revision += 1
+            self._styles.pop(label_value, None)
             self.del_label_changed.emit(label_value)
 
     def get_label_name(self, label_value: str):
@@ -95,6 +142,7 @@ class CaseLabel(QObject):
 
             if self._label[caseLabel]["show"] != show:
                 self._label[caseLabel]["show"] = show
+                self._revision += 1
                 self.show_label_changed.emit(caseLabel)
                 self.update_label_changed.emit()
         
@@ -102,6 +150,7 @@ class CaseLabel(QObject):
         if label_value in self._label.keys():
             if self._label[label_value]["color"] != color:
                 self._label[label_value]["color"] = color
+                self._revision += 1
                 self.color_label_changed.emit(label_value)
                 
 cl = CaseLabel()
@@ -2,7 +2,7 @@
 
 from typing import List
 from PyQt5.QtGui import QColor
-from QtUniversalToolFrameWork.common.config import qconfig,ConfigItem,ConfigValidator,ConfigSerializer
+from QtUniversalToolFrameWork.common.config import qconfig,ConfigItem,ConfigValidator,ConfigSerializer,BoolValidator
 from QtUniversalToolFrameWork.common.color import themeColor
 from common.utils import Utils
 
@@ -74,5 +74,14 @@ attrConfigItem = ConfigItem(
         "Attributes", "", [], AttributeListValidator())
 setattr(qconfig, "attrMode", attrConfigItem)
 
+adaptiveQualityConfigItem = ConfigItem(
+        "Canvas", "AdaptiveQuality", True, BoolValidator()) # 平移、缩放、拖动期间降低画布渲染质量
+setattr(qconfig, "adaptiveQuality", adaptiveQualityConfigItem)
 
+canvasMetricsConfigItem = ConfigItem(
+        "Canvas", "ShowMetrics", False, BoolValidator()) # 在画布上显示性能统计并记录每帧数据
+setattr(qconfig, "canvasMetrics", canvasMetricsConfigItem)
 
+autoRepairConfigItem = ConfigItem(
+        "Annotation", "AutoRepair", True, BoolValidator()) # 保存时自动删除重复顶点、折返顶点（自相交只报告，由“检查数据集”修复）
+setattr(qconfig, "autoRepairPolygons", autoRepairConfigItem)
@@ -1,9 +1,10 @@
 # coding: utf-8
 
+import math
 from copy import deepcopy
 import uuid
 from typing import Optional
-from PyQt5.QtCore import pyqtSignal, QObject,QPointF,Qt,QSize
+from PyQt5.QtCore import pyqtSignal, QObject,QPointF,Qt,QSize,QRectF
 from PyQt5.QtGui import QPainter,QColor,QBrush
 from QtUniversalToolFrameWork.common.style_sheet import themeColor
 
@@ -11,18 +12,31 @@ from QtUniversalToolFrameWork.common.style_sheet import themeColor
 from common.data_structure import DataItemInfo
 from common.case_label import cl
 from common.polygon_clip import polygon_clipper
+from common.polygon_validity import polygon_validator, ValidityReport
+from common.polygon_split import polygon_splitter
 from common.key_manager import keyManager
 
 from common.annotation import AnnotationFrameBase,AnnotationType
-from common.utils import Utils
 from common.message import message
+from common import geometry
+from common.spatial_index import SpatialGrid
 
 
 class DataManager(QObject):
     
-    update_data_item = pyqtSignal() # 更新DataItem信号
+    data_changed = pyqtSignal(list, QRectF) # 标注数据修改信号，参数为修改的DataItem id列表、受影响区域（图像坐标，空矩形表示整张图像），需要保存
     
-    select_data_item = pyqtSignal(object) # 选择DataItem信号，参数为DataItemInfo对象
+    selection_changed = pyqtSignal(object) # 选中项改变信号，参数为DataItemInfo对象（未选中时为None）
+
+    overlay_changed = pyqtSignal(QRectF) # 仅显示变化信号（选中高亮、正在创建的标注框、加载图像），参数同data_changed，不需要保存
+
+    items_inserted = pyqtSignal(int, int) # 标注项插入信号，参数为插入的第一行和最后一行（已插入data_items）
+
+    items_removed = pyqtSignal(int, int) # 标注项删除信号，参数为删除的第一行和最后一行（已从data_items移除）
+
+    items_reset = pyqtSignal() # data_items整体替换信号
+
+    drag_finished = pyqtSignal() # 拖动顶点/标注框结束信号，拖动期间的修改在此时统一保存
 
     _INSTANCE = None 
     _INSTANCE_INIT = False 
@@ -45,6 +59,15 @@ class DataManager(QObject):
         self.scale = 1.0    
         self._current_item_index = -1
 
+        self._spatial_index = SpatialGrid() # 当前图像标注项的空间索引（包围盒），用于点击检测
+        self._item_positions = {} # {DataItem: 在data_items中的位置}
+
+        self._layer_revision = 0 # 静态图层（除当前选中项外的所有标注项）的修订号
+
+        self.dragging = False # 是否正在拖动顶点/标注框
+
+        self._validated_coords = {} # {DataItem id: 最近一次检查时的坐标数组}，坐标数组写时复制，对象不变即几何未修改
+
         self.init_vars()
 
     def init_vars(self):
@@ -56,22 +79,85 @@ class DataManager(QObject):
         self.current_point_index = -1  # 当前选中的点索引
         self.split_item_index = -1 # 分割项索引
 
-        self.split_point_index_start = -1 # 分割点索引开始
-        self.split_point_index_end = -1 # 分割点索引结束
-
         self.creating_data_item = False  # 是否正在创建DataItem
         self.creating_split_vertex = False # 是否正在创建分割点
         self.creating_vertex_pressed = False # 是否正在创建顶点
 
         self.annotion_frame = None # 当前正在编辑的AnnotationFrame
 
-        self.update_data_item.emit()
+        self._validated_coords = {}
+        self._rebuild_spatial_index()
+
+        self.items_reset.emit()
+        self.overlay_changed.emit(QRectF())
 
 
     def init_data_items(self):
         self.data_items = self.data_info.items
+        # 加载时的数据作为基准：保存前只检查之后修改过的标注项，已有问题由数据集检查（force）报告
+        self._validated_coords = {item.id: item.origin_coords for item in self.data_items}
+        self._rebuild_spatial_index()
+        self.items_reset.emit()
         self.current_item_index = -1
-        self.update_data_item.emit()
+        self.overlay_changed.emit(QRectF())
+
+    def _rebuild_spatial_index(self):
+        self._invalidate_layer()
+        self._item_positions = {item: i for i, item in enumerate(self.data_items)}
+        self._spatial_index.rebuild((item, item.bounds) for item in self.data_items if item.bounds is not None)
+
+    def _update_spatial_index(self, item: DataItemInfo):
+        """DataItem的点修改后同步更新空间索引"""
+
+        if item is not self.current_data_item: # 当前选中项实时绘制，其余标注项变化时静态图层需要重绘
+            self._invalidate_layer()
+
+        bounds = item.bounds
+        if bounds is None:
+            self._spatial_index.remove(item)
+        else:
+            self._spatial_index.update(item, bounds)
+
+    def _hit_candidates(self, clamped_point: QPointF, radius: float) -> list[tuple[int, DataItemInfo]]:
+        """包围盒（外扩radius）包含点击位置的可见DataItem，按data_items中的顺序排列"""
+        items = self._spatial_index.query_point(clamped_point.x(), clamped_point.y(), radius)
+        candidates = sorted((self._item_positions[item], item) for item in items)
+        return [(i, item) for i, item in candidates if cl.is_show(item.caseLabel)]
+
+    @staticmethod
+    def _region(*bounds: Optional[tuple[float, float, float, float]]) -> QRectF:
+        """多个包围盒(x1, y1, x2, y2)的并集，忽略None，全部为None时返回空矩形（整张图像）"""
+
+        bounds = [b for b in bounds if b is not None]
+        if not bounds:
+            return QRectF()
+
+        x1 = min(b[0] for b in bounds)
+        y1 = min(b[1] for b in bounds)
+        x2 = max(b[2] for b in bounds)
+        y2 = max(b[3] for b in bounds)
+
+        return QRectF(QPointF(x1, y1), QPointF(x2, y2)).adjusted(-0.5, -0.5, 0.5, 0.5) # 外扩半个像素，点标注的包围盒不会成为空矩形
+
+    def _emit_data_changed(self, items: list[DataItemInfo], *bounds: Optional[tuple[float, float, float, float]]):
+        self.data_changed.emit([item.id for item in items], self._region(*bounds))
+
+    def _items_in_rect(self, rect: Optional[QRectF]) -> list[tuple[int, DataItemInfo]]:
+        """包围盒与rect（图像坐标）相交的DataItem，按data_items中的顺序（绘制顺序）排列，rect为空时返回全部"""
+
+        if rect is None:
+            return list(enumerate(self.data_items))
+
+        items = self._spatial_index.query_rect(rect.left(), rect.top(), rect.right(), rect.bottom())
+        return sorted((self._item_positions[item], item) for item in items)
+
+    def _invalidate_layer(self):
+        self._layer_revision += 1
+
+    @property
+    def layer_key(self) -> tuple:
+        """静态图层的缓存键，与上次绘制时不同则需要重绘静态图层"""
+        return self._layer_revision, self._current_item_index, cl.revision
 
     @property
     def current_item_index(self) -> int:
@@ -82,12 +168,16 @@ class DataManager(QObject):
 
         if self._current_item_index == index:
             return
+
+        old_item = self.current_data_item
         
         self._current_item_index = index
+        self._invalidate_layer() # 原选中项回到静态图层，新选中项改为实时绘制
         
-        self.select_data_item.emit(self.current_data_item)
-            
-        self.update_data_item.emit()
+        self.selection_changed.emit(self.current_data_item)
+
+        self.overlay_changed.emit(self._region(old_item.bounds if old_item else None,
+                                               self.current_data_item.bounds if self.current_data_item else None))
 
     
     @property
@@ -103,17 +193,97 @@ class DataManager(QObject):
             return
         
         self.current_data_item.set_attribute_value(attr_name,attr_value)
+        self._emit_data_changed([self.current_data_item], self.current_data_item.bounds)
     
 
+    def validate_items(self, repair: bool = True, force: bool = False,
+                       untangle: bool = False) -> tuple[list[DataItemInfo], list[tuple[DataItemInfo, ValidityReport]]]:
+        """
+        检查加载或上次检查后几何被修改过的标注项（重复顶点、折返、自相交、零面积），保存前调用
+
+        Args:
+            repair: 是否自动修复重复顶点、折返顶点
+            force: 是否检查所有标注项（包括已检查过的）
+            untangle: 修复时是否同时消除自相交；会改变顶点顺序，保存时（如拖动顶点越过边后）只报告不修改
+
+        Returns:
+            (被修复的标注项, 仍有问题的标注项及检查结果)
+        """
+        repaired = []
+        invalid = []
+        old_bounds = []
+
+        for item in self.data_items:
+
+            if not force and self._validated_coords.get(item.id) is item.origin_coords:
+                continue
+
+            report = polygon_validator.check_item(item)
+
+            if not report.is_valid and repair:
+                bounds = item.bounds
+                if polygon_validator.repair_items([item], untangle):
+                    if item is self.current_data_item: # 顶点可能被删除或重新排序
+                        self.current_point_index = -1
+                    repaired.append(item)
+                    old_bounds.append(bounds)
+                    self._update_spatial_index(item)
+                    report = polygon_validator.check_item(item)
+
+            if not report.is_valid:
+                invalid.append((item, report))
+
+            self._validated_coords[item.id] = item.origin_coords
+
+        if repaired:
+            self._emit_data_changed(repaired, *old_bounds, *(item.bounds for item in repaired))
+
+        return repaired, invalid
+
+    def clip_items(self, image_size: QSize) -> tuple[list[DataItemInfo], list[DataItemInfo]]:
+        """
+        把所有标注项裁剪到图像范围内，裁剪后退化（完全在图像外）的标注项被删除
+
+        Returns:
+            (被修改的标注项, 被删除的标注项)
+        """
+        old_bounds = [item.bounds for item in self.data_items]
+        changed, degenerate = polygon_clipper.clip_items(self.data_items, image_size.width(), image_size.height())
+
+        for item in changed:
+            self._update_spatial_index(item)
+
+        if degenerate:
+            self.current_item_index = -1
+            self.current_point_index = -1
+
+            removed = set(degenerate)
+            indexes = [index for index, item in enumerate(self.data_items) if item in removed]
+            for index in reversed(indexes):
+                self._spatial_index.remove(self.data_items.pop(index))
+
+            self._item_positions = {item: i for i, item in enumerate(self.data_items)}
+            self.data_info.touch()
+            self._invalidate_layer()
+
+            for index in reversed(indexes): # 从后往前发出，每次发出时前面的行号仍然有效
+                self.items_removed.emit(index, index)
+
+        if changed or degenerate:
+            self._emit_data_changed(changed + degenerate, *old_bounds)
+
+        return changed, degenerate
+
     def item_label_changed(self,caseLabel: str):
 
         if not self.is_current_item_valid():
             return
         
         self.current_data_item.caseLabel = caseLabel
+        self._invalidate_layer() # 信息卡片可能修改了非当前选中项的标签
 
-        self.update_data_item.emit()
-        self.select_data_item.emit(self.current_data_item)
+        self._emit_data_changed([self.current_data_item]) # 可能影响其他标注项的显示，重绘整个画布
+        self.selection_changed.emit(self.current_data_item)
 
 
     def get_current_item_points(self, index: int) -> list[QPointF]:
@@ -139,9 +309,12 @@ class DataManager(QObject):
 
     def add_item(self, data_item: DataItemInfo):
         self.data_items.append(data_item)
+        self._item_positions[data_item] = len(self.data_items) - 1
+        self._update_spatial_index(data_item)
+        self.items_inserted.emit(len(self.data_items) - 1, len(self.data_items) - 1)
         self.current_item_index = len(self.data_items) - 1
         self.current_point_index = -1
-        self.update_data_item.emit()
+        self._emit_data_changed([data_item], data_item.bounds)
         message.show_success_message("提示", "添加标注框成功！")
 
 
@@ -155,14 +328,20 @@ class DataManager(QObject):
             return
     
         
-        self.data_items.pop(index)
-
-        self.current_item_index = -1
+        self.current_item_index = -1 # 先取消选中，使原选中项的区域在删除前发出
         self.current_point_index = -1
 
+        item = self.data_items.pop(index)
+        self.data_info.touch()
+        self._invalidate_layer()
+
+        self._spatial_index.remove(item)
+        self._item_positions = {item: i for i, item in enumerate(self.data_items)}
+        self.items_removed.emit(index, index)
+
         message.show_info_message("提示", "删除了标注框！")
 
-        self.update_data_item.emit()
+        self._emit_data_changed([item], item.bounds)
 
 
     def delete_current_item(self):
@@ -184,46 +363,133 @@ class DataManager(QObject):
             message.show_error_message("错误", "删除点失败，点数量不符合要求！")
             return 
         
+        old_bounds = item.bounds
         item.remove_point(self.current_point_index)
+        self._update_spatial_index(item)
         self.current_point_index = -1
-        self.update_data_item.emit()
+        self._emit_data_changed([item], old_bounds, item.bounds)
+
+    def begin_drag(self):
+        self.dragging = True
+
+    def end_drag(self):
+        if not self.dragging:
+            return
+        self.dragging = False
+        self.drag_finished.emit()
+
+    def drag_current_vertex(self, clamped_point: QPointF):
+        """拖动当前选中的顶点"""
+        item = self.current_data_item
+        if item is None or self.current_point_index == -1:
+            return
+        old_bounds = item.bounds
+        item.annotation.drag_vertex(item, self.current_point_index, clamped_point)
+        self._update_spatial_index(item)
+        self._emit_data_changed([item], old_bounds, item.bounds)
+
+    def move_current_item(self, points):
+        """整体移动当前选中的DataItem，points为移动后的顶点"""
+        item = self.current_data_item
+        if item is None:
+            return
+        old_bounds = item.bounds
+        item.points = points
+        self._update_spatial_index(item)
+        self._emit_data_changed([item], old_bounds, item.bounds)
     
 
-    def draw(self, painter: QPainter, offset: QPointF,func: callable = None):
+    def draw(self, painter: QPainter, visible_rect: QRectF = None):
+        """绘制所有标注项（painter已设置图像坐标到屏幕坐标的变换），visible_rect为可见区域（图像坐标）"""
+        self.draw_static_layer(painter, visible_rect)
+        self.draw_active_item(painter, visible_rect)
+
+    def draw_static_layer(self, painter: QPainter, visible_rect: QRectF = None) -> tuple[int, int, int]:
+        """绘制除当前选中项外的所有标注项，结果可缓存到离屏图层，layer_key不变时无需重绘
+
+        通过空间索引只绘制与可见区域相交的标注项，放大查看局部时绘制耗时只与屏幕上的标注数量有关
+
+        Returns:
+            (绘制的标注数, 被视口裁剪的标注数, 绘制的顶点数)
+        """
+
+        scale = math.sqrt(abs(painter.transform().determinant())) or 1.0
 
-        for i, item in enumerate(self.data_items): 
+        # 按data_items中的顺序（绘制顺序）把连续的、标签和图形类别相同的标注项合并为一次批量绘制，
+        # 不同标签交错时保持原有的覆盖关系（后面的标注项绘制在上层）
+        run_key, shapes, vertex_shapes = None, [], []
+        drawn = vertices = 0
+
+        def flush():
+            if shapes:
+                label, kind = run_key
+                AnnotationFrameBase.draw_batch(painter, kind, cl.get_style(label), shapes, vertex_shapes)
+
+        items = self._items_in_rect(visible_rect)
+
+        for i, item in items: 
             
-            if not cl.is_show(item.caseLabel):
+            if i == self._current_item_index or not cl.is_show(item.caseLabel):
                 continue
 
-            selected = False
+            annotation = item.annotation
+            shape, show_vertices = annotation.batch_shape(scale, item.coords, item.revision)
 
-            if i == self.current_item_index and not self.creating_data_item and not self.creating_split_vertex:
-                selected=True
-            
-            item.annotation.draw(painter, self.scale, offset,cl.get_color(item.caseLabel),func,selected,item.points)
+            key = (item.caseLabel, annotation.BATCH_KIND)
+            if key != run_key:
+                flush()
+                run_key, shapes, vertex_shapes = key, [], []
+
+            shapes.append(shape)
+            if show_vertices:
+                vertex_shapes.append(shape)
 
+            drawn += 1
+            vertices += len(shape)
 
-    def temp_frame_draw(self, painter: QPainter, offset: QPointF,func: callable = None):
+        flush()
+
+        return drawn, len(self.data_items) - len(items), vertices
+
+    def draw_active_item(self, painter: QPainter, visible_rect: QRectF = None) -> tuple[int, int, int]:
+        """绘制当前选中项（拖动、编辑时每帧实时绘制），返回值同draw_static_layer"""
+
+        item = self.current_data_item
+
+        if item is None or not cl.is_show(item.caseLabel):
+            return 0, 0, 0
+
+        if visible_rect is not None and item.bounds is not None:
+            x1, y1, x2, y2 = item.bounds
+            if x1 > visible_rect.right() or x2 < visible_rect.left() or y1 > visible_rect.bottom() or y2 < visible_rect.top():
+                return 0, 1, 0
+
+        selected = not self.creating_data_item and not self.creating_split_vertex
+
+        item.annotation.draw(painter, cl.get_color(item.caseLabel), selected, item.coords, item.revision)
+
+        return 1, 0, len(item.coords)
+
+
+    def temp_frame_draw(self, painter: QPainter):
 
         if self.creating_data_item:
-            self.annotion_frame.draw(painter, self.scale, offset, themeColor(), func,True)
+            self.annotion_frame.draw(painter, themeColor(), True)
             return
         
         if self.creating_split_vertex:
             label = self.get_current_item_label()
-            self.annotion_frame.draw(painter, self.scale, offset, cl.get_color(label), func,True)
+            self.annotion_frame.draw(painter, cl.get_color(label), True)
             return
 
 
     def check_edge_click(self,clamped_point:QPointF) -> tuple[bool,int,int]:
         """检查是否点击了多边形边"""
-        for i, item in enumerate(self.data_items):
+        threshold = max(6, 6/self.scale)
 
-            if not cl.is_show(item.caseLabel):
-                continue
+        for i, item in self._hit_candidates(clamped_point, threshold):
 
-            best_edge_idx = item.annotation.check_edge_click(item.points,clamped_point,self.scale)
+            best_edge_idx = item.annotation.check_edge_click(item,clamped_point,self.scale)
             if best_edge_idx != -1:
                 return True,i,best_edge_idx
 
@@ -233,16 +499,11 @@ class DataManager(QObject):
         """检查是否点击了多边形顶点"""
         threshold = max(6, 6/self.scale)
 
-        for i, item in enumerate(self.data_items):
-
-            if not cl.is_show(item.caseLabel):
-                continue
+        for i, item in self._hit_candidates(clamped_point, threshold):
 
-            for j, point in enumerate(item.points):
-
-                dist = ((point.x() - clamped_point.x())**2 + (point.y() - clamped_point.y())**2)**0.5 # 计算距离
-                if dist < threshold:
-                    return True,i, j
+            j, dist = geometry.nearest_point_index(item.coords, clamped_point.x(), clamped_point.y()) # 向量化计算所有顶点的距离
+            if dist < threshold:
+                return True,i, j
         
         return False,-1,-1
 
@@ -252,19 +513,17 @@ class DataManager(QObject):
 
         if index != -1:
             item = self.data_items[index]
-            is_click = item.annotation.check_click(item.points, clamped_point,self.scale)
+            is_click = item.annotation.check_click(item, clamped_point,self.scale)
             if is_click:
                 return True,index
             return False,-1
 
 
-        # 从后往前检查，确保后绘制的多边形优先被选中
-        for i, item in enumerate(self.data_items):
-            
-            if not cl.is_show(item.caseLabel):
-                continue
+        threshold = max(6, 6/self.scale)
+
+        for i, item in self._hit_candidates(clamped_point, threshold):
             
-            is_click = item.annotation.check_click(item.points, clamped_point,self.scale)
+            is_click = item.annotation.check_click(item, clamped_point,self.scale)
             if is_click:
                 return True,i
             
@@ -279,27 +538,25 @@ class DataManager(QObject):
         if is_click:
             item = self.data_items[item_idx]
             item.insert_point(best_edge_idx, clamped_point)
+            self._update_spatial_index(item)
             self.current_point_index = best_edge_idx
             self.current_item_index = item_idx
-            self.update_data_item.emit()
+            self._emit_data_changed([item], item.bounds)
 
     def add_create_vertex(self, point: QPointF):
         """添加创建DataItem的顶点"""
         self.annotion_frame.set_point(point)
-        self.update_data_item.emit()
+        self.overlay_changed.emit(QRectF())
 
     def add_split_vertex(self, clamped_point):
 
-        def reset_split_state():
-            self.annotion_frame = AnnotationFrameBase.create(AnnotationType.LINE)
-            self.split_point_index_start = -1
-            self.split_point_index_end = -1
-            self.split_item_index = -1
-
         if self.split_item_index == -1:
  
             is_click,item_idx, _ = self.check_edge_click(clamped_point) # 检查是否点击了多边形的边
-            
+
+            if not is_click:
+                return
+
             item = self.data_items[item_idx]
 
             item_type = item.annotation.annotation_type
@@ -307,42 +564,39 @@ class DataManager(QObject):
             if not (item_type == AnnotationType.POLYGON or item_type == AnnotationType.DEFAULT):
                 return
 
-            if is_click:
-
-                reset_split_state() 
+            _, _, closest_point = geometry.nearest_segment(item.coords, clamped_point.x(), clamped_point.y())
 
-                best_edge_idx,closest_point = Utils.get_closest_point_index_and_edge(self.get_current_item_points(item_idx), clamped_point)
-
-                self.split_point_index_start = best_edge_idx
-                self.split_item_index = item_idx
-                self.current_item_index = item_idx
-                self.annotion_frame.set_point(closest_point)
+            self.annotion_frame = AnnotationFrameBase.create(AnnotationType.LINE)
+            self.split_item_index = item_idx
+            self.current_item_index = item_idx
+            self.annotion_frame.set_point(QPointF(*closest_point))
         
         else:
-            is_click,_ = self.check_frame_click(clamped_point,self.split_item_index)
-
-            if not is_click:
-                best_edge_idx,closest_point = Utils.get_intersection_point(self.get_current_item_points(self.split_item_index), self.annotion_frame.points[-1], clamped_point)
-                if closest_point is None:
-                    message.show_error_message("错误", "未找到与分割线相交的点！")
-                    keyManager.release_all_keys()
-                    return
-                else:
-                    self.split_point_index_end = best_edge_idx
-                    self.annotion_frame.set_point(closest_point)
+            start_point = self.annotion_frame.points[-1]
+            crossing = polygon_splitter.first_crossing(self.data_items[self.split_item_index].coords,
+                                                       (start_point.x(), start_point.y()), (clamped_point.x(), clamped_point.y()))
 
+            if crossing is not None: # 分割线穿出多边形边界，在交点处结束
+                self.annotion_frame.set_point(QPointF(*crossing.point))
                 self.finish_split()
 
-            else:
+            elif self.check_frame_click(clamped_point,self.split_item_index)[0]:
                 self.annotion_frame.set_point(clamped_point)
+
+            else:
+                message.show_error_message("错误", "未找到与分割线相交的点！")
+                keyManager.release_all_keys()
+                return
         
-        self.update_data_item.emit()
+        self.overlay_changed.emit(QRectF())
 
 
     def add_temp_frame_point(self, clamped_point):
         """添加临时多边形顶点"""
+        if self.annotion_frame is None: # 创建/分割已结束
+            return
         self.annotion_frame.set_temp_point(clamped_point) 
-        self.update_data_item.emit()
+        self.overlay_changed.emit(QRectF())
 
 
     def finish_split(self):
@@ -350,76 +604,27 @@ class DataManager(QObject):
         if self.split_item_index == -1:
             return
 
-        points = self.get_current_item_points(self.split_item_index)
-
-        item_data_1 = []
-        item_data_2 = []
-
-        # 分割点在多边形外部
-        if self.split_point_index_start > self.split_point_index_end:
-
-            item_data_1.extend(points[0:self.split_point_index_end])
-            item_data_1.extend(self.annotion_frame.points[::-1])
-            item_data_1.extend(points[self.split_point_index_start:])
-
-        elif self.split_point_index_start == self.split_point_index_end:
-            
-            item_data_1.extend(points[0:self.split_point_index_end])
-
-
-            if Utils.compare_points_on_line(self.annotion_frame.points[0],self.annotion_frame.points[-1],
-                                            points[self.split_point_index_end-1],points[self.split_point_index_end if self.split_point_index_end < len(points)-1 else 0])==-1:
-
-                item_data_1.extend(self.annotion_frame.points)
-            else:
-                item_data_1.extend(self.annotion_frame.points[::-1])
-
-            item_data_1.extend(points[self.split_point_index_end:])
-        else :
-             item_data_1.extend(points[0:self.split_point_index_start])
-             item_data_1.extend(self.annotion_frame.points)
-             item_data_1.extend(points[self.split_point_index_end:])
-
-        
-        # 分割点在多边形内部
-        if self.split_point_index_start > self.split_point_index_end:
-            item_data_2.extend(self.annotion_frame.points)
-            item_data_2.extend(points[self.split_point_index_end:self.split_point_index_start])
-        elif self.split_point_index_start == self.split_point_index_end:
-            item_data_2 = self.annotion_frame.points
-        else:
-            item_data_2.extend(self.annotion_frame.points[::-1])
-            item_data_2.extend(points[self.split_point_index_start:self.split_point_index_end])
-
+        item = self.data_items[self.split_item_index]
+        pieces = polygon_splitter.split(item.coords, self.annotion_frame.points)
 
         self.creating_split_vertex = False
         self.annotion_frame = None 
 
-        if not item_data_1 or not item_data_2:
-            message.show_error_message("错误", "分割点在多边形内部或外部异常！")
-            self.update_data_item.emit()
+        if pieces is None:
+            message.show_error_message("错误", "分割线未穿过多边形内部或分割结果无效！")
+            self.overlay_changed.emit(QRectF())
             return 
 
         self.delete_item(self.split_item_index)
-           
-        new_data_item_1 = DataItemInfo(
-                id=str(uuid.uuid4()),
-                annotation_type=AnnotationType.DEFAULT,
-                caseLabel="default",
-                attributes=[],
-                points=item_data_1
-            )
-            
-        new_data_item_2 = DataItemInfo(
-            id=str(uuid.uuid4()),
-            annotation_type=AnnotationType.DEFAULT,
-            caseLabel="default",
-            attributes=[],
-            points=item_data_2
-        )
 
-        self.add_item(new_data_item_1)
-        self.add_item(new_data_item_2)
+        for points in pieces: # 分割后的标注项继承原标注项的类型、标签和属性
+            self.add_item(DataItemInfo(
+                id=str(uuid.uuid4()),
+                annotation_type=item.annotation_type,
+                caseLabel=item.caseLabel,
+                attributes=deepcopy(item.attributes),
+                points=points
+            ))
 
 
     def finish_create(self,image_size: QSize):
@@ -427,23 +632,24 @@ class DataManager(QObject):
         if not self.annotion_frame:
             return
         
-        points = self.annotion_frame.points
+        points = geometry.to_array(self.annotion_frame.points)
 
         self.creating_data_item = False
 
-        clipped_points = polygon_clipper.clip_polygon_to_image(points, image_size)
-        
+        w, h = image_size.width(), image_size.height()
 
-        if clipped_points is None:
-            return
+        if self.annotion_frame.CLOSED: # 闭合图形按多边形裁剪，折线和点逐点限制到图像内
+            clipped_points = polygon_clipper.clip_array(points, w, h)
+        else:
+            clipped_points = polygon_clipper.clamp_array(points, w, h)
 
         if self.annotion_frame.annotation_type == AnnotationType.BBOX:
-            clipped_points = Utils.get_rectangle_vertices(clipped_points)
-            if not clipped_points:
+            if len(clipped_points) < 2:
                 message.show_error_message("错误", "无法计算矩形顶点！")
-                self.update_data_item.emit()
+                self.overlay_changed.emit(QRectF())
 
                 return
+            clipped_points = geometry.rectangle_vertices(clipped_points)
 
         if not self.annotion_frame.annotation_type.validate_points(len(clipped_points)):
             return
@@ -3,13 +3,19 @@ import os
 import json
 import time
 import threading
+import itertools
 from collections import defaultdict 
-from copy import deepcopy
-from typing import List
-from PyQt5.QtCore import QPointF, QTimer
+from typing import List, Optional
+import numpy as np
+from PyQt5.QtCore import Qt, QPointF, QTimer
+from PyQt5.QtGui import QPolygonF
 
 from common.annotation import AnnotationType,AnnotationFrameBase
 from common.utils import Utils
+from common import geometry
+
+
+_revision_counter = itertools.count(1) # 全局递增的修订号，任何数据修改都会取得一个更大的值
 
 
 class DataItemInfo:
@@ -27,12 +33,22 @@ class DataItemInfo:
         if not self._annotation_type.validate_points(len(points)):
            raise ValueError("点数量不符合要求")
 
-        self._points = points
+        self._coords = geometry.to_array(points) # 标注点存储：只读的 float64 (N,2) 数组，修改时整体替换（写时复制）
+
+        self._revision = next(_revision_counter)
+        self._snapshot = None # 最近一次生成的只读快照（修订号一致时复用）
+        self._views = {} # 按修订号缓存的派生数据：矩形四顶点、QPointF列表等
+        self._views_revision = self._revision
        
     @property
     def id(self) -> str:
         return self._id
 
+    @property
+    def revision(self) -> int:
+        """修订号，数据每次修改后递增"""
+        return self._revision
+
     @property
     def annotation_type(self) -> AnnotationType:
         return self._annotation_type
@@ -45,17 +61,76 @@ class DataItemInfo:
     def attributes(self) -> list[dict[str,str]]:
         return self._attributes
     
+    def _cached_view(self, key : str, factory : callable):
+        """按修订号缓存派生数据，数据修改后自动失效"""
+        if self._views_revision != self._revision:
+            self._views = {}
+            self._views_revision = self._revision
+
+        if key not in self._views:
+            self._views[key] = factory()
+        return self._views[key]
+
     @property
-    def points(self) -> list[QPointF]:
+    def coords(self) -> np.ndarray:
+        """标注点的只读 (N,2) 数组视图，矩形框返回四个顶点，供绘制与点击检测使用"""
 
         if self._annotation_type == AnnotationType.BBOX:
-            return Utils.get_rectangle_points(self._points)
+            return self._cached_view("corners", lambda: geometry.rectangle_corners(self._coords))
+
+        return self._coords
+
+    @property
+    def origin_coords(self) -> np.ndarray:
+        return self._coords
+
+    @property
+    def bounds(self) -> Optional[tuple[float, float, float, float]]:
+        """轴对齐包围盒(x1, y1, x2, y2)，按修订号缓存，无标注点时返回None"""
+
+        def compute():
+            if not len(self._coords):
+                return None
+            (x1, y1), (x2, y2) = self._coords.min(axis=0).tolist(), self._coords.max(axis=0).tolist()
+            return (x1, y1, x2, y2)
+
+        return self._cached_view("bounds", compute)
+
+    def in_bounds(self, x : float, y : float, margin : float = 0.0) -> bool:
+        """点是否在包围盒（外扩margin）内，用于精确点击检测前的快速排除"""
+
+        bounds = self.bounds
+        if bounds is None:
+            return False
 
-        return self._points
+        x1, y1, x2, y2 = bounds
+        return x1 - margin <= x <= x2 + margin and y1 - margin <= y <= y2 + margin
+
+    @property
+    def hit_polygon(self) -> QPolygonF:
+        """点击检测用的QPolygonF（矩形框为四个顶点），按修订号缓存，修改标注点后自动失效"""
+        return self._cached_view("hit_polygon", lambda: geometry.to_qpolygonf(self.coords))
+
+    def contains(self, point : QPointF) -> bool:
+        """点是否在标注框内（非零环绕规则），先用包围盒快速排除"""
+
+        if not self.in_bounds(point.x(), point.y()):
+            return False
+
+        return self.hit_polygon.containsPoint(point, Qt.WindingFill)
+
+    @property
+    def points(self) -> list[QPointF]:
+        """
+        标注点的QPointF列表（矩形框为四个顶点）
+
+        按修订号缓存，多次读取返回同一个列表对象：只读，不要修改列表或其中的QPointF，修改请使用points赋值或insert_point等方法
+        """
+        return self._cached_view("points", lambda: geometry.to_qpoints(self.coords))
     
     @property
     def origin_points(self) -> list[QPointF]:
-        return self._points
+        return self._cached_view("origin_points", lambda: geometry.to_qpoints(self._coords))
     
     @property
     def annotation(self) -> AnnotationFrameBase:
@@ -70,30 +145,52 @@ class DataItemInfo:
     
     @annotation_type.setter
     def annotation_type(self, value : AnnotationType):
-        self._annotation_type = value
+        if self._annotation_type != value:
+            self._annotation_type = value
+            self.touch()
     
     @caseLabel.setter
     def caseLabel(self, value : str):
-        self._caseLabel = value
+        if self._caseLabel != value:
+            self._caseLabel = value
+            self.touch()
         
     @attributes.setter
     def attributes(self, value : list[dict[str,str]]):
         self._attributes = value
+        self.touch()
         
     @points.setter
     def points(self, value : list[QPointF]):
+        """替换全部标注点（QPointF列表或 (N,2) 数组），矩形框传入四个顶点，数量不符时抛出ValueError且不修改原数据"""
+
+        coords = geometry.to_array(value)
         
         if self._annotation_type == AnnotationType.BBOX:
-            self._points =  Utils.get_rectangle_vertices(value)
-            return
-        
-        self._points = value
+            if len(coords) != 4:
+                raise ValueError(f"矩形框需要4个顶点，实际为{len(coords)}个")
+            coords = geometry.rectangle_vertices(coords)
+
+        self._coords = coords
+        self.touch()
+
+    def touch(self):
+        """标记数据已修改"""
+        self._revision = next(_revision_counter)
 
     def insert_point(self, index : int, point : QPointF = QPointF()):
-        self._points.insert(index, point)
+        self._coords = geometry.to_array(np.insert(self._coords, index, (point.x(), point.y()), axis=0))
+        self.touch()
     
     def remove_point(self, index : int):
-        self._points.pop(index)
+        self._coords = geometry.to_array(np.delete(self._coords, index, axis=0))
+        self.touch()
+
+    def move_point(self, index : int, point : QPointF):
+        coords = self._coords.copy()
+        coords[index] = (point.x(), point.y())
+        self._coords = geometry.to_array(coords)
+        self.touch()
 
 
     def is_attribute_exist(self, attr_name : str) -> bool:
@@ -114,11 +211,14 @@ class DataItemInfo:
        
         for attr in self._attributes:
             if attr["attr_name"] == attr_name:
-                attr["attr_value"] = value
+                if attr["attr_value"] != value:
+                    attr["attr_value"] = value
+                    self.touch()
                 return
             
 
         self._attributes.append({"attr_name": attr_name, "attr_value": value})
+        self.touch()
 
     def verify_annotation_type(self, value : str):
         try:
@@ -134,9 +234,21 @@ class DataItemInfo:
             "annotation_type": self._annotation_type.value,
             "caseLabel": self._caseLabel,
             "attributes": self._attributes,
-            "points": [[p.x(),p.y()] for p in self._points]
+            "points": self._coords.tolist()
         }
 
+    def snapshot(self) -> "DataItemSnapshot":
+        """返回只读快照，数据未修改时直接复用上一次的快照"""
+        if self._snapshot is None or self._snapshot.revision != self._revision:
+            self._snapshot = DataItemSnapshot(
+                revision=self._revision,
+                annotation_type=self._annotation_type.value,
+                caseLabel=self._caseLabel,
+                attributes=tuple(tuple(attr.items()) for attr in self._attributes),
+                points=self._coords # 只读数组，快照与标注项直接共享
+            )
+        return self._snapshot
+
 
 
 
@@ -147,9 +259,17 @@ class  DataInfo:
         self._issues = issues
         self._items = items
 
+        self._revision = next(_revision_counter)
+        self._snapshot = None
+
     @property
     def file_name(self) -> str:
         return self._file_name
+
+    @property
+    def revision(self) -> int:
+        """修订号，自身或任一标注项修改后递增"""
+        return max([self._revision] + [item.revision for item in self._items])
     
     @property
     def items(self) -> list[DataItemInfo]:
@@ -165,22 +285,34 @@ class  DataInfo:
     
     @label.setter
     def label(self, value : str):
-        self._label = value
+        if self._label != value:
+            self._label = value
+            self.touch()
     
     @issues.setter
     def issues(self, value : list[str]):
-        self._issues = value
+        if self._issues != value:
+            self._issues = value
+            self.touch()
 
     @file_name.setter
     def file_name(self, value : str):
-        self._file_name = value
+        if self._file_name != value:
+            self._file_name = value
+            self.touch()
+
+    def touch(self):
+        """标记数据已修改（如直接增删了items列表中的元素）"""
+        self._revision = next(_revision_counter)
 
     def add_items(self, item: DataItemInfo):
         self._items.append(item)
+        self.touch()
     
     def remove_item(self, index: int):
         if 0 <= index < len(self._items):
             del self._items[index]
+            self.touch()
     
     @property
     def all_items_points(self) -> list[QPointF]:
@@ -198,9 +330,151 @@ class  DataInfo:
             "items": [item.to_dict() for item in self.items],
         }
 
+    def snapshot(self) -> "DataInfoSnapshot":
+        """返回只读快照，只有修改过的标注项会重新生成，其余标注项共享上一次的快照"""
+        revision = self.revision
+
+        if self._snapshot is None or self._snapshot.revision != revision:
+            self._snapshot = DataInfoSnapshot(
+                revision=revision,
+                file_name=self._file_name,
+                label=self._label,
+                issues=tuple(self._issues),
+                items=tuple(item.snapshot() for item in self._items)
+            )
+        return self._snapshot
+
+
+class DataItemSnapshot:
+    """ DataItemInfo的不可变快照，可在缓存与写入线程之间共享而无需深拷贝 """
+
+    __slots__ = ("revision", "annotation_type", "caseLabel", "attributes", "points", "_size")
+
+    def __init__(self, revision : int, annotation_type : str, caseLabel : str, attributes : tuple, points : tuple):
+        self.revision = revision
+        self.annotation_type = annotation_type
+        self.caseLabel = caseLabel
+        self.attributes = attributes # ((键, 值), ...) 元组
+        self.points = points # 只读的 (N,2) 数组
+        self._size = None
+
+    @classmethod
+    def from_dict(cls, item_dict : dict) -> "DataItemSnapshot":
+
+        attributes = item_dict.get("attributes", [])
+        if type(attributes) != list:
+            attributes = []
+
+        return cls(
+            revision=next(_revision_counter),
+            annotation_type=item_dict.get("annotation_type", "default"),
+            caseLabel=item_dict.get("caseLabel", "default"),
+            attributes=tuple(tuple(attr.items()) for attr in attributes if isinstance(attr, dict)),
+            points=geometry.to_array([(float(p[0]), float(p[1])) for p in item_dict.get("points", [])])
+        )
+
+    @property
+    def size(self) -> int:
+        """序列化后的大致字节数（惰性计算并缓存）"""
+        if self._size is None:
+            self._size = len(json.dumps(self.to_dict()))
+        return self._size
+
+    def to_dict(self):
+        return {
+            "annotation_type": self.annotation_type,
+            "caseLabel": self.caseLabel,
+            "attributes": [dict(attr) for attr in self.attributes],
+            "points": self.points.tolist()
+        }
+
+    def replace(self, points : np.ndarray) -> "DataItemSnapshot":
+        """返回标注点替换后的新快照（取新的修订号），不经过DataItemInfo，可在后台线程使用"""
+        return DataItemSnapshot(
+            revision=next(_revision_counter),
+            annotation_type=self.annotation_type,
+            caseLabel=self.caseLabel,
+            attributes=self.attributes,
+            points=geometry.to_array(points)
+        )
+
+    def thaw(self, id : str) -> DataItemInfo:
+        """还原为可编辑的DataItemInfo，修订号与快照保持一致"""
+        item = DataItemInfo(
+            id=id,
+            annotation_type=self.annotation_type,
+            caseLabel=self.caseLabel,
+            attributes=[dict(attr) for attr in self.attributes],
+            points=self.points
+        )
+        item._revision = self.revision
+        item._snapshot = self
+        return item
+
+
+class DataInfoSnapshot:
+    """ DataInfo的不可变快照，标注项快照在多次快照之间结构共享 """
+
+    __slots__ = ("revision", "file_name", "label", "issues", "items")
+
+    def __init__(self, revision : int, file_name : str, label : str, issues : tuple, items : tuple):
+        self.revision = revision
+        self.file_name = file_name
+        self.label = label
+        self.issues = issues
+        self.items = items
+
+    @classmethod
+    def from_dict(cls, data : dict) -> "DataInfoSnapshot":
+
+        items = tuple(DataItemSnapshot.from_dict(item_dict) for item_dict in data.get("items", []))
+
+        return cls(
+            revision=next(_revision_counter), # 晚于所有标注项取号，保证为最大修订号
+            file_name=data.get("file_name", ""),
+            label=data.get("label", "default"),
+            issues=tuple(data.get("issues", [])),
+            items=items
+        )
+
+    @property
+    def size(self) -> int:
+        return sum(item.size for item in self.items)
+
+    def to_dict(self):
+        return {
+            "file_name": self.file_name,
+            "label": self.label,
+            "issues": list(self.issues),
+            "items": [item.to_dict() for item in self.items],
+        }
+
+    def replace(self, items : tuple) -> "DataInfoSnapshot":
+        """返回标注项替换后的新快照（晚于所有标注项取号）"""
+        return DataInfoSnapshot(
+            revision=next(_revision_counter),
+            file_name=self.file_name,
+            label=self.label,
+            issues=self.issues,
+            items=tuple(items)
+        )
+
+    def thaw(self) -> DataInfo:
+        """还原为可编辑的DataInfo，修订号与快照保持一致"""
+        data_info = DataInfo(
+            file_name=self.file_name,
+            label=self.label,
+            issues=list(self.issues),
+            items=[item.thaw(str(id)) for id, item in enumerate(self.items)]
+        )
+        data_info._revision = self.revision
+        data_info._snapshot = self
+        return data_info
+
 class JsonFileManager:
 
-    DELAY_WRITE_MS = 500 # 写入延迟_ms（避免频繁写入）
+    DELAY_WRITE_MS = 500 # 写入防抖窗口_ms（窗口内的重复保存合并为一次写入）
+    MAX_WRITE_LATENCY_MS = 2000 # 最大写入延迟_ms（持续修改时也保证按时落盘）
     MAX_RETRY = 5   # 最大重试次数
     RETRY_INTERVAL = 0.01
 
@@ -226,26 +500,49 @@ class JsonFileManager:
         self._INSTANCE_INIT = True
         
         self._json_cache = defaultdict(lambda: ({}, 0.0, 0.0)) 
-        self._write_timers = {} # 写入定时器: {文件路径: 定时器对象}
 
         self._write_locks = defaultdict(threading.Lock)   # 写入锁: {文件路径: 互斥锁}
         self._cache_lock = threading.Lock() # 缓存锁: 保护缓存数据结构的并发访问
 
+        self._synced_revisions = {} # 已同步的修订号: {文件路径: 已交给写入线程或从磁盘读取的修订号}
+        self._written_revisions = {} # 已落盘的修订号: {文件路径: 修订号}，较旧的快照不会覆盖较新的文件
+
+        self._dirty_paths = {} # 待写入文件: {文件路径: (数据, 首次修改时间, 最后修改时间)}
+        self._write_cond = threading.Condition() # 写入条件变量: 保护待写入表并唤醒写入线程
+        self._writer_stopped = False
+
+        self._metrics = {
+            "queued_paths": 0,       # 当前等待写入的文件数
+            "save_requests": 0,      # 保存请求总数
+            "coalesced_writes": 0,   # 被合并掉的保存请求数
+            "writes": 0,             # 实际写盘次数
+            "last_write_latency_ms": 0.0, # 最近一次写入延迟（首次修改到落盘）
+            "max_write_latency_ms": 0.0,
+            "avg_write_latency_ms": 0.0,
+        }
+
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
         self._cleanup_thread = threading.Thread(target=self._cache_cleanup_loop, daemon=True)
         self._cleanup_thread.start()
 
-    def _atomic_save_json(self, json_path : str, data_info : DataInfo): # 原子写入JSON（内部方法，加锁+临时文件替换）
+    def _atomic_save_json(self, json_path : str, data_info : DataInfoSnapshot): # 原子写入JSON（内部方法，加锁+临时文件替换）
         
         lock = self._write_locks[json_path] 
 
         lock.acquire() 
         try:
+            if self._written_revisions.get(json_path, 0) > data_info.revision: # 写入线程取出的旧快照晚于同步写入执行
+                return
+
             temp_json_path = f"{json_path}.tmp"
 
             with open(temp_json_path, 'w', encoding='utf-8') as f:
                 json.dump(data_info.to_dict(), f, ensure_ascii=False, indent=4) 
 
             os.replace(temp_json_path, json_path)
+            self._written_revisions[json_path] = data_info.revision
         finally:
             lock.release()
 
@@ -267,9 +564,9 @@ class JsonFileManager:
                 time.sleep(self.RETRY_INTERVAL)
         return {} 
 
-    def _get_data_size(self, data_info : DataInfo):
+    def _get_data_size(self, snapshot : DataInfoSnapshot):
 
-        return len(json.dumps(data_info.to_dict()))
+        return snapshot.size # 各标注项的大小随快照缓存，只有修改过的标注项需要重新计算
 
     def _cache_cleanup(self): # 缓存清理（内部方法，加锁）
         with self._cache_lock:
@@ -290,14 +587,10 @@ class JsonFileManager:
             else:
                 overflow_paths = []
 
-            # 执行清理
+            # 执行清理（待写入的数据由写入线程持有，不受缓存清理影响）
             for path in expired_paths + overflow_paths:
                 del self._json_cache[path]
-
-                # 同时清理无效的定时器（如果有）
-                if path in self._write_timers:
-                    self._write_timers[path].cancel()
-                    del self._write_timers[path]
+                self._synced_revisions.pop(path, None)
 
             if expired_paths or overflow_paths:
                 print(f"清理缓存：过期{len(expired_paths)}个，超量{len(overflow_paths)}个，剩余{len(self._json_cache)}个")
@@ -306,26 +599,132 @@ class JsonFileManager:
         while True:
             time.sleep(60) 
             self._cache_cleanup()
+
+    def _queue_write(self, json_path : str, snapshot : DataInfoSnapshot): # 加入待写入表，同一路径的多次保存合并为一次写入
+
+        with self._write_cond:
+            now = time.time()
+
+            self._metrics["save_requests"] += 1
+
+            if json_path in self._dirty_paths:
+                _, first_dirty, _ = self._dirty_paths[json_path]
+                self._metrics["coalesced_writes"] += 1
+            else:
+                first_dirty = now
+
+            self._dirty_paths[json_path] = (snapshot, first_dirty, now)
+            self._metrics["queued_paths"] = len(self._dirty_paths)
+            self._write_cond.notify()
+
+    def _due_paths(self, now : float) -> tuple[list[str], Optional[float]]: # 计算已到期的路径及下次唤醒的等待时间（需持有写入锁）
+
+        delay = self.DELAY_WRITE_MS / 1000
+        max_latency = self.MAX_WRITE_LATENCY_MS / 1000
+
+        due = []
+        timeout = None
+
+        for path, (_, first_dirty, last_dirty) in self._dirty_paths.items():
+            deadline = min(last_dirty + delay, first_dirty + max_latency)
+            if deadline <= now:
+                due.append(path)
+            elif timeout is None or deadline - now < timeout:
+                timeout = deadline - now
+
+        return due, timeout
+
+    def _writer_loop(self): # 写入线程：等待防抖窗口或最大延迟到期后批量落盘
+
+        while True:
+            with self._write_cond:
+                while True:
+                    if self._writer_stopped:
+                        return
+
+                    due, timeout = self._due_paths(time.time())
+                    if due:
+                        break
+
+                    self._write_cond.wait(timeout)
+
+                batch = [(path, self._dirty_paths.pop(path)) for path in due]
+                self._metrics["queued_paths"] = len(self._dirty_paths)
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch : list): 
+
+        for path, (snapshot, first_dirty, _) in batch:
+            try:
+                self._atomic_save_json(path, snapshot)
+            except Exception as e:
+                print(f"写入标注文件失败：{path} {e}")
+                continue
+
+            latency_ms = (time.time() - first_dirty) * 1000
+
+            with self._write_cond:
+                m = self._metrics
+                m["writes"] += 1
+                m["last_write_latency_ms"] = latency_ms
+                m["max_write_latency_ms"] = max(m["max_write_latency_ms"], latency_ms)
+                m["avg_write_latency_ms"] += (latency_ms - m["avg_write_latency_ms"]) / m["writes"]
+
+    def get_metrics(self) -> dict:
+        """返回写入线程的统计信息：等待写入文件数、合并写入次数、写入延迟等"""
+        with self._write_cond:
+            return dict(self._metrics)
+
+    def flush(self): # 立即写入所有待写入的文件
+        
+        with self._write_cond:
+            batch = list(self._dirty_paths.items())
+            self._dirty_paths.clear()
+            self._metrics["queued_paths"] = 0
+
+        self._write_batch(batch)
             
+    def is_modified(self, json_path : str, data_info : DataInfo) -> bool:
+        """数据自上次保存（或加载）后是否被修改"""
+        with self._cache_lock:
+            return self._synced_revisions.get(json_path) != data_info.revision
+
     def save_json(self, json_path : str, data_info : DataInfo): 
 
         with self._cache_lock:
-            
 
-            if self._get_data_size(data_info) > self.MAX_CACHE_SIZE_BYTES:
+            if self._synced_revisions.get(json_path) == data_info.revision: # 未修改，跳过保存
+                return
+
+        self.save_snapshot(json_path, data_info.snapshot()) # 只读快照，未修改的标注项与上一次快照共享
+
+    def save_snapshot(self, json_path : str, snapshot : DataInfoSnapshot):
+        """保存只读快照（后台批量修复直接修改快照，无需还原为DataInfo）"""
+
+        with self._cache_lock:
+
+            revision = snapshot.revision
 
-                self._atomic_save_json(json_path, data_info)
+            if self._synced_revisions.get(json_path) == revision:
                 return
 
+            if self._get_data_size(snapshot) > self.MAX_CACHE_SIZE_BYTES:
 
-            self._json_cache[json_path] = (deepcopy(data_info), time.time(), time.time()) # 更新缓存：(数据副本, 修改时间, 最后访问时间)
-           
-            if json_path in self._write_timers: 
-                self._write_timers[json_path].cancel() 
+                # 过大的文件不缓存、同步写入：丢弃待写入的旧数据和缓存中的旧快照，之后的读取直接读磁盘
+                with self._write_cond:
+                    if self._dirty_paths.pop(json_path, None) is not None:
+                        self._metrics["queued_paths"] = len(self._dirty_paths)
+                self._json_cache.pop(json_path, None)
 
-            timer = threading.Timer(self.DELAY_WRITE_MS / 1000, self._atomic_save_json, args=(json_path, data_info)) # 设置写入定时器
-            self._write_timers[json_path] = timer
-            timer.start()
+                self._atomic_save_json(json_path, snapshot)
+                self._synced_revisions[json_path] = revision
+                return
+
+            self._json_cache[json_path] = (snapshot, time.time(), time.time()) # 更新缓存：(数据快照, 修改时间, 最后访问时间)
+            self._synced_revisions[json_path] = revision
+
+        self._queue_write(json_path, snapshot)
         
     def load_json(self, json_path : str):
         
@@ -333,68 +732,77 @@ class JsonFileManager:
 
             if json_path in self._json_cache:
 
-                data_info, modify_time, _ = self._json_cache[json_path]
+                snapshot, modify_time, _ = self._json_cache[json_path]
                 # 更新最后访问时间
 
-                self._json_cache[json_path] = (data_info, modify_time, time.time())
+                self._json_cache[json_path] = (snapshot, modify_time, time.time())
 
-                return deepcopy(data_info) 
+                return snapshot.thaw() 
         
 
         data = self._safe_load_json(json_path) # 安全加载JSON
 
         
-        data_info = self._load_data_info(data)
+        snapshot = DataInfoSnapshot.from_dict(data)
 
 
         with self._cache_lock:
-            self._json_cache[json_path] = (deepcopy(data_info), time.time(), time.time())
+            self._json_cache[json_path] = (snapshot, time.time(), time.time())
+            self._synced_revisions[json_path] = snapshot.revision
 
-        return data_info
+        return snapshot.thaw()
 
 
-    def exit_handler(self):
+    def is_cached(self, json_path : str) -> bool:
         with self._cache_lock:
-            for path, timer in self._write_timers.items():
-                if timer.is_alive():
-                    timer.cancel()
-            self._write_timers.clear()
-            for path, (data, _, _) in self._json_cache.items():
-                if data:
-                    self._atomic_save_json(path, data)
-            self._json_cache.clear()
+            return json_path in self._json_cache
 
-    def _load_data_info(self, data) -> DataInfo:
+    def prefetch(self, json_path : str) -> bool:
+        """预先解析标注文件并写入缓存，之后的load_json直接命中缓存，可在任意线程调用
 
-        items: List[DataItemInfo] = []
+        Returns:
+            是否新写入了缓存（已缓存、文件过大或解析期间已被加载时返回False）
+        """
 
-        id = 0
+        if self.is_cached(json_path):
+            return False
 
-        for item_dict in data.get("items", []):
-            
-            points = [QPointF(float(p[0]), float(p[1])) for p in item_dict.get("points", [])]
+        snapshot = DataInfoSnapshot.from_dict(self._safe_load_json(json_path))
 
-    
-            data_item = DataItemInfo(
-                id=str(id),
-                annotation_type=item_dict.get("annotation_type", "default"),
-                caseLabel=item_dict.get("caseLabel", "default"),
-                attributes=item_dict.get("attributes", []),
-                points=points
-            )
+        if self._get_data_size(snapshot) > self.MAX_CACHE_SIZE_BYTES: # 与save_json一致，过大的文件不缓存
+            return False
 
-            items.append(data_item)
-            
-            id += 1
+        with self._cache_lock:
+            if json_path in self._json_cache: # 解析期间已被界面线程加载或保存，以缓存中的数据为准
+                return False
+
+            self._json_cache[json_path] = (snapshot, time.time(), time.time())
+            self._synced_revisions[json_path] = snapshot.revision
+
+        return True
+
+    def peek_snapshot(self, json_path : str) -> DataInfoSnapshot:
+        """读取只读快照（优先使用缓存中尚未落盘的数据），不写入缓存，可在任意线程调用"""
+
+        with self._cache_lock:
+            if json_path in self._json_cache:
+                return self._json_cache[json_path][0]
+
+        return DataInfoSnapshot.from_dict(self._safe_load_json(json_path))
+
+    def exit_handler(self):
+
+        with self._write_cond:
+            self._writer_stopped = True
+            self._write_cond.notify_all()
+
+        self._writer_thread.join()
+        self.flush() # 只写入待写入表中被修改过的文件，未修改的缓存无需重写
+
+        with self._cache_lock:
+            self._json_cache.clear()
+            self._synced_revisions.clear()
 
-        data_info = DataInfo(
-                file_name=data.get("file_name", ""),
-                label=data.get("label", "default"),
-                issues=data.get("issues", []),
-                items=items
-            ) 
-        
-        return data_info
 
 jsonFileManager = JsonFileManager()
 
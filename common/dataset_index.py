@@ -0,0 +1,183 @@
+# coding:utf-8
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from common.data_structure import DataInfo, DataInfoSnapshot, jsonFileManager
+
+
+class ImageIndexEntry:
+    """ 单张图像的标注摘要 """
+
+    __slots__ = ("image_path", "item_count", "labels", "types", "attributes", "issues")
+
+    def __init__(self, image_path: str, item_count: int = 0, labels: Counter = None, types: Counter = None,
+                 attributes: dict[str, set[str]] = None, issues: list[str] = None):
+        self.image_path = image_path
+        self.item_count = item_count
+        self.labels = labels or Counter() # {标签: 标注框数量}
+        self.types = types or Counter() # {标注类型: 标注框数量}
+        self.attributes = attributes or {} # {属性名: 属性值集合}
+        self.issues = issues or []
+
+    @classmethod
+    def from_snapshot(cls, image_path: str, snapshot: DataInfoSnapshot) -> "ImageIndexEntry":
+
+        attributes = {}
+        for item in snapshot.items:
+            for attr in item.attributes:
+                attr = dict(attr)
+                if "attr_name" in attr:
+                    attributes.setdefault(attr["attr_name"], set()).add(str(attr.get("attr_value", "")))
+
+        return cls(
+            image_path=image_path,
+            item_count=len(snapshot.items),
+            labels=Counter(item.caseLabel for item in snapshot.items),
+            types=Counter(item.annotation_type for item in snapshot.items),
+            attributes=attributes,
+            issues=list(snapshot.issues)
+        )
+
+    def matches(self, text: str) -> bool:
+        """标签、属性值或批注中是否包含搜索文本"""
+        if any(text in label for label in self.labels):
+            return True
+
+        for name, values in self.attributes.items():
+            if text in name or any(text in value for value in values):
+                return True
+
+        return any(text in issue for issue in self.issues)
+
+
+class DatasetIndex:
+    """ 数据集标注索引：后台并行解析图像同名的JSON文件，供导航、搜索和统计使用，无需重复打开文件 """
+
+    MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+    def __init__(self):
+        self._entries = {} # {图像路径: ImageIndexEntry}
+        self._positions = {} # {图像路径: 在图像列表中的位置}
+        self._image_paths = []
+        self._lock = threading.Lock()
+
+    def reset(self, image_paths: list[str]):
+        with self._lock:
+            self._image_paths = list(image_paths)
+            self._positions = {path: i for i, path in enumerate(self._image_paths)}
+            self._entries = {}
+
+    def build(self, json_path: Callable[[str], str], stop_event: threading.Event = None,
+              progress: Callable[[int, int], None] = None) -> bool:
+        """
+        并行解析reset设置的所有图像的标注文件
+
+        Args:
+            json_path: 由图像路径得到标注文件路径的函数
+            stop_event: 置位后取消加载
+            progress: 进度回调(已完成数, 总数)
+
+        Returns:
+            是否完整加载（被取消时返回False）
+        """
+        with self._lock:
+            image_paths = list(self._image_paths)
+
+        total = len(image_paths)
+        step = max(1, total // 100) # 进度最多回调约100次
+        done = 0
+
+        def load(image_path: str) -> ImageIndexEntry:
+            if stop_event and stop_event.is_set():
+                return None
+            return ImageIndexEntry.from_snapshot(image_path, jsonFileManager.peek_snapshot(json_path(image_path)))
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+
+            futures = [executor.submit(load, path) for path in image_paths]
+
+            for future in as_completed(futures):
+
+                if stop_event and stop_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return False
+
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    print(f"标注文件解析失败：{e}")
+                    entry = None
+
+                if entry is not None:
+                    with self._lock:
+                        self._entries[entry.image_path] = entry
+
+                done += 1
+                if progress and (done % step == 0 or done == total):
+                    progress(done, total)
+
+        return True
+
+    def update(self, image_path: str, data_info: DataInfo):
+        """图像标注保存后同步更新索引"""
+        self.update_snapshot(image_path, data_info.snapshot())
+
+    def update_snapshot(self, image_path: str, snapshot: DataInfoSnapshot):
+        entry = ImageIndexEntry.from_snapshot(image_path, snapshot)
+        with self._lock:
+            self._entries[image_path] = entry
+
+    def remove(self, image_path: str):
+        with self._lock:
+            self._entries.pop(image_path, None)
+
+            if image_path in self._positions:
+                self._image_paths.remove(image_path)
+                self._positions = {path: i for i, path in enumerate(self._image_paths)}
+
+    def get(self, image_path: str) -> Optional[ImageIndexEntry]:
+        with self._lock:
+            return self._entries.get(image_path)
+
+    def position(self, image_path: str) -> int:
+        """图像在列表中的位置，不存在返回-1"""
+        with self._lock:
+            return self._positions.get(image_path, -1)
+
+    def find_next(self, text: str, start: int = 0) -> int:
+        """从start开始（循环）查找标签、属性或批注包含text的图像，返回其位置，未找到返回-1"""
+        with self._lock:
+            count = len(self._image_paths)
+            for offset in range(count):
+                index = (start + offset) % count
+                entry = self._entries.get(self._image_paths[index])
+                if entry is not None and entry.matches(text):
+                    return index
+        return -1
+
+    def stats(self) -> dict:
+        """统计信息：图像数、已标注图像数、标注框总数、各标签及各类型数量"""
+        with self._lock:
+            labels = Counter()
+            types = Counter()
+            annotated = 0
+
+            for entry in self._entries.values():
+                labels.update(entry.labels)
+                types.update(entry.types)
+                if entry.item_count:
+                    annotated += 1
+
+            return {
+                "images": len(self._image_paths),
+                "annotated_images": annotated,
+                "items": sum(labels.values()),
+                "labels": dict(labels),
+                "types": dict(types),
+            }
+
+
+datasetIndex = DatasetIndex()
@@ -0,0 +1,285 @@
+# coding:utf-8
+"""
+基于NumPy的几何数据工具
+
+标注点在内部统一存储为连续的 float64 (N,2) 数组，只有在与Qt交互（绘制、QPolygonF包含测试等）时才转换为 QPointF / QPolygonF
+"""
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPolygonF
+
+
+def to_array(points) -> np.ndarray:
+    """QPointF列表、(x,y)序列或数组 -> 只读的 float64 (N,2) 数组"""
+
+    if isinstance(points, np.ndarray):
+        if not points.flags.writeable and points.dtype == np.float64 and points.ndim == 2 and points.flags.c_contiguous:
+            return points # 只读数组可直接共享
+        array = np.array(points, dtype=np.float64).reshape(-1, 2) # 复制，不与调用方共享可写内存
+    elif len(points) and isinstance(points[0], QPointF):
+        array = np.array([(p.x(), p.y()) for p in points], dtype=np.float64).reshape(-1, 2)
+    else:
+        array = np.array(points, dtype=np.float64).reshape(-1, 2)
+
+    array.flags.writeable = False
+    return array
+
+
+def to_qpoints(array: np.ndarray) -> list[QPointF]:
+    """(N,2) 数组 -> QPointF列表"""
+    return [QPointF(x, y) for x, y in array.tolist()]
+
+
+def to_qpolygonf(array: np.ndarray) -> QPolygonF:
+    """(N,2) 数组 -> QPolygonF，直接写入QPolygonF的内存，不创建中间的QPointF对象"""
+
+    count = len(array)
+    polygon = QPolygonF(count)
+
+    if count:
+        buffer = polygon.data()
+        buffer.setsize(count * 2 * 8)
+        np.frombuffer(buffer, dtype=np.float64).reshape(count, 2)[:] = array
+
+    return polygon
+
+
+def rectangle_corners(array: np.ndarray) -> np.ndarray:
+    """矩形两个对角点 -> 四个顶点（左下、左上、右上、右下，与Utils.get_rectangle_points顺序一致）"""
+
+    (x1, y1), (x2, y2) = array.min(axis=0), array.max(axis=0)
+    corners = np.array([[x1, y1], [x1, y2], [x2, y2], [x2, y1]], dtype=np.float64)
+    corners.flags.writeable = False
+    return corners
+
+
+def rectangle_vertices(array: np.ndarray) -> np.ndarray:
+    """矩形顶点 -> 两个对角点（最小点、最大点）"""
+
+    vertices = np.array([array.min(axis=0), array.max(axis=0)], dtype=np.float64)
+    vertices.flags.writeable = False
+    return vertices
+
+
+def nearest_point_index(array: np.ndarray, x: float, y: float) -> tuple[int, float]:
+    """距离(x,y)最近的点的索引及距离，数组为空时返回(-1, inf)"""
+
+    if not len(array):
+        return -1, float("inf")
+
+    dist = np.hypot(array[:, 0] - x, array[:, 1] - y)
+    index = int(np.argmin(dist))
+    return index, float(dist[index])
+
+
+def _simplify_open(array: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas–Peucker：返回开放折线需要保留的点的布尔掩码"""
+
+    count = len(array)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        segment = array[start + 1:end]
+        (x1, y1), (x2, y2) = array[start], array[end]
+        dx, dy = x2 - x1, y2 - y1
+        length = np.hypot(dx, dy)
+
+        if length == 0: # 首尾重合，退化为到点的距离
+            dist = np.hypot(segment[:, 0] - x1, segment[:, 1] - y1)
+        else:
+            dist = np.abs(dy * segment[:, 0] - dx * segment[:, 1] + x2 * y1 - y2 * x1) / length
+
+        index = int(np.argmax(dist))
+        if dist[index] > tolerance:
+            index += start + 1
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return keep
+
+
+def simplify(array: np.ndarray, tolerance: float, closed: bool = False) -> np.ndarray:
+    """
+    Douglas–Peucker 折线/多边形简化，删除到保留线段距离不超过tolerance的点
+
+    Args:
+        array: (N,2) 数组
+        tolerance: 容差（与坐标同单位）
+        closed: 是否为闭合多边形（首尾相连）
+
+    Returns:
+        简化后的只读 (M,2) 数组，无法简化时直接返回原数组
+    """
+    count = len(array)
+    if count <= (3 if closed else 2) or tolerance <= 0:
+        return array
+
+    if closed:
+        # 以距离首点最远的点把环拆成两条开放折线分别简化
+        far = int(np.argmax(np.hypot(array[:, 0] - array[0, 0], array[:, 1] - array[0, 1])))
+        if far == 0:
+            return array
+        keep = np.zeros(count, dtype=bool)
+        keep[:far + 1] = _simplify_open(array[:far + 1], tolerance)
+        ring = np.concatenate((array[far:], array[:1]))
+        keep[far:] |= _simplify_open(ring, tolerance)[:-1]
+        if keep.sum() < 3:
+            return array
+    else:
+        keep = _simplify_open(array, tolerance)
+
+    if keep.all():
+        return array
+
+    result = array[keep]
+    result.flags.writeable = False
+    return result
+
+
+def perimeter(array: np.ndarray, closed: bool = False) -> float:
+    """折线长度（closed为True时包含首尾相连的边）"""
+
+    if len(array) < 2:
+        return 0.0
+
+    diff = np.diff(array, axis=0)
+    length = float(np.hypot(diff[:, 0], diff[:, 1]).sum())
+    if closed:
+        length += float(np.hypot(*(array[0] - array[-1])))
+    return length
+
+
+def _edges(array: np.ndarray, closed: bool) -> tuple[np.ndarray, np.ndarray]:
+    """各条边的起点、终点数组，closed为True时包含末点到首点的边"""
+
+    if closed:
+        return array, np.roll(array, -1, axis=0)
+    return array[:-1], array[1:]
+
+
+def _project(starts: np.ndarray, ends: np.ndarray, x: float, y: float) -> tuple[np.ndarray, np.ndarray]:
+    """点到各线段的距离及垂足（退化为点的线段取其端点）"""
+
+    dx = ends[:, 0] - starts[:, 0]
+    dy = ends[:, 1] - starts[:, 1]
+    length2 = dx * dx + dy * dy
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = ((x - starts[:, 0]) * dx + (y - starts[:, 1]) * dy) / length2
+    t = np.clip(np.where(length2 == 0, 0.0, t), 0.0, 1.0)
+
+    proj = np.column_stack((starts[:, 0] + t * dx, starts[:, 1] + t * dy))
+    return np.hypot(x - proj[:, 0], y - proj[:, 1]), proj
+
+
+def segment_distances(array: np.ndarray, x: float, y: float, closed: bool = True) -> np.ndarray:
+    """
+    点(x,y)到每条边（线段）的距离，与Utils.point_to_line_distance逐边计算的结果一致
+
+    Returns:
+        (E,) 数组，第j个元素为点到边(array[j], array[j+1])的距离
+    """
+    starts, ends = _edges(array, closed)
+    return _project(starts, ends, x, y)[0]
+
+
+def nearest_segment(array: np.ndarray, x: float, y: float, closed: bool = True) -> tuple[int, float, tuple[float, float]]:
+    """
+    距离点(x,y)最近的边，距离相同时取索引最小的边
+
+    Returns:
+        (边的起点索引, 距离, 垂足坐标)，没有边时返回(-1, inf, (x, y))
+    """
+    starts, ends = _edges(array, closed)
+    if not len(starts):
+        return -1, float("inf"), (x, y)
+
+    dist, proj = _project(starts, ends, x, y)
+    index = int(np.argmin(dist))
+    return index, float(dist[index]), tuple(proj[index].tolist())
+
+
+def segment_intersections(array: np.ndarray, p1: tuple[float, float], p2: tuple[float, float],
+                          closed: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    线段p1-p2与每条边的交点，与Utils.line_intersection逐边计算的结果一致（平行或共线的边视为无交点）
+
+    Returns:
+        (有交点的掩码 (E,), 交点坐标 (E,2))，无交点的边对应的坐标无意义
+    """
+    starts, ends = _edges(array, closed)
+
+    mask, t, _ = intersect_segments(starts, ends, p1, p2)
+
+    with np.errstate(invalid="ignore"): # 平行的边t为nan，由掩码排除
+        points = starts + (ends - starts) * t[:, None]
+
+    return mask, points
+
+
+def intersect_segments(starts: np.ndarray, ends: np.ndarray, p1: tuple[float, float], p2: tuple[float, float],
+                       eps: float = 0.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    线段p1-p2与多条线段(starts[j], ends[j])的交点参数（平行或共线视为无交点）
+
+    Args:
+        eps: 参数的容差，端点恰好在另一条线段上（或因浮点误差略微偏离）时仍视为相交
+
+    Returns:
+        (有交点的掩码, 交点在各线段上的参数t, 交点在p1-p2上的参数u)，交点为 starts + t*(ends-starts)
+    """
+    x1, y1 = starts[:, 0], starts[:, 1]
+    x2, y2 = ends[:, 0], ends[:, 1]
+    (x3, y3), (x4, y4) = p1, p2
+
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    t_numer = (x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)
+    u_numer = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3))
+
+    with np.errstate(divide="ignore", invalid="ignore"): # 平行的线段分母为0，由掩码排除
+        t = t_numer / denom
+        u = u_numer / denom
+        mask = (denom != 0) & (t >= -eps) & (t <= 1 + eps) & (u >= -eps) & (u <= 1 + eps)
+
+    return mask, t, u
+
+
+def contains_point(array: np.ndarray, x: float, y: float) -> bool:
+    """点(x,y)是否在多边形内（奇偶规则，向量化计算所有边与向右射线的交点）"""
+
+    starts, ends = _edges(array, True)
+    y1, y2 = starts[:, 1], ends[:, 1]
+
+    crossing = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"): # 水平边不与射线相交，由crossing排除
+        xs = starts[:, 0] + (y - y1) * (ends[:, 0] - starts[:, 0]) / (y2 - y1)
+
+    return bool(np.count_nonzero(crossing & (x < xs)) % 2)
+
+
+def first_intersection(array: np.ndarray, p1: tuple[float, float], p2: tuple[float, float], closed: bool = True,
+                       eps: float = 1e-6) -> tuple[int, Optional[tuple[float, float]]]:
+    """
+    线段p1-p2与边的第一个交点（按边的顺序，排除与p1重合的交点）
+
+    Returns:
+        (边的起点索引, 交点坐标)，没有交点时返回(-1, None)
+    """
+    mask, points = segment_intersections(array, p1, p2, closed)
+    mask &= (np.abs(points[:, 0] - p1[0]) >= eps) | (np.abs(points[:, 1] - p1[1]) >= eps)
+
+    hits = np.flatnonzero(mask)
+    if not len(hits):
+        return -1, None
+
+    index = int(hits[0])
+    return index, tuple(points[index].tolist())
@@ -1,68 +1,253 @@
 # coding: utf-8
-from typing import List
+from typing import List, Sequence
+
+import numpy as np
 from PyQt5.QtCore import QPointF, QSize
 
+from common import geometry
+from common.annotation import AnnotationType
+
 
 class PolygonClipper:
+    """
+    Sutherland–Hodgman 多边形裁剪（裁剪到图像矩形 [0,w]×[0,h]）
+
+    基于NumPy实现：每条裁剪边只做一次向量化计算；多个多边形拼接成一个数组一起裁剪，
+    顶点数上万的多边形或整个数据集的标注也只需几次数组运算
+    """
+
+    EPS = 1e-5 # 相邻顶点距离不超过该值视为重复顶点
+    AREA_EPS = 1e-9 # 裁剪后面积不超过该值视为退化（与PolygonValidator.AREA_EPS一致）
+
+    # 四条裁剪边：(坐标轴, 是否为下界)，顺序与原实现一致：左、上、右、下
+    _EDGES = ((0, True), (1, True), (0, False), (1, False))
 
     def clip_polygon_to_image(self, points: List[QPointF], image_size: QSize) -> List[QPointF]:
+        """QPointF列表版本，结果与clip_array一致"""
+        return geometry.to_qpoints(self.clip_array(geometry.to_array(points), image_size.width(), image_size.height()))
+
+    def clip_array(self, array: np.ndarray, width: float, height: float) -> np.ndarray:
+        """裁剪单个多边形，返回只读 (M,2) 数组，完全在图像外时返回空数组"""
+        return self.clip_arrays([array], width, height)[0]
+
+    def clip_arrays(self, arrays: Sequence[np.ndarray], width: float, height: float) -> list[np.ndarray]:
+        """
+        批量裁剪多个多边形到同一图像矩形
+
+        退化情况的处理：
+            - 含NaN/inf的顶点直接丢弃
+            - 相邻重复顶点（含首尾）合并为一个
+            - 与裁剪边平行的边不会跨越裁剪边，不计算交点，因此不存在除零
 
-        
-        def _clean_points(points: List[QPointF]) -> List[QPointF]: # 清理多边形中的无效点
-            cleaned = []
-            eps = 1e-5
-            for p in points:
-                if not (p.x() == p.x() and p.y() == p.y()):
-                    continue
-                if not cleaned or (abs(p.x()-cleaned[-1].x()) > eps or abs(p.y()-cleaned[-1].y()) > eps):
-                    cleaned.append(p)
-            return cleaned
-
-
-        w, h = image_size.width(), image_size.height()
-        clip_functions = [
-            lambda p: p.x() >= 0,
-            lambda p1, p2: QPointF(0, p1.y() + (p2.y()-p1.y())*(0 - p1.x())/(p2.x()-p1.x())),
-            lambda p: p.y() >= 0,
-            lambda p1, p2: QPointF(p1.x() + (p2.x()-p1.x())*(0 - p1.y())/(p2.y()-p1.y()), 0),
-            lambda p: p.x() <= w,
-            lambda p1, p2: QPointF(w, p1.y() + (p2.y()-p1.y())*(w - p1.x())/(p2.x()-p1.x())),
-            lambda p: p.y() <= h,
-            lambda p1, p2: QPointF(p1.x() + (p2.x()-p1.x())*(h - p1.y())/(p2.y()-p1.y()), h)
-        ]
-
-        clipped = points.copy()
-        for i in range(0, 8, 2):
-            inside_func = clip_functions[i]
-            intersect_func = clip_functions[i+1]
-            if not clipped:
+        Args:
+            arrays: (N,2) 数组序列
+            width, height: 图像尺寸
+
+        Returns:
+            与输入一一对应的只读 (M,2) 数组列表，完全在图像内且无需清理的多边形原样返回
+        """
+        results = [geometry.to_array(array) for array in arrays]
+
+        pending = [i for i, array in enumerate(results) if not self._is_clean_inside(array, width, height)] # 需要裁剪的多边形
+        if not pending:
+            return results
+
+        coords = np.concatenate([results[i] for i in pending])
+        owners = np.repeat(np.arange(len(pending)), [len(results[i]) for i in pending]) # 每个顶点所属的多边形
+
+        finite = np.isfinite(coords).all(axis=1)
+        coords, owners = coords[finite], owners[finite]
+        coords, owners = self._dedupe(coords, owners)
+
+        bounds = (0.0, 0.0, float(width), float(height))
+        for axis, lower in self._EDGES:
+            if not len(coords):
                 break
-            new_clipped = []
-            n = len(clipped)
-            for j in range(n):
-                curr = clipped[j]
-                prev = clipped[j-1] if j > 0 else clipped[-1]
-                
-                curr_in = inside_func(curr)
-                prev_in = inside_func(prev)
-
-                if curr_in:
-                    if not prev_in:
-                        try:
-                            intersect = intersect_func(prev, curr)
-                            new_clipped.append(intersect)
-                        except:
-                            pass
-                    new_clipped.append(curr)
-                elif prev_in:
-                    try:
-                        intersect = intersect_func(prev, curr)
-                        new_clipped.append(intersect)
-                    except:
-                        pass
-            clipped = _clean_points(new_clipped)
-        return clipped
-
-    
-    
+            limit = bounds[axis] if lower else bounds[axis + 2]
+            coords, owners = self._clip_edge(coords, owners, axis, limit, lower)
+            coords, owners = self._dedupe(coords, owners)
+
+        counts = np.bincount(owners, minlength=len(pending))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        for k, i in enumerate(pending):
+            result = np.ascontiguousarray(coords[offsets[k]:offsets[k + 1]])
+            result.flags.writeable = False
+            results[i] = result
+
+        return results
+
+    def clamp_array(self, array: np.ndarray, width: float, height: float) -> np.ndarray:
+        """逐点限制到图像范围内（顶点数不变，用于拖动等需要保持顶点索引的场景）"""
+
+        result = np.clip(array, (0, 0), (width, height))
+        result.flags.writeable = False
+        return result
+
+    def clip_coords(self, types: Sequence[AnnotationType], arrays: Sequence[np.ndarray],
+                    width: float, height: float) -> list[np.ndarray]:
+        """
+        把标注点限制到图像范围内，所有多边形合并为一次批量裁剪，供整个数据集的批量修复使用
+
+        多边形按 Sutherland–Hodgman 裁剪；矩形框、折线和点逐点限制（矩形框裁剪后仍是矩形，折线不能按闭合多边形裁剪）
+
+        Args:
+            types: 各标注项的标注类型
+            arrays: 各标注项的原始标注点（矩形框为两个对角点）
+
+        Returns:
+            与输入一一对应的只读数组，未修改的标注项返回原数组对象；
+            裁剪后退化（完全在图像外，多边形不足3个顶点或面积为0、矩形框宽或高为0、折线缩成一个点）的标注项为None
+        """
+        results = list(arrays)
+        polygons = [i for i, annotation_type in enumerate(types)
+                    if annotation_type in (AnnotationType.POLYGON, AnnotationType.DEFAULT)]
+        polygon_set = set(polygons)
+
+        for i, clipped in zip(polygons, self.clip_arrays([arrays[i] for i in polygons], width, height)):
+            if clipped is not arrays[i] and not np.array_equal(clipped, arrays[i]):
+                results[i] = clipped
+
+        for i, array in enumerate(arrays):
+            if i in polygon_set:
+                continue
+            clamped = self.clamp_array(array, width, height)
+            if not np.array_equal(clamped, array):
+                results[i] = clamped
+
+        for i, annotation_type in enumerate(types):
+            if results[i] is not arrays[i] and self._is_degenerate(results[i], annotation_type):
+                results[i] = None
+
+        return results
+
+    def clip_items(self, items: Sequence, width: float, height: float) -> tuple[list, list]:
+        """
+        把标注项（DataItemInfo）限制到图像范围内，规则同clip_coords；退化的标注项不修改，由调用方删除
+
+        Returns:
+            (被修改的标注项, 裁剪后退化的标注项)
+        """
+        arrays = [item.origin_coords for item in items]
+        changed = []
+        degenerate = []
+
+        for item, array, clipped in zip(items, arrays, self.clip_coords([item.annotation_type for item in items], arrays, width, height)):
+            if clipped is None:
+                degenerate.append(item)
+            elif clipped is not array:
+                item.points = geometry.rectangle_corners(clipped) if item.annotation_type == AnnotationType.BBOX else clipped
+                changed.append(item)
+
+        return changed, degenerate
+
+    @classmethod
+    def _is_degenerate(cls, array: np.ndarray, annotation_type: AnnotationType) -> bool:
+
+        if len(array) < annotation_type.min_points:
+            return True
+
+        if annotation_type in (AnnotationType.POLYGON, AnnotationType.DEFAULT):
+            x, y = array[:, 0], array[:, 1]
+            return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))) / 2 <= cls.AREA_EPS
+
+        if annotation_type == AnnotationType.BBOX:
+            (x1, y1), (x2, y2) = array.min(axis=0), array.max(axis=0)
+            return x2 - x1 <= cls.EPS or y2 - y1 <= cls.EPS
+
+        if annotation_type == AnnotationType.LINE:
+            return bool((np.ptp(array, axis=0) <= cls.EPS).all())
+
+        return False
+
+    @classmethod
+    def _is_clean_inside(cls, array: np.ndarray, width: float, height: float) -> bool:
+        """快速路径：所有顶点有效、在图像内且没有重复顶点，无需裁剪"""
+
+        if not len(array) or not np.isfinite(array).all():
+            return False
+
+        (x1, y1), (x2, y2) = array.min(axis=0), array.max(axis=0)
+        if x1 < 0 or y1 < 0 or x2 > width or y2 > height:
+            return False
+
+        return not cls._duplicate_mask(array, np.zeros(len(array), dtype=np.intp)).any()
+
+    @staticmethod
+    def _neighbor_index(owners: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        拼接数组中每个顶点在所属多边形（环）中的前一个、后一个顶点的位置，以及所属多边形的起始位置
+
+        owners为每个顶点所属多边形的编号，同一多边形的顶点连续存放
+        """
+        count = len(owners)
+        index = np.arange(count)
+
+        is_start = np.ones(count, dtype=bool)
+        is_start[1:] = owners[1:] != owners[:-1]
+        is_end = np.ones(count, dtype=bool)
+        is_end[:-1] = is_start[1:]
+
+        segment = np.cumsum(is_start) - 1
+        starts = np.flatnonzero(is_start)[segment]
+        ends = np.flatnonzero(is_end)[segment]
+
+        prev_index = np.where(is_start, ends, index - 1)
+        next_index = np.where(is_end, starts, index + 1)
+        return prev_index, next_index, starts
+
+    @classmethod
+    def _duplicate_mask(cls, coords: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        """与后一个顶点（环状，末顶点的后一个是首顶点）重复的顶点，删除后保留每段重复中的第一个；所有顶点都重合时保留首顶点"""
+
+        if not len(coords):
+            return np.zeros(0, dtype=bool)
+
+        _, next_index, starts = cls._neighbor_index(owners)
+        duplicate = (np.abs(coords - coords[next_index]) <= cls.EPS).all(axis=1)
+        duplicate[next_index == np.arange(len(coords))] = False # 只有一个顶点的多边形
+
+        is_start = starts == np.arange(len(coords))
+        has_unique = np.zeros(len(coords), dtype=bool)
+        np.logical_or.at(has_unique, starts, ~duplicate) # 以多边形起始位置汇总：是否存在非重复顶点
+        duplicate[is_start & ~has_unique] = False
+        return duplicate
+
+    @classmethod
+    def _dedupe(cls, coords: np.ndarray, owners: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        keep = ~cls._duplicate_mask(coords, owners)
+        return coords[keep], owners[keep]
+
+    @classmethod
+    def _clip_edge(cls, coords: np.ndarray, owners: np.ndarray, axis: int, limit: float, lower: bool):
+        """
+        对一条裁剪边执行一轮 Sutherland–Hodgman
+
+        对每条边(prev, curr)按顺序输出：跨越裁剪边时的交点、curr在内侧时的curr，
+        所有边的输出候选组成 (N,2) 的槽位，按掩码展开即为保持顺序的结果
+        """
+
+        prev_index, _, _ = cls._neighbor_index(owners)
+        prev = coords[prev_index]
+
+        values = coords[:, axis]
+        inside = values >= limit if lower else values <= limit
+        prev_inside = inside[prev_index]
+        crossing = inside != prev_inside
+
+        intersections = np.empty_like(coords)
+        if crossing.any():
+            p1, p2 = prev[crossing], coords[crossing]
+            delta = p2[:, axis] - p1[:, axis] # 跨越裁剪边时两端点在该轴上必然不同，不会为0
+            t = (limit - p1[:, axis]) / delta
+            points = p1 + (p2 - p1) * t[:, None]
+            points[:, axis] = limit # 避免浮点误差使交点略微越界
+            intersections[crossing] = points
+
+        slots = np.stack((intersections, coords), axis=1) # (N,2,2)：每条边的[交点, 当前点]
+        mask = np.stack((crossing, inside), axis=1)
+
+        return slots[mask], np.repeat(owners, mask.sum(axis=1))
+
+
 polygon_clipper = PolygonClipper()
@@ -0,0 +1,149 @@
+# coding: utf-8
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from common import geometry
+from common.polygon_validity import polygon_validator
+from common.spatial_index import SegmentGrid
+
+
+class Crossing(NamedTuple):
+    """ 分割线与多边形边界的交点 """
+    position: float # 在分割线上的位置：线段序号 + 线段内参数
+    edge: int # 所在边的起点索引（恰好在顶点上时为以该顶点为起点的边，t为0）
+    t: float # 在边上的参数
+    point: tuple[float, float]
+
+
+class PolygonSplitter:
+    """
+    沿任意折线分割多边形
+
+    多边形的边登记到SegmentGrid中，分割线的每一段只与其经过的网格单元中的边求交点；
+    沿分割线找到第一段位于多边形内部的弦（相邻两个交点之间的部分），把边界分成两条链，
+    分别与弦拼接成两个多边形。凹多边形、分割线包含多个顶点、交点恰好在顶点上或两端在同一条边上都按同一规则处理
+
+    分割线可能自交或原路折回，分割结果交给PolygonValidator完整检查（每次分割只检查一次），无效时拒绝分割
+    """
+
+    PARAM_EPS = 1e-9 # 交点参数的容差，分割线端点（由投影得到）因浮点误差略微偏离边时仍视为相交
+    EPS = 1e-6 # 距离不超过该值的交点视为同一个
+
+    def __init__(self):
+        self._cached = None # (多边形坐标数组, SegmentGrid)：坐标数组写时复制，对象不变即几何未修改，绘制分割线过程中复用
+
+    def edge_index(self, array: np.ndarray) -> SegmentGrid:
+        """多边形各条边的网格索引"""
+
+        if self._cached is None or self._cached[0] is not array:
+            self._cached = (array, SegmentGrid(array, np.roll(array, -1, axis=0)))
+        return self._cached[1]
+
+    def crossings(self, array: np.ndarray, cut: np.ndarray) -> list[Crossing]:
+        """分割线与多边形边界的所有交点，按在分割线上的位置排序，同一位置（如经过顶点）只保留一个"""
+
+        index = self.edge_index(array)
+        count = len(array)
+        crossings = []
+
+        for segment in range(len(cut) - 1):
+            p1, p2 = cut[segment], cut[segment + 1]
+
+            edges = index.query_segment(p1, p2)
+            if not len(edges):
+                continue
+
+            mask, t, u = geometry.intersect_segments(index.starts[edges], index.ends[edges], p1, p2, self.PARAM_EPS)
+
+            for edge, edge_t, cut_u in zip(edges[mask].tolist(), np.clip(t[mask], 0, 1).tolist(), np.clip(u[mask], 0, 1).tolist()):
+                start, end = index.starts[edge], index.ends[edge]
+                point = (float(start[0] + (end[0] - start[0]) * edge_t), float(start[1] + (end[1] - start[1]) * edge_t))
+
+                if edge_t >= 1 - self.PARAM_EPS: # 交点在边的终点上，统一记为下一条边的起点
+                    edge, edge_t = (edge + 1) % count, 0.0
+
+                crossings.append(Crossing(segment + cut_u, edge, edge_t, point))
+
+        crossings.sort()
+
+        unique = []
+        for crossing in crossings:
+            if unique and abs(crossing.point[0] - unique[-1].point[0]) <= self.EPS \
+                    and abs(crossing.point[1] - unique[-1].point[1]) <= self.EPS:
+                continue
+            unique.append(crossing)
+        return unique
+
+    def first_crossing(self, array: np.ndarray, p1: tuple[float, float], p2: tuple[float, float]) -> Optional[Crossing]:
+        """线段p1-p2与多边形边界离p1最近的交点（排除与p1重合的交点），没有时返回None"""
+
+        for crossing in self.crossings(array, np.array((p1, p2), dtype=np.float64)):
+            if abs(crossing.point[0] - p1[0]) > self.EPS or abs(crossing.point[1] - p1[1]) > self.EPS:
+                return crossing
+        return None
+
+    def split(self, array: np.ndarray, cut) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        沿分割线把多边形分成两个
+
+        Args:
+            array: 多边形顶点 (N,2)
+            cut: 分割线顶点（QPointF列表或 (M,2) 数组），首尾可以在多边形外，只使用第一段穿过多边形内部的弦
+
+        Returns:
+            两个多边形的只读 (K,2) 数组（与原多边形方向一致），分割线未穿过多边形内部或结果无效时返回None
+        """
+        array = geometry.to_array(array)
+        cut = geometry.to_array(cut)
+
+        if len(array) < 3 or len(cut) < 2:
+            return None
+
+        crossings = self.crossings(array, cut)
+
+        for entry, leave in zip(crossings, crossings[1:]):
+
+            chord = self._chord_vertices(cut, entry, leave)
+            probe = np.add(entry.point, chord[0] if len(chord) else leave.point) / 2
+            if not geometry.contains_point(array, probe[0], probe[1]): # 两个交点之间的部分在多边形外
+                continue
+
+            pieces = self._assemble(array, entry, leave, chord)
+            if not all(polygon_validator.check(piece).is_valid for piece in pieces):
+                return None
+            return pieces
+
+        return None
+
+    def _chord_vertices(self, cut: np.ndarray, entry: Crossing, leave: Crossing) -> np.ndarray:
+        """分割线在两个交点之间的顶点"""
+
+        first = int(np.floor(entry.position + self.PARAM_EPS)) + 1
+        last = int(np.ceil(leave.position - self.PARAM_EPS)) - 1
+        return cut[first:last + 1] if last >= first else np.empty((0, 2))
+
+    @staticmethod
+    def _boundary(array: np.ndarray, start: Crossing, end: Crossing) -> np.ndarray:
+        """沿多边形顶点顺序从交点start走到交点end经过的顶点"""
+
+        count = len(array)
+        steps = (end.edge - start.edge) % count
+        if steps == 0 and start.t > end.t: # 两个交点在同一条边上且end在start之前，需要绕行一周
+            steps = count
+        return array[(start.edge + 1 + np.arange(steps)) % count]
+
+    def _assemble(self, array: np.ndarray, entry: Crossing, leave: Crossing, chord: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+
+        entry_point, leave_point = np.array([entry.point]), np.array([leave.point])
+
+        first = np.concatenate((entry_point, self._boundary(array, entry, leave), leave_point, chord[::-1]))
+        second = np.concatenate((leave_point, self._boundary(array, leave, entry), entry_point, chord))
+
+        pieces = polygon_validator.remove_duplicates(first), polygon_validator.remove_duplicates(second)
+        for piece in pieces:
+            piece.flags.writeable = False
+        return pieces
+
+
+polygon_splitter = PolygonSplitter()
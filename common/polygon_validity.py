@@ -0,0 +1,582 @@
+# coding: utf-8
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import Enum
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from PyQt5.QtCore import QSize
+
+from common import geometry
+from common.annotation import AnnotationType
+from common.data_structure import jsonFileManager
+from common.dataset_index import datasetIndex
+from common.polygon_clip import polygon_clipper
+
+
+class ValidityIssue(Enum):
+    """ 标注几何问题 """
+    TOO_FEW_POINTS = "顶点不足"
+    DUPLICATE_VERTEX = "重复顶点"
+    SPIKE = "折返顶点"
+    SELF_INTERSECTION = "自相交"
+    ZERO_AREA = "零面积"
+
+
+class ValidityReport:
+    """ 单个标注项的检查结果 """
+
+    __slots__ = ("issues", "intersection")
+
+    def __init__(self, issues: list[ValidityIssue] = None, intersection: Optional[tuple[int, int]] = None):
+        self.issues = issues or []
+        self.intersection = intersection # 找到的一对相交边的起点索引
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.issues
+
+    def __str__(self) -> str:
+        return "、".join(issue.value for issue in self.issues) or "有效"
+
+
+class _SweepStatus:
+    """
+    扫描线状态：按key有序的活动边，分块存储（每块不超过2*LOAD条边）
+
+    key随扫描线位置变化，但检测到相交前活动边的相对顺序不变，因此可以直接用当前的key二分查找；
+    插入、删除只移动一个块内的元素，不需要在整个列表上insert/index
+    """
+
+    LOAD = 64
+
+    def __init__(self, key: Callable[[int], tuple]):
+        self._key = key
+        self._blocks: list[list[int]] = []
+
+    def _locate(self, target: tuple) -> tuple[int, int]:
+        """第一个key不小于target的位置(块, 块内位置)"""
+
+        blocks, key = self._blocks, self._key
+
+        low, high = 0, len(blocks)
+        while low < high: # 第一个末元素不小于target的块
+            mid = (low + high) // 2
+            if key(blocks[mid][-1]) < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low == len(blocks):
+            return max(low - 1, 0), len(blocks[-1]) if blocks else 0
+
+        block = blocks[low]
+        pos, high = 0, len(block)
+        while pos < high:
+            mid = (pos + high) // 2
+            if key(block[mid]) < target:
+                pos = mid + 1
+            else:
+                high = mid
+        return low, pos
+
+    def _before(self, b: int, i: int) -> Optional[int]:
+        if i > 0:
+            return self._blocks[b][i - 1]
+        return self._blocks[b - 1][-1] if b > 0 else None
+
+    def _at(self, b: int, i: int) -> Optional[int]:
+        if i < len(self._blocks[b]):
+            return self._blocks[b][i]
+        return self._blocks[b + 1][0] if b + 1 < len(self._blocks) else None
+
+    def insert(self, edge: int) -> tuple[Optional[int], Optional[int]]:
+        """插入边，返回插入后其下方、上方相邻的边"""
+
+        if not self._blocks:
+            self._blocks.append([edge])
+            return None, None
+
+        b, i = self._locate(self._key(edge))
+        block = self._blocks[b]
+        block.insert(i, edge)
+
+        below, above = self._before(b, i), self._at(b, i + 1)
+
+        if len(block) > 2 * self.LOAD:
+            self._blocks[b:b + 1] = [block[:self.LOAD], block[self.LOAD:]]
+        return below, above
+
+    def remove(self, edge: int) -> tuple[Optional[int], Optional[int]]:
+        """删除边，返回删除后原位置下方、上方相邻的边"""
+
+        b, i = self._find(edge)
+        block = self._blocks[b]
+        del block[i]
+
+        if not block:
+            del self._blocks[b]
+            if b == len(self._blocks):
+                return (self._blocks[-1][-1] if self._blocks else None), None
+            i = 0
+
+        return self._before(b, i), self._at(b, i)
+
+    def _find(self, edge: int) -> tuple[int, int]:
+        """边所在的位置：从key相同的第一个位置向后查找（浮点误差导致未找到时向前查找）"""
+
+        blocks = self._blocks
+        if len(blocks) == 1:
+            return 0, blocks[0].index(edge)
+
+        start_b, start_i = self._locate(self._key(edge))
+
+        b, i = start_b, start_i
+        while b < len(blocks):
+            try:
+                return b, blocks[b].index(edge, i)
+            except ValueError:
+                b, i = b + 1, 0
+
+        for b in range(start_b, -1, -1):
+            if edge in blocks[b]:
+                return b, blocks[b].index(edge)
+        raise ValueError(f"边{edge}不在扫描线状态中")
+
+
+class PolygonValidator:
+    """
+    多边形有效性检查与修复
+
+    自相交检测使用扫描线（Shamos–Hoey，Bentley–Ottmann的“是否存在交点”版本）：按x排序边的端点，
+    扫描线上的活动边按y有序存放，每次插入/删除只检查相邻的边，O(n log n) 找到第一处相交，
+    5000个顶点的多边形也可以在每次保存时检查
+    """
+
+    EPS = 1e-5 # 相邻顶点距离不超过该值视为重复顶点（与PolygonClipper一致）
+    AREA_EPS = 1e-6 # 面积不超过该值视为零面积
+    MAX_REPAIR_ITERATIONS = 100 # 消除自相交的最大次数，每次需要重新扫描，超过后保留剩余的相交并在检查结果中报告
+
+    MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+    # ---------- 检查 ----------
+
+    def duplicate_mask(self, array: np.ndarray, closed: bool = True) -> np.ndarray:
+        """与后一个顶点重复的顶点（closed时末顶点与首顶点比较）"""
+
+        if len(array) < 2:
+            return np.zeros(len(array), dtype=bool)
+
+        following = np.roll(array, -1, axis=0)
+        mask = (np.abs(array - following) <= self.EPS).all(axis=1)
+        if not closed:
+            mask[-1] = False
+        return mask
+
+    def spike_mask(self, array: np.ndarray) -> np.ndarray:
+        """折返顶点：前后两条边共线且方向相反（多边形在该顶点处原路折回）"""
+
+        if len(array) < 3:
+            return np.zeros(len(array), dtype=bool)
+
+        to_prev = np.roll(array, 1, axis=0) - array
+        to_next = np.roll(array, -1, axis=0) - array
+
+        cross = to_prev[:, 0] * to_next[:, 1] - to_prev[:, 1] * to_next[:, 0]
+        dot = (to_prev * to_next).sum(axis=1)
+        return (cross == 0) & (dot > 0)
+
+    @staticmethod
+    def area(array: np.ndarray) -> float:
+        """多边形有向面积（鞋带公式）"""
+
+        if len(array) < 3:
+            return 0.0
+
+        x, y = array[:, 0], array[:, 1]
+        return float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+    def find_self_intersection(self, array: np.ndarray) -> Optional[tuple[int, int]]:
+        """
+        扫描线检测多边形是否自相交（不相邻的边相交或接触）
+
+        相邻边共享顶点不算相交，相邻边原路折回由spike_mask检查
+
+        Returns:
+            一对相交边的起点索引(i, j)，i < j；不自相交时返回None
+        """
+        count = len(array)
+        if count < 4: # 三角形不会自相交（退化情况由零面积、折返顶点检查）
+            return None
+
+        starts = array
+        ends = np.roll(array, -1, axis=0)
+
+        # 每条边按(x, y)字典序确定左、右端点
+        swap = (starts[:, 0] > ends[:, 0]) | ((starts[:, 0] == ends[:, 0]) & (starts[:, 1] > ends[:, 1]))
+        left = np.where(swap[:, None], ends, starts)
+        right = np.where(swap[:, None], starts, ends)
+
+        dx = right[:, 0] - left[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(dx > 0, (right[:, 1] - left[:, 1]) / dx, np.inf) # 竖直边的斜率视为无穷大
+
+        # 事件：(x, 类型, y, 边)，同一x先插入后删除，使在同一点接触的边能被比较
+        event_x = np.concatenate((left[:, 0], right[:, 0]))
+        event_type = np.repeat((0, 1), count)
+        event_y = np.concatenate((left[:, 1], right[:, 1]))
+        order = np.lexsort((event_y, event_type, event_x))
+        event_edge = np.tile(np.arange(count), 2)[order].tolist()
+        event_type = event_type[order].tolist()
+        event_x = event_x[order].tolist()
+
+        lx, ly = left[:, 0].tolist(), left[:, 1].tolist()
+        rx = right[:, 0].tolist()
+        y_min = np.minimum(left[:, 1], right[:, 1]).tolist()
+        y_max = np.maximum(left[:, 1], right[:, 1]).tolist()
+        slopes = slope.tolist()
+        points = array.tolist()
+
+        sweep_x = 0.0
+
+        def key(edge: int) -> tuple[float, float]:
+            """扫描线位于sweep_x时边的y坐标，相同时按斜率排序"""
+            s = slopes[edge]
+            if s == np.inf:
+                return ly[edge], s
+            return ly[edge] + s * (sweep_x - lx[edge]), s
+
+        def intersects(i: int, j: int) -> bool:
+            if abs(i - j) == 1 or abs(i - j) == count - 1: # 相邻边
+                return False
+            if lx[i] > rx[j] or lx[j] > rx[i] or y_min[i] > y_max[j] or y_min[j] > y_max[i]: # 包围盒不相交
+                return False
+            return self._segments_intersect(points[i], points[(i + 1) % count], points[j], points[(j + 1) % count])
+
+        active = _SweepStatus(key) # 扫描线上的活动边，按key有序
+
+        for edge, kind, x in zip(event_edge, event_type, event_x):
+
+            sweep_x = x
+
+            if kind == 0: # 插入：与上下相邻的边比较
+                for neighbor in active.insert(edge):
+                    if neighbor is not None and intersects(edge, neighbor):
+                        return tuple(sorted((edge, neighbor)))
+            else: # 删除：原来的上下相邻边变为相邻
+                below, above = active.remove(edge)
+
+                if below is not None and above is not None and intersects(below, above):
+                    return tuple(sorted((below, above)))
+
+        return None
+
+    @staticmethod
+    def _segments_intersect(p1: list, p2: list, q1: list, q2: list) -> bool:
+        """两条线段是否相交（含端点接触与共线重叠），调用方已排除包围盒不相交的情况"""
+
+        (px1, py1), (px2, py2), (qx1, qy1), (qx2, qy2) = p1, p2, q1, q2
+
+        # 各端点相对另一条线段的方向（叉积符号）
+        d1 = (qx2 - qx1) * (py1 - qy1) - (qy2 - qy1) * (px1 - qx1)
+        d2 = (qx2 - qx1) * (py2 - qy1) - (qy2 - qy1) * (px2 - qx1)
+        d3 = (px2 - px1) * (qy1 - py1) - (py2 - py1) * (qx1 - px1)
+        d4 = (px2 - px1) * (qy2 - py1) - (py2 - py1) * (qx2 - px1)
+
+        if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
+            return True
+
+        def on_segment(a, b, c) -> bool: # 已知a、b、c共线，c是否在线段ab上
+            return min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+
+        return (d1 == 0 and on_segment(q1, q2, p1)) or (d2 == 0 and on_segment(q1, q2, p2)) \
+            or (d3 == 0 and on_segment(p1, p2, q1)) or (d4 == 0 and on_segment(p1, p2, q2))
+
+    @staticmethod
+    def _annotation_type(value) -> AnnotationType:
+        """与DataItemInfo.verify_annotation_type一致，无法识别的类型按默认标注框处理"""
+        try:
+            return AnnotationType(value)
+        except ValueError:
+            return AnnotationType.DEFAULT
+
+    def check(self, array: np.ndarray, annotation_type: AnnotationType = AnnotationType.POLYGON) -> ValidityReport:
+        """
+        检查标注点
+
+        多边形检查全部问题；矩形框只检查零面积（array为两个对角点）；折线只检查重复顶点和顶点数；点不检查
+        """
+        annotation_type = self._annotation_type(annotation_type)
+
+        if annotation_type == AnnotationType.POINT:
+            return ValidityReport()
+
+        if annotation_type == AnnotationType.BBOX:
+            if len(array) != 2:
+                return ValidityReport([ValidityIssue.TOO_FEW_POINTS])
+            (x1, y1), (x2, y2) = array.tolist()
+            return ValidityReport([ValidityIssue.ZERO_AREA] if abs((x2 - x1) * (y2 - y1)) <= self.AREA_EPS else [])
+
+        if annotation_type == AnnotationType.LINE:
+            issues = []
+            if self.duplicate_mask(array, closed=False).any():
+                issues.append(ValidityIssue.DUPLICATE_VERTEX)
+            if len(array) < 2:
+                issues.append(ValidityIssue.TOO_FEW_POINTS)
+            return ValidityReport(issues)
+
+        issues = []
+
+        if len(array) < 3:
+            return ValidityReport([ValidityIssue.TOO_FEW_POINTS])
+
+        if self.duplicate_mask(array).any():
+            issues.append(ValidityIssue.DUPLICATE_VERTEX)
+            array = array[~self.duplicate_mask(array)] # 去掉重复顶点后再做其余检查，避免零长度边干扰
+
+        if self.spike_mask(array).any():
+            issues.append(ValidityIssue.SPIKE)
+
+        if abs(self.area(array)) <= self.AREA_EPS:
+            issues.append(ValidityIssue.ZERO_AREA)
+
+        intersection = self.find_self_intersection(array)
+        if intersection is not None:
+            issues.append(ValidityIssue.SELF_INTERSECTION)
+
+        return ValidityReport(issues, intersection)
+
+    def check_item(self, item) -> ValidityReport:
+        """检查DataItemInfo或DataItemSnapshot"""
+
+        points = item.origin_coords if hasattr(item, "origin_coords") else item.points
+        return self.check(points, item.annotation_type)
+
+    # ---------- 修复 ----------
+
+    def remove_duplicates(self, array: np.ndarray, closed: bool = True) -> np.ndarray:
+        mask = self.duplicate_mask(array, closed)
+        return array[~mask] if mask.any() else array
+
+    def remove_spikes(self, array: np.ndarray) -> np.ndarray:
+        """逐轮删除折返顶点（删除后可能产生新的折返或重复顶点）"""
+
+        while len(array) >= 3:
+            mask = self.spike_mask(array)
+            if not mask.any():
+                break
+            array = self.remove_duplicates(array[~mask])
+        return array
+
+    def remove_self_intersections(self, array: np.ndarray) -> np.ndarray:
+        """
+        逐个消除自相交：边i与边j相交时把顶点i+1..j的顺序反转（2-opt），交叉的两条边变为不交叉，
+        多边形周长严格减小，因此一定会结束；顶点集合不变
+        """
+        for _ in range(self.MAX_REPAIR_ITERATIONS):
+            intersection = self.find_self_intersection(array)
+            if intersection is None:
+                break
+
+            i, j = intersection
+            array = array.copy()
+            array[i + 1:j + 1] = array[i + 1:j + 1][::-1].copy()
+            array = self.remove_spikes(self.remove_duplicates(array)) # 反转后共线的边可能形成折返
+        return array
+
+    def repair(self, array: np.ndarray, annotation_type: AnnotationType = AnnotationType.POLYGON,
+               untangle: bool = True) -> tuple[np.ndarray, ValidityReport]:
+        """
+        修复标注点：删除重复顶点、折返顶点，消除自相交；零面积、顶点不足无法修复，保留在检查结果中
+
+        Args:
+            untangle: 是否消除自相交（会改变顶点顺序，只在用户明确要求修复时使用）
+
+        Returns:
+            (修复后的只读数组，未修改时为原数组, 修复后的检查结果)
+        """
+        annotation_type = self._annotation_type(annotation_type)
+        repaired = array
+
+        if annotation_type == AnnotationType.LINE:
+            repaired = self.remove_duplicates(array, closed=False)
+
+        elif annotation_type in (AnnotationType.POLYGON, AnnotationType.DEFAULT):
+            repaired = self.remove_spikes(self.remove_duplicates(array))
+            if untangle:
+                repaired = self.remove_self_intersections(repaired)
+
+        if repaired is not array:
+            repaired = geometry.to_array(repaired)
+
+        return repaired, self.check(repaired, annotation_type)
+
+    def repair_coords(self, points: np.ndarray, annotation_type: AnnotationType,
+                      untangle: bool = True) -> Optional[np.ndarray]:
+        """
+        修复单个标注项的标注点（untangle同repair）
+
+        Returns:
+            修复后的只读数组；无需修复、无可修复的问题或修复后顶点数不满足标注类型要求时返回None
+        """
+        annotation_type = self._annotation_type(annotation_type)
+        if annotation_type in (AnnotationType.BBOX, AnnotationType.POINT): # 无可修复的问题
+            return None
+
+        repaired, _ = self.repair(points, annotation_type, untangle)
+
+        if repaired is points or len(repaired) < annotation_type.min_points or np.array_equal(repaired, points):
+            return None
+        return repaired
+
+    def repair_items(self, items: Sequence, untangle: bool = True) -> list:
+        """
+        修复DataItemInfo列表，修复后顶点数仍满足标注类型要求时才写回（untangle同repair）
+
+        Returns:
+            被修改的标注项
+        """
+        changed = []
+
+        for item in items:
+            repaired = self.repair_coords(item.origin_coords, item.annotation_type, untangle)
+            if repaired is not None:
+                item.points = repaired
+                changed.append(item)
+
+        return changed
+
+    # ---------- 数据集批量检查 ----------
+
+    def check_dataset(self, image_paths: list[str], json_path: Callable[[str], str],
+                      stop_event: threading.Event = None,
+                      progress: Callable[[int, int], None] = None) -> Optional[dict[str, list[tuple[int, ValidityReport]]]]:
+        """
+        并行检查数据集中所有图像的标注（读取jsonFileManager缓存中的最新数据，不修改文件）
+
+        Returns:
+            {图像路径: [(标注项序号, 检查结果), ...]}，只包含有问题的图像；被取消时返回None
+        """
+        total = len(image_paths)
+        step = max(1, total // 100)
+        done = 0
+        result = {}
+
+        def check(image_path: str) -> list[tuple[int, ValidityReport]]:
+            if stop_event and stop_event.is_set():
+                return []
+            snapshot = jsonFileManager.peek_snapshot(json_path(image_path))
+            reports = [(i, self.check_item(item)) for i, item in enumerate(snapshot.items)]
+            return [(i, report) for i, report in reports if not report.is_valid]
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+
+            futures = {executor.submit(check, path): path for path in image_paths}
+
+            for future in as_completed(futures):
+
+                if stop_event and stop_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+
+                try:
+                    invalid = future.result()
+                except Exception as e:
+                    print(f"标注检查失败：{futures[future]} {e}")
+                    invalid = []
+
+                if invalid:
+                    result[futures[future]] = invalid
+
+                done += 1
+                if progress and (done % step == 0 or done == total):
+                    progress(done, total)
+
+        return result
+
+    def repair_dataset(self, image_paths: list[str], json_path: Callable[[str], str],
+                       image_size: Callable[[str], QSize] = None, stop_event: threading.Event = None,
+                       progress: Callable[[int, int], None] = None,
+                       acquire: Callable[[str], bool] = None, release: Callable[[str], None] = None) -> Optional[int]:
+        """
+        并行修复数据集中的标注：修复几何问题并裁剪到图像范围内，修改过的文件通过jsonFileManager保存并同步数据集索引
+
+        只应传入check_dataset报告有问题的图像，且不包含界面上正在编辑的图像（其数据由DataManager持有）
+
+        直接修改只读快照，不还原为DataInfo：DataItemInfo构造时会检查顶点数并弹出提示框，不能在后台线程创建；
+        顶点数本就不满足要求的标注项保持原样
+
+        Args:
+            image_size: 由图像路径得到图像尺寸的函数，为None或返回无效尺寸时不裁剪；裁剪后退化的标注项被删除
+            acquire: 修复每张图像前调用，返回False时跳过该图像（修复期间被界面打开的图像）
+            release: 该图像修复并保存完成后调用（与acquire成对）
+
+        Returns:
+            修改过的图像数；被取消时返回None
+        """
+        total = len(image_paths)
+        step = max(1, total // 100)
+        done = 0
+        repaired_images = 0
+
+        def repair(image_path: str) -> bool:
+            if stop_event and stop_event.is_set():
+                return False
+
+            if acquire and not acquire(image_path):
+                return False
+
+            try:
+                path = json_path(image_path)
+                snapshot = jsonFileManager.peek_snapshot(path)
+
+                types = [self._annotation_type(item.annotation_type) for item in snapshot.items]
+                points = [item.points for item in snapshot.items]
+
+                for i, annotation_type in enumerate(types):
+                    if len(points[i]) < annotation_type.min_points:
+                        continue
+                    repaired = self.repair_coords(points[i], annotation_type)
+                    if repaired is not None:
+                        points[i] = repaired
+
+                size = image_size(image_path) if image_size else None
+                if size is not None and size.isValid() and not size.isEmpty():
+                    points = polygon_clipper.clip_coords(types, points, size.width(), size.height())
+
+                if all(new is item.points for new, item in zip(points, snapshot.items)):
+                    return False
+
+                # 裁剪后退化（完全在图像外）的标注项直接删除
+                snapshot = snapshot.replace(item if new is item.points else item.replace(new)
+                                            for item, new in zip(snapshot.items, points) if new is not None)
+                jsonFileManager.save_snapshot(path, snapshot)
+                datasetIndex.update_snapshot(image_path, snapshot)
+                return True
+            finally:
+                if release:
+                    release(image_path)
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+
+            futures = {executor.submit(repair, path): path for path in image_paths}
+
+            for future in as_completed(futures):
+
+                if stop_event and stop_event.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+
+                try:
+                    repaired_images += future.result()
+                except Exception as e:
+                    print(f"标注修复失败：{futures[future]} {e}")
+
+                done += 1
+                if progress and (done % step == 0 or done == total):
+                    progress(done, total)
+
+        return repaired_images
+
+
+polygon_validator = PolygonValidator()
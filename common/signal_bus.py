@@ -13,4 +13,7 @@ class SignalBus(QObject):
 
     setting_label_color_changed = pyqtSignal()
 
+    dumpCanvasMetrics = pyqtSignal(str) # 导出画布性能统计，参数为CSV文件路径
+    checkDatasetValidity = pyqtSignal() # 检查数据集中所有标注的几何有效性
+
 signalBus = SignalBus()
@@ -0,0 +1,237 @@
+# coding:utf-8
+import math
+from typing import Hashable, Iterable
+
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    均匀网格空间索引：按包围盒把对象登记到覆盖的网格单元中，支持增量插入、更新、删除
+
+    点击检测与视口裁剪只需检查查询区域覆盖的网格单元中的对象，而不是遍历所有对象
+    """
+
+    CELL_SIZE = 64.0 # 网格单元边长（图像像素）
+    MAX_CELLS_PER_ITEM = 256 # 覆盖单元数超过该值的大对象单独存放，每次查询都参与检查
+
+    def __init__(self, cell_size: float = CELL_SIZE):
+        self._cell_size = cell_size
+        self._cells = {} # {(列, 行): {对象}}
+        self._bounds = {} # {对象: (x1, y1, x2, y2)}
+        self._item_cells = {} # {对象: [(列, 行), ...]}，大对象为None
+        self._large_items = set()
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._bounds
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds.clear()
+        self._item_cells.clear()
+        self._large_items.clear()
+
+    def _cell_range(self, x1: float, y1: float, x2: float, y2: float) -> tuple[int, int, int, int]:
+        size = self._cell_size
+        return math.floor(x1 / size), math.floor(y1 / size), math.floor(x2 / size), math.floor(y2 / size)
+
+    def insert(self, key: Hashable, bounds: tuple[float, float, float, float]):
+        """登记对象（已存在时等同于update）"""
+
+        if key in self._bounds:
+            self.remove(key)
+
+        self._bounds[key] = bounds
+
+        c1, r1, c2, r2 = self._cell_range(*bounds)
+
+        if (c2 - c1 + 1) * (r2 - r1 + 1) > self.MAX_CELLS_PER_ITEM:
+            self._large_items.add(key)
+            self._item_cells[key] = None
+            return
+
+        cells = [(c, r) for c in range(c1, c2 + 1) for r in range(r1, r2 + 1)]
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+        self._item_cells[key] = cells
+
+    def update(self, key: Hashable, bounds: tuple[float, float, float, float]):
+        """对象包围盒变化后更新索引，覆盖的网格单元不变时不做任何操作"""
+
+        old_bounds = self._bounds.get(key)
+        if old_bounds == bounds:
+            return
+
+        if old_bounds is not None and key not in self._large_items \
+                and self._cell_range(*old_bounds) == self._cell_range(*bounds):
+            self._bounds[key] = bounds
+            return
+
+        self.insert(key, bounds)
+
+    def remove(self, key: Hashable):
+
+        if key not in self._bounds:
+            return
+
+        del self._bounds[key]
+        cells = self._item_cells.pop(key)
+
+        if cells is None:
+            self._large_items.discard(key)
+            return
+
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def bounds(self, key: Hashable) -> tuple[float, float, float, float]:
+        return self._bounds.get(key)
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> set:
+        """包围盒与矩形相交的所有对象"""
+
+        c1, r1, c2, r2 = self._cell_range(x1, y1, x2, y2)
+
+        candidates = set(self._large_items)
+
+        if (c2 - c1 + 1) * (r2 - r1 + 1) > len(self._cells): # 查询范围比已占用的单元还多时直接遍历已占用单元
+            for (c, r), bucket in self._cells.items():
+                if c1 <= c <= c2 and r1 <= r <= r2:
+                    candidates.update(bucket)
+        else:
+            for c in range(c1, c2 + 1):
+                for r in range(r1, r2 + 1):
+                    bucket = self._cells.get((c, r))
+                    if bucket:
+                        candidates.update(bucket)
+
+        result = set()
+        for key in candidates:
+            bx1, by1, bx2, by2 = self._bounds[key]
+            if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1:
+                result.add(key)
+        return result
+
+    def query_point(self, x: float, y: float, radius: float = 0.0) -> set:
+        """包围盒（外扩radius）包含点(x, y)的所有对象"""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
+
+    def rebuild(self, items: Iterable[tuple[Hashable, tuple[float, float, float, float]]]):
+        self.clear()
+        for key, bounds in items:
+            self.insert(key, bounds)
+
+
+class SegmentGrid:
+    """
+    线段的静态均匀网格索引（NumPy实现）：按包围盒把线段登记到覆盖的网格单元中，一次构建、多次查询
+
+    用于多边形分割等需要反复求线段与多边形各条边交点的场景：查询时只取查询线段经过的网格单元中的边，
+    而不是遍历所有边；网格大小按线段数自动选择，平均每个单元约TARGET_PER_CELL条线段
+    """
+
+    TARGET_PER_CELL = 2.0
+    MAX_CELLS_PER_SEGMENT = 16 # 覆盖单元数超过该值的长线段单独存放，每次查询都参与检查
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        self.starts = starts
+        self.ends = ends
+
+        count = len(starts)
+        if not count:
+            self._origin, self._cell_size, self._shape = np.zeros(2), 1.0, (0, 0)
+            self._keys = self._segments = self._large = np.zeros(0, dtype=np.intp)
+            return
+
+        lower = np.minimum(starts, ends)
+        upper = np.maximum(starts, ends)
+        self._origin = lower.min(axis=0)
+        extent = upper.max(axis=0) - self._origin
+
+        width, height = float(extent[0]), float(extent[1])
+        cell_size = max(math.sqrt(width * height * self.TARGET_PER_CELL / count),
+                        max(width, height) * self.TARGET_PER_CELL / count) # 细长的多边形面积接近0，按长边划分
+        self._cell_size = cell_size if cell_size > 0 else 1.0
+
+        pad = self._cell_size * 1e-9 # 端点恰好在网格线上时同时登记到两侧的单元
+        first = self._cell_of(lower - pad)
+        last = self._cell_of(upper + pad)
+        self._shape = (int(last[:, 0].max()) + 1, int(last[:, 1].max()) + 1) # (列数, 行数)
+
+        spans = last - first + 1
+        cell_counts = spans[:, 0] * spans[:, 1]
+        small = cell_counts <= self.MAX_CELLS_PER_SEGMENT
+        self._large = np.flatnonzero(~small)
+
+        # 把每条线段展开为其覆盖的所有单元
+        segments = np.flatnonzero(small)
+        repeats = cell_counts[segments]
+        owner = np.repeat(segments, repeats)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        cols = first[owner, 0] + local % spans[owner, 0]
+        rows = first[owner, 1] + local // spans[owner, 0]
+
+        keys = rows * self._shape[0] + cols
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._segments = owner[order]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _cell_of(self, points: np.ndarray) -> np.ndarray:
+        return np.maximum(np.floor((points - self._origin) / self._cell_size).astype(np.intp), 0)
+
+    def _cells_on_segment(self, p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+        """线段p1-p2经过的网格单元（按与网格线的交点把线段分段，每段的中点所在单元）"""
+
+        params = [np.array([0.0, 1.0])]
+        delta = p2 - p1
+
+        for axis in (0, 1):
+            if delta[axis] == 0:
+                continue
+            low, high = sorted(((p1[axis] - self._origin[axis]) / self._cell_size,
+                                (p2[axis] - self._origin[axis]) / self._cell_size))
+            lines = np.arange(max(math.ceil(low), 0), min(math.floor(high), self._shape[axis]) + 1)
+            params.append((self._origin[axis] + lines * self._cell_size - p1[axis]) / delta[axis])
+
+        params = np.sort(np.clip(np.concatenate(params), 0.0, 1.0))
+        params = np.concatenate((params, (params[:-1] + params[1:]) / 2)) # 各段中点及分段点本身（线段端点恰好落在网格边界上）
+        points = p1 + params[:, None] * delta
+
+        position = (points - self._origin) / self._cell_size
+        shape = np.array(self._shape)
+        inside = ((position >= -1e-9) & (position <= shape + 1e-9)).all(axis=1) # 恰好在网格外边界上的点归入边界单元
+        cells = np.clip(np.floor(position[inside]), 0, shape - 1).astype(np.intp)
+        return np.unique(cells[:, 1] * self._shape[0] + cells[:, 0])
+
+    def query_segment(self, p1: tuple[float, float], p2: tuple[float, float]) -> np.ndarray:
+        """可能与线段p1-p2相交的线段索引（升序，包围盒不相交的已排除）"""
+
+        if not len(self.starts):
+            return self._large
+
+        p1, p2 = np.asarray(p1, dtype=np.float64), np.asarray(p2, dtype=np.float64)
+        keys = self._cells_on_segment(p1, p2)
+
+        left = np.searchsorted(self._keys, keys, side="left")
+        right = np.searchsorted(self._keys, keys, side="right")
+        lengths = right - left
+        positions = np.repeat(left - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        candidates = np.unique(np.concatenate((self._segments[positions], self._large)))
+
+        pad = self._cell_size * 1e-9 # 与登记时一致，端点因浮点误差略微偏离时不被排除
+        lower, upper = np.minimum(p1, p2) - pad, np.maximum(p1, p2) + pad
+        starts, ends = self.starts[candidates], self.ends[candidates]
+        overlap = (np.minimum(starts, ends) <= upper).all(axis=1) & (np.maximum(starts, ends) >= lower).all(axis=1)
+        return candidates[overlap]
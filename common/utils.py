@@ -4,6 +4,8 @@ from PyQt5.QtGui import QColor, QGuiApplication
 from PyQt5.QtCore import QPointF
 import math
 
+from common import geometry
+
 
 class Utils:
 
@@ -84,32 +86,16 @@ class Utils:
         """
 
        
-        num_points = len(points)
-
-        if num_points < 2:
+        if len(points) < 2:
             return (-1, None)
 
-        def is_start_point(point: QPointF, threshold: float = 1e-6) -> bool:
-            """判断点是否为起点（增加浮点精度阈值）"""
-            dx = abs(point.x() - start_point.x())
-            dy = abs(point.y() - start_point.y())
-            return dx < threshold and dy < threshold
+        best_edge_idx, intersection = geometry.first_intersection(
+            geometry.to_array(points), (start_point.x(), start_point.y()), (end_point.x(), end_point.y()))
 
-        best_edge_idx = -1
-        intersection_point = None
-        
-        for j in range(num_points):
-            p1 = points[j]
-            p2 = points[(j + 1) % num_points]
-
-            current_intersection = Utils.line_intersection(p1, p2, start_point, end_point)
-            
-            if current_intersection is not None and not is_start_point(current_intersection):
-                best_edge_idx = j
-                intersection_point = current_intersection
-                break 
+        if best_edge_idx == -1:
+            return -1, None
 
-        return (best_edge_idx + 1) if best_edge_idx != -1 else -1, intersection_point
+        return best_edge_idx + 1, QPointF(*intersection)
 
     @staticmethod
     def get_closest_point_on_line_segment(point: QPointF, line_p1: QPointF, line_p2: QPointF) -> QPointF:
@@ -137,26 +123,8 @@ class Utils:
         if num_points < 2:
             return points[0] if num_points == 1 else point  # 无点返回原坐标，单点返回自身
 
-
-        min_dist = float("inf")
-        best_edge_idx = 0 
-
-        for j in range(num_points):
-            p1 = points[j]
-            p2 = points[(j + 1) % num_points]
-
-            dist = Utils.point_to_line_distance(point, p1, p2)
-            
-            if dist < min_dist:
-                min_dist = dist
-                best_edge_idx = j  # 关键修正：直接记录边的起始索引j
-
-        edge_p1 = points[best_edge_idx]
-        edge_p2 = points[(best_edge_idx + 1) % num_points]
-
-        
-        closest_point = Utils.get_closest_point_on_line_segment(point, edge_p1, edge_p2)
-        return best_edge_idx + 1,closest_point
+        best_edge_idx, _, closest_point = geometry.nearest_segment(geometry.to_array(points), point.x(), point.y())
+        return best_edge_idx + 1, QPointF(*closest_point)
 
 
 
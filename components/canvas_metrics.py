@@ -0,0 +1,123 @@
+# coding: utf-8
+import csv
+import time
+from collections import deque
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPainter, QColor, QFont
+
+from QtUniversalToolFrameWork.common.config import qconfig
+
+from common import config
+
+
+class CanvasMetrics:
+    """
+    画布性能统计：记录每帧的绘制耗时、绘制/裁剪的标注数、处理的顶点数、最近一次点击检测耗时和输入到绘制的延迟
+
+    开启后在画布左上角显示统计信息（HUD），最近FRAME_HISTORY帧可导出为CSV离线分析
+    """
+
+    FRAME_HISTORY = 1000 # 保留的帧数
+    CSV_FIELDS = ("timestamp", "paint_ms", "items_drawn", "items_culled", "vertices",
+                  "layer_rebuilt", "hit_test_ms", "input_latency_ms")
+
+    def __init__(self):
+        self._frames = deque(maxlen=self.FRAME_HISTORY)
+        self._enabled = qconfig.get(qconfig.canvasMetrics)
+
+        self._hit_test_ms = 0.0 # 最近一次mousePressEvent的点击检测耗时
+        self._hud_rect = QRectF() # 最近一次绘制的统计信息区域（屏幕坐标）
+        self._pending_input = None # 尚未绘制的最早一次鼠标移动事件的时间
+
+        qconfig.canvasMetrics.valueChanged.connect(self._set_enabled)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def hud_rect(self) -> QRectF:
+        """统计信息区域，局部重绘时需要一并重绘，否则显示的是旧数据"""
+        return self._hud_rect
+
+    def _set_enabled(self, enabled: bool):
+        self._enabled = enabled
+        self._pending_input = None
+
+    def record_input(self):
+        """鼠标移动事件到达，绘制完成时计算输入到绘制的延迟（同一帧内的多个事件按最早的计算）"""
+        if self._enabled and self._pending_input is None:
+            self._pending_input = time.perf_counter()
+
+    def record_hit_test(self, elapsed_ms: float):
+        self._hit_test_ms = elapsed_ms
+
+    def record_frame(self, paint_ms: float, draw_stats: tuple[int, int, int], layer_rebuilt: bool):
+        """
+        记录一帧
+
+        Args:
+            paint_ms: paintEvent耗时
+            draw_stats: (绘制的标注数, 被视口裁剪的标注数, 处理的顶点数)
+            layer_rebuilt: 本帧是否重绘了静态图层
+        """
+        if not self._enabled:
+            return
+
+        latency = 0.0
+        if self._pending_input is not None:
+            latency = (time.perf_counter() - self._pending_input) * 1000
+            self._pending_input = None
+
+        drawn, culled, vertices = draw_stats
+        self._frames.append((time.time(), paint_ms, drawn, culled, vertices, layer_rebuilt, self._hit_test_ms, latency))
+
+    def summary(self) -> dict:
+        """最近一帧及最近帧的平均绘制耗时"""
+
+        if not self._frames:
+            return {}
+
+        last = dict(zip(self.CSV_FIELDS, self._frames[-1]))
+        last["avg_paint_ms"] = sum(frame[1] for frame in self._frames) / len(self._frames)
+        return last
+
+    def dump_csv(self, path: str):
+        """把最近FRAME_HISTORY帧写入CSV文件"""
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_FIELDS)
+            writer.writerows(self._frames)
+
+    def draw_hud(self, painter: QPainter):
+        """在画布左上角绘制统计信息（painter为屏幕坐标）"""
+
+        stats = self.summary()
+        if not stats:
+            return
+
+        lines = [
+            f"paint      {stats['paint_ms']:6.2f} ms (avg {stats['avg_paint_ms']:.2f})",
+            f"items      {stats['items_drawn']} drawn / {stats['items_culled']} culled",
+            f"vertices   {stats['vertices']}{'  (layer rebuilt)' if stats['layer_rebuilt'] else ''}",
+            f"hit test   {stats['hit_test_ms']:6.2f} ms",
+            f"latency    {stats['input_latency_ms']:6.2f} ms",
+        ]
+
+        font = QFont("Consolas", 9)
+        painter.setFont(font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().horizontalAdvance(line) for line in lines) + 16
+        rect = QRectF(8, 8, width, line_height * len(lines) + 12)
+        self._hud_rect = rect
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 160))
+        painter.drawRoundedRect(rect, 4, 4)
+
+        painter.setPen(QColor(255, 255, 255))
+        for i, line in enumerate(lines):
+            painter.drawText(QRectF(rect.left() + 8, rect.top() + 6 + i * line_height, width, line_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, line)
@@ -1,12 +1,19 @@
 # coding: utf-8
 
-from PyQt5.QtGui import QPainter
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QPointF,pyqtSlot
+import time
+from PyQt5.QtGui import QPainter, QPixmap, QTransform
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QPointF, QRectF, QTimer, pyqtSlot
 
 from QtUniversalToolFrameWork.components.widgets.image_canvas import ImageCanvas
+from QtUniversalToolFrameWork.common.config import qconfig
 
 from common.case_label import cl
 from common.data_control_manager import dm
+from common.polygon_clip import polygon_clipper
+from common.message import message
+from components.render_quality import RenderQualityController
+from components.canvas_metrics import CanvasMetrics
+from common.signal_bus import signalBus
 
 class PolygonsDrawImageCanvas(ImageCanvas):
 
@@ -18,9 +25,29 @@ class PolygonsDrawImageCanvas(ImageCanvas):
         self._dragging_vertex = False
         self._dragging_data_item = False # 是否正在拖动DataItem
         self._drag_start_pos = QPointF() # 拖动开始位置
-        self._data_item_original_pos = [] # 每个DataItem的原始位置（QPointF列表）
+        self._data_item_original_pos = None # 拖动DataItem的原始位置（只读的 (N,2) 数组）
+
+        self._static_layer = None # 除当前选中项外所有标注项的离屏图层
+        self._static_layer_key = None # (视图变换, 控件尺寸, 设备像素比, dm.layer_key)
+        self._static_layer_fast = False # 静态图层是否按快速渲染绘制
+        self._static_layer_stats = (0, 0, 0) # 绘制静态图层时的(绘制数, 裁剪数, 顶点数)
+        self._static_layer_rebuilt = False # 本帧是否重绘了静态图层
+
+        self.metrics = CanvasMetrics()
+        signalBus.dumpCanvasMetrics.connect(self._dump_metrics)
+        qconfig.canvasMetrics.valueChanged.connect(lambda: self.update())
+
+        self._pending_move = None # 尚未应用的鼠标移动编辑：(处理函数, 点)，同一帧内只保留最新的位置
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.timeout.connect(self._apply_pending_move)
+
+        self.render_quality = RenderQualityController(self)
+        self.render_quality.settled.connect(self.update)
         
-        dm.update_data_item.connect(self.update)
+        dm.data_changed.connect(lambda ids, rect: self._update_region(rect))
+        dm.overlay_changed.connect(self._update_region)
+        dm.items_reset.connect(self.cancel_pending_move) # 切换图像、重置标注数据时丢弃尚未应用的编辑
         cl.update_label_changed.connect(self.update)
 
         self.setMouseTracking(False)
@@ -31,68 +58,117 @@ class PolygonsDrawImageCanvas(ImageCanvas):
 
     def _update_scale(self, scale: float):
         dm.scale = scale
+        self.render_quality.interaction()
 
     def paintEvent(self, event):
 
+        start = time.perf_counter()
+        fast = self.render_quality.fast
+
         super().paintEvent(event)
-        
+
+        transform = self._view_transform()
+        visible_rect = self._visible_image_rect(transform)
+
+        self._static_layer_rebuilt = False
+
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing, True)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
-        painter.setRenderHint(QPainter.TextAntialiasing, True)
-        painter.setRenderHint(QPainter.HighQualityAntialiasing, True)
-        
-        dm.draw(painter, self.offset,self._rotate_point)
+        painter.drawPixmap(0, 0, self._get_static_layer(transform, visible_rect))
+
+        self.render_quality.apply_hints(painter)
+        painter.setTransform(transform) # 标注在图像坐标下绘制，由QPainter完成旋转、缩放和平移
         
-        dm.temp_frame_draw(painter, self.offset,self._rotate_point)
+        active_stats = dm.draw_active_item(painter, visible_rect)
         
+        dm.temp_frame_draw(painter)
 
+        if self.metrics.enabled:
+            painter.resetTransform()
+            self.metrics.draw_hud(painter) # 显示的是上一帧的统计
 
-    def _rotate_point(self, point: QPointF) -> QPointF:
-        """对单个点应用旋转变换（围绕图片中心）"""
+        painter.end()
 
-        if self.original_pixmap_w_h is None:
-            return point
+        elapsed = (time.perf_counter() - start) * 1000
+        self.render_quality.record_frame(elapsed, fast)
+        self.metrics.record_frame(elapsed, tuple(a + b for a, b in zip(self._static_layer_stats, active_stats)),
+                                  self._static_layer_rebuilt)
 
-        if self.total_rotate_angle == 0:
-            return point
-        
-        if self.total_rotate_angle == 90:
-            new_x = self.original_pixmap_w_h.height() - point.y()
-            new_y = point.x()
-        elif self.total_rotate_angle == 180:
-            new_x = self.original_pixmap_w_h.width() - point.x()
-            new_y = self.original_pixmap_w_h.height() - point.y()
-        else:  # 270°顺时针
-            new_x = point.y()
-            new_y = self.original_pixmap_w_h.width() - point.x()
-        
-        return QPointF(new_x, new_y)
-     
-    def _rotate_point_back(self, point: QPointF) -> QPointF:
+    def _update_region(self, rect: QRectF):
+        """只重绘受影响的区域（图像坐标），外扩画笔线宽和顶点半径；空矩形时重绘整个画布"""
 
-        if self.original_pixmap_w_h is None:
-            return point
+        if rect.isNull():
+            self.update()
+            return
 
-        if self.total_rotate_angle == 0:
-            return point
-        
-        if self.total_rotate_angle == 90:
-            new_x = point.y()
-            new_y = self.original_pixmap_w_h.height() - point.x()
-        elif self.total_rotate_angle == 180:
-            new_x = self.original_pixmap_w_h.width() - point.x()
-            new_y = self.original_pixmap_w_h.height() - point.y()
-        else: 
-            new_x = self.original_pixmap_w_h.width() - point.y()
-            new_y = point.x()
-        
-        return QPointF(new_x, new_y)
-    
-    def _convert_to_original_coords(self, point: QPointF) -> QPointF:
-        return QPointF(
-            (point.x() - self.offset.x()) / self.scale,
-            (point.y() - self.offset.y()) / self.scale)
+        margin = 8
+        device_rect = self._view_transform().mapRect(rect).adjusted(-margin, -margin, margin, margin)
+        self.update(device_rect.toAlignedRect())
+
+        if self.metrics.enabled: # 统计信息每帧变化，与受影响的区域一起重绘
+            self.update(self.metrics.hud_rect.toAlignedRect())
+
+    def _dump_metrics(self, path: str):
+        try:
+            self.metrics.dump_csv(path)
+        except OSError as e:
+            message.show_error_message("错误", f"性能统计导出失败：{e}")
+            return
+        message.show_success_message("提示", "性能统计导出成功！")
+
+    def _visible_image_rect(self, transform: QTransform) -> QRectF:
+        """控件可见区域对应的图像坐标范围（外扩几个像素，避免裁掉边缘上的线宽和顶点）"""
+        margin = 8
+        inverted, _ = transform.inverted()
+        return inverted.mapRect(QRectF(self.rect()).adjusted(-margin, -margin, margin, margin))
+
+    def _get_static_layer(self, transform: QTransform, visible_rect: QRectF) -> QPixmap:
+        """静态图层：视图与标注均未变化时直接复用，拖动当前选中项时不会重绘其余标注项"""
+
+        dpr = self.devicePixelRatioF()
+        key = (transform, self.size(), dpr, dm.layer_key)
+        fast = self.render_quality.fast
+
+        # 视图与标注未变化时任何质量下都复用（如拖动当前选中项），只有快速绘制的图层在交互结束后按高质量重绘一次
+        if self._static_layer is not None and key == self._static_layer_key and (fast or not self._static_layer_fast):
+            return self._static_layer
+
+        layer = QPixmap(self.size() * dpr)
+        layer.setDevicePixelRatio(dpr)
+        layer.fill(Qt.transparent)
+
+        painter = QPainter(layer)
+        self.render_quality.apply_hints(painter)
+        painter.setTransform(transform)
+        self._static_layer_stats = dm.draw_static_layer(painter, visible_rect)
+        self._static_layer_rebuilt = True
+        painter.end()
+
+        self._static_layer = layer
+        self._static_layer_key = key
+        self._static_layer_fast = fast
+        return layer
+
+    def _view_transform(self) -> QTransform:
+        """图像坐标 -> 屏幕坐标的变换：围绕图片旋转，再缩放、平移"""
+
+        rotation = QTransform()
+
+        if self.original_pixmap_w_h is not None and self.total_rotate_angle != 0:
+            w, h = self.original_pixmap_w_h.width(), self.original_pixmap_w_h.height()
+
+            if self.total_rotate_angle == 90: # (x, y) -> (h - y, x)
+                rotation = QTransform(0, 1, -1, 0, h, 0)
+            elif self.total_rotate_angle == 180: # (x, y) -> (w - x, h - y)
+                rotation = QTransform(-1, 0, 0, -1, w, h)
+            else:  # 270°顺时针 (x, y) -> (y, w - x)
+                rotation = QTransform(0, -1, 1, 0, 0, w)
+
+        return rotation * QTransform.fromScale(self.scale, self.scale) * QTransform.fromTranslate(self.offset.x(), self.offset.y())
+
+    def _map_to_image(self, pos) -> QPointF:
+        """屏幕坐标 -> 图像坐标（视图变换的逆变换）"""
+        inverted, _ = self._view_transform().inverted()
+        return inverted.map(QPointF(pos))
 
     def _is_point_in_pixmap(self, point: QPointF) -> bool:
         """判断点是否在图片范围内"""
@@ -109,16 +185,14 @@ class PolygonsDrawImageCanvas(ImageCanvas):
         if not self.original_pixmap:
             return
 
-        current_point = event.pos()
-
-        original_point = self._convert_to_original_coords(current_point)
+        self._apply_pending_move()
 
-        rotated_point = self._rotate_point_back(original_point)
+        image_point = self._map_to_image(event.pos())
 
-        clamped_point = self._is_point_in_pixmap(rotated_point)
+        clamped_point = self._is_point_in_pixmap(image_point)
      
         if dm.creating_data_item and event.button() == Qt.LeftButton:
-            dm.add_create_vertex(rotated_point)
+            dm.add_create_vertex(image_point)
             return
 
         if dm.creating_vertex_pressed and event.button() == Qt.LeftButton:
@@ -127,25 +201,31 @@ class PolygonsDrawImageCanvas(ImageCanvas):
 
         if dm.creating_split_vertex and event.button() == Qt.LeftButton:
             dm.add_split_vertex(clamped_point)
+            if not dm.creating_split_vertex: # 分割完成
+                self.cancel_pending_move()
             return
 
         if event.button() == Qt.LeftButton:
 
+            hit_test_start = time.perf_counter()
+
             is_click,item_idx, vertex_idx = dm.check_vertex_click(clamped_point)
             if is_click:
+                self.metrics.record_hit_test((time.perf_counter() - hit_test_start) * 1000)
                 dm.current_item_index = item_idx
                 dm.current_point_index = vertex_idx
                 self._dragging_vertex = True 
-                self.update()
+                dm.begin_drag()
                 return
 
             is_click,item_idx = dm.check_frame_click(clamped_point)
+            self.metrics.record_hit_test((time.perf_counter() - hit_test_start) * 1000)
             if is_click:
                 dm.current_item_index = item_idx
                 self._dragging_data_item = True
+                dm.begin_drag()
                 self._drag_start_pos = clamped_point
-                self._data_item_original_pos = [QPointF(p.x(), p.y()) for p in dm.data_items[item_idx].points]
-                self.update()
+                self._data_item_original_pos = dm.data_items[item_idx].coords # 只读数组，拖动时整体替换，无需复制
                 return
             
             
@@ -158,22 +238,20 @@ class PolygonsDrawImageCanvas(ImageCanvas):
 
     def mouseMoveEvent(self, event):
 
+        self.render_quality.interaction() # 按下鼠标移动即平移或拖动，期间使用快速渲染
+        self.metrics.record_input()
     
-        current_point = event.pos()
-
-        original_point = self._convert_to_original_coords(current_point)
-
-        rotated_point = self._rotate_point_back(original_point)
+        image_point = self._map_to_image(event.pos())
 
-        clamped_point = self._is_point_in_pixmap(rotated_point)
+        clamped_point = self._is_point_in_pixmap(image_point)
 
 
         if self._dragging_vertex:
-            self._drag_vertex(clamped_point)
+            self._queue_move(self._drag_vertex, clamped_point)
             return
 
         if self._dragging_data_item:
-            self._drag_frame(rotated_point)
+            self._queue_move(self._drag_frame, image_point)
             return
 
 
@@ -181,46 +259,68 @@ class PolygonsDrawImageCanvas(ImageCanvas):
 
 
         if dm.creating_data_item:
-            dm.add_temp_frame_point(rotated_point)
+            self._queue_move(dm.add_temp_frame_point, image_point)
             return
         
         if dm.creating_split_vertex and dm.split_item_index != -1:
-            dm.add_temp_frame_point(rotated_point)
+            self._queue_move(dm.add_temp_frame_point, image_point)
             return
 
+    def _queue_move(self, handler, point: QPointF):
+        """合并鼠标移动编辑：每个显示帧最多更新一次模型，使用最新的位置（高回报率鼠标不会占满GUI线程）"""
+
+        self._pending_move = (handler, point)
+
+        if not self._move_timer.isActive():
+            self._move_timer.start(self._frame_interval())
+
+    def cancel_pending_move(self):
+        """丢弃尚未应用的鼠标移动编辑（创建、分割、拖动结束时调用，避免定时器在编辑结束后再应用）"""
+        self._move_timer.stop()
+        self._pending_move = None
+
+    def _apply_pending_move(self):
+        self._move_timer.stop()
+
+        if self._pending_move is None:
+            return
+
+        handler, point = self._pending_move
+        self._pending_move = None
+        handler(point)
+
+    def _frame_interval(self) -> int:
+        """显示器刷新间隔（ms）"""
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / refresh_rate)) if refresh_rate > 0 else 16
+
     def _drag_vertex(self, clamped_point):
 
-        dm.current_data_item.annotation.drag_vertex(dm.current_data_item, dm.current_point_index, clamped_point)
-        
-        dm.update_data_item.emit() 
+        dm.drag_current_vertex(clamped_point)
 
 
     def _drag_frame(self, clamped_point):
         """拖动整个多边形"""
 
-        item = dm.current_data_item
-        
         dx = clamped_point.x() - self._drag_start_pos.x()
         dy = clamped_point.y() - self._drag_start_pos.y()
-    
-        new_points = []
-        for point in self._data_item_original_pos:
-            new_x = point.x() + dx
-            new_y = point.y() + dy
 
-            clamped_point = self._is_point_in_pixmap(QPointF(new_x, new_y))
-            new_points.append(clamped_point)
+        w, h = self.original_pixmap_w_h.width(), self.original_pixmap_w_h.height()
+    
+        new_points = polygon_clipper.clamp_array(self._data_item_original_pos + (dx, dy), w, h) # 平移后限制在图片范围内（逐点限制，顶点数不变）
 
-        item.points = new_points
-        dm.update_data_item.emit() 
+        dm.move_current_item(new_points)
 
     def get_origin_image_size(self) -> QSize:
         return self.original_pixmap_w_h
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            self._apply_pending_move() # 先应用最后一次移动，再结束拖动并保存
             self._dragging_vertex = False
             self._dragging_data_item = False
+            dm.end_drag()
         super().mouseReleaseEvent(event)
 
 
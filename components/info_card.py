@@ -1,5 +1,4 @@
 # coding:utf-8
-from copy import deepcopy
 from PyQt5.QtCore import Qt,QRect,QRectF,QPoint,pyqtSignal
 from PyQt5.QtWidgets import QGroupBox, QWidget, QHBoxLayout, QVBoxLayout,QLineEdit
 from PyQt5.QtGui import QColor, QPainter, QBrush, QPainterPath,QPen
@@ -82,17 +81,85 @@ class CustomLineEdit(QLineEdit):
 
 
 
+class AttributeEditorGroup(QGroupBox):
+    """ 一组属性编辑器，按属性配置（schema）创建一次，切换标注项时只更新编辑器的值 """
+
+    def __init__(self, attr_items: list[dict], parent=None):
+        super().__init__("属性选项", parent)
+
+        self.setFont(getFont(13))
+
+        self._editors = [] # [(属性名, 属性类型, 编辑器)]
+
+        vBoxLayout = QVBoxLayout(self)
+        vBoxLayout.setSpacing(10)
+        vBoxLayout.setContentsMargins(20, 20, 20, 10)
+        vBoxLayout.setAlignment(Qt.AlignTop)
+
+        for attr in attr_items:
+            attr_layout = QHBoxLayout()
+            attr_layout.setSpacing(20)
+            attr_layout.setContentsMargins(0, 0, 0, 0)
+
+            attr_name = attr["attr_name"]
+            attr_name_label = CardLabel(attr_name, self)
+
+            if attr["attr_type"] == AttributeType.OPTION.value:
+                editor = InfoCardComboBox(self)
+                editor.addItems(attr["attr_value"])
+                editor.currentTextChanged.connect(lambda text, name=attr_name: dm.set_current_attribute(name, text))
+            else:
+                editor = CustomLineEdit(self)
+                editor.textChanged.connect(lambda text, name=attr_name: dm.set_current_attribute(name, text))
+
+            attr_name_label.setFixedSize(50, 27)
+            editor.setFixedSize(160, 27)
+
+            attr_layout.addWidget(attr_name_label, 0, Qt.AlignLeft)
+            attr_layout.addWidget(editor, 0, Qt.AlignLeft)
+            vBoxLayout.addLayout(attr_layout)
+
+            self._editors.append((attr_name, attr["attr_type"], editor))
+
+    @staticmethod
+    def schema_key(attr_items: list[dict]) -> tuple:
+        """属性配置的键，配置相同的标签共用同一组编辑器"""
+        return tuple((attr["attr_name"], attr["attr_type"], tuple(attr.get("attr_value", ()))) for attr in attr_items)
+
+    def bind(self, data_item: DataItemInfo):
+        """显示标注项的属性值，设置值时不触发修改"""
+
+        for attr_name, attr_type, editor in self._editors:
+
+            editor.blockSignals(True)
+
+            if attr_type == AttributeType.OPTION.value:
+                if data_item.is_attribute_exist(attr_name):
+                    editor.setCurrentText(data_item.get_attribute_value(attr_name))
+                else:
+                    editor.setCurrentIndex(0)
+                    dm.set_current_attribute(attr_name, editor.currentText()) # 未设置的选项属性使用第一个选项
+            else:
+                editor.setText(data_item.get_attribute_value(attr_name) or "")
+
+            editor.blockSignals(False)
+
+
 class InfoCardItem(QWidget):
+    """ 当前选中标注项的信息卡片：只创建一次，选中项改变时通过bind重新绑定 """
 
-    def __init__(self,data_item:DataItemInfo, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
 
-        self._data = deepcopy(data_item)
+        self._data = None
+        self._color = cl.get_color("default")
+        self._case_label = "default"
+        self._is_show = True
 
-        self._color = cl.get_color(self._data.caseLabel)
-        self._case_label = self._data.caseLabel if self._data.caseLabel in cl.get_all_labels() else "default"
+        self._attr_groups = {} # {属性配置键: AttributeEditorGroup}
+        self._attr_group = None # 当前显示的属性编辑器组
 
-        self._annotation_type = CardLabel(self._data.annotation_type.value.upper(), self)
+        self._annotation_type = CardLabel("", self)
         self._label_comboBox = InfoCardComboBox(self)
 
         self._personButton = TransparentToolButton(FluentIcon.ROBOT, self) 
@@ -102,7 +169,6 @@ class InfoCardItem(QWidget):
         self._delButton.setToolTip("删除标注框 [B]")
 
         self._label_comboBox.addItems(cl.get_all_labels())
-        self._label_comboBox.setCurrentText(self._case_label)
 
         cl.add_label_changed.connect(self._add_comboBox_item)
         cl.del_label_changed.connect(self._del_comboBox_item)
@@ -146,57 +212,71 @@ class InfoCardItem(QWidget):
         
         self.vBoxLayout.setSpacing(20)
 
+        self._adjustViewSize()
+        setShadowEffect(self,blurRadius=10, offset=(0, 2), color=QColor(0, 0, 0, 50))
+
+    def bind(self, data_item: DataItemInfo):
+        """绑定到新的标注项：只更新显示内容，复用已创建的控件"""
+
+        self._data = data_item
+        self._case_label = data_item.caseLabel if data_item.caseLabel in cl.get_all_labels() else "default"
+        self._color = cl.get_color(self._case_label)
+
+        self._annotation_type.setText(data_item.annotation_type.value.upper())
+
+        self._label_comboBox.blockSignals(True)
+        self._label_comboBox.setCurrentText(self._case_label)
+        self._label_comboBox.blockSignals(False)
+
+        self._show_attr_group(data_item)
+        self._update_show(self._case_label)
+        self.update()
+
+    def unbind(self):
+        self._data = None
+        self.hide()
+
+    def _show_attr_group(self, data_item: DataItemInfo):
+        """显示标签对应的属性编辑器组，属性配置相同的标签共用同一组"""
+
         attr_items = cattr.get_items(self._case_label)
+        group = None
 
         if attr_items:
-            self.attr_group = QGroupBox("属性选项", self)
-            self.attr_group.setFont(getFont(13))
-            attr_group_vBoxLayout = QVBoxLayout(self.attr_group)
-            attr_group_vBoxLayout.setSpacing(10)
-            attr_group_vBoxLayout.setContentsMargins(20, 20, 20, 10)
-            attr_group_vBoxLayout.setAlignment(Qt.AlignTop)
-            
-            for attr in attr_items:
-                attr_layout = QHBoxLayout()
-                attr_layout.setSpacing(20)
-                attr_layout.setContentsMargins(0, 0, 0, 0)
-                temp_attr_name = CardLabel(attr["attr_name"], self)
-
-                if attr["attr_type"] == AttributeType.OPTION.value:
-                    temp_attr_value = InfoCardComboBox(self)
-                    attr_name = attr["attr_name"]
-                    temp_attr_value.addItems(attr["attr_value"])
-
-                    if self._data.is_attribute_exist(attr_name):
-                        temp_attr_value.setCurrentText(self._data.get_attribute_value(attr_name))
-                    else:
-                        dm.set_current_attribute(attr_name, temp_attr_value.currentText())
-
-                    temp_attr_value.currentTextChanged.connect(
-                        lambda text, name=attr_name: dm.set_current_attribute(name, text)
-                    )
-                else:
-                    temp_attr_value = CustomLineEdit(self)
-                    attr_name = attr["attr_name"]
-                    if self._data.is_attribute_exist(attr_name):
-                        temp_attr_value.setText(self._data.get_attribute_value(attr_name))
+            key = AttributeEditorGroup.schema_key(attr_items)
+            group = self._attr_groups.get(key)
 
-                    temp_attr_value.textChanged.connect(
-                        lambda text, name=attr_name: dm.set_current_attribute(name, text)
-                    )
+            if group is None:
+                group = self._attr_groups[key] = AttributeEditorGroup(attr_items, self)
+                group.hide()
 
-                temp_attr_name.setFixedSize(50, 27)
-                temp_attr_value.setFixedSize(160, 27)
+            group.bind(data_item)
 
-                attr_layout.addWidget(temp_attr_name, 0, Qt.AlignLeft)
-                attr_layout.addWidget(temp_attr_value, 0, Qt.AlignLeft)
-                attr_group_vBoxLayout.addLayout(attr_layout)
+        if group is not self._attr_group:
 
-            self.vBoxLayout.addWidget(self.attr_group)
+            if self._attr_group is not None:
+                self.vBoxLayout.removeWidget(self._attr_group)
+                self._attr_group.hide()
 
-        self._adjustViewSize()
-        setShadowEffect(self,blurRadius=10, offset=(0, 2), color=QColor(0, 0, 0, 50))
+            if group is not None:
+                self.vBoxLayout.addWidget(group)
+                group.show()
+
+            self._attr_group = group
+            self._adjustViewSize()
+
+    def clear_attr_groups(self):
+        """属性配置改变后删除所有属性编辑器组，下次bind时按新配置创建"""
+
+        if self._attr_group is not None:
+            self.vBoxLayout.removeWidget(self._attr_group)
+            self._attr_group = None
+
+        for group in self._attr_groups.values():
+            group.deleteLater()
 
+        self._attr_groups.clear()
+        self._adjustViewSize()
         
     def _update_color(self, label: str):
         if label == self._case_label:
@@ -205,31 +285,31 @@ class InfoCardItem(QWidget):
 
     def _add_comboBox_item(self, label: str):
         
+        self._label_comboBox.blockSignals(True)
         self._label_comboBox.addItem(label)
+        self._label_comboBox.blockSignals(False)
 
-        if self._data.caseLabel == label:
-            self._set_case_label(label)
-            self._label_comboBox.setCurrentText(label)
+        if self._data is not None and self._data.caseLabel == label: # 标注项的标签此前未登记，登记后显示为该标签
+            self.bind(self._data)
         
     def _del_comboBox_item(self, label: str):
 
         index = self._label_comboBox.findText(label)
         if index != -1:
             
-            if self._case_label == label:
+            if self._case_label == label and self._data is not None:
                 self._set_case_label("default")
                 self._label_comboBox._set_temp_text("default")
 
+            self._label_comboBox.blockSignals(True)
             self._label_comboBox.removeItem(index)
+            self._label_comboBox.blockSignals(False)
 
 
     def _set_case_label(self, case_label: str):
 
         self._case_label = case_label if case_label in cl.get_all_labels() else "default"
 
-        if self._case_label != "default":
-            self._data.caseLabel = case_label
-
         self._color = cl.get_color(case_label)
         self._update_show(self._case_label)
         dm.item_label_changed(self._case_label)
@@ -241,7 +321,7 @@ class InfoCardItem(QWidget):
     def _update_show(self, label: str): 
         if label == self._case_label:
             self._is_show = cl.is_show(label)
-            self.setVisible(self._is_show)
+            self.setVisible(self._is_show and self._data is not None)
 
 
     def paintEvent(self, event):
@@ -272,11 +352,9 @@ class InfoCardInterface(ScrollArea):
 
         self.scrollWidget = QWidget(self)
 
-        dm.select_data_item.connect(self.show_item)
-
-    
+        dm.selection_changed.connect(self.show_item)
 
-        cattr.update_attr_changed.connect(lambda:self.show_item(dm.current_data_item))
+        cattr.update_attr_changed.connect(self._on_attr_changed)
 
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)  # 禁用水平滚动条
 
@@ -296,32 +374,25 @@ class InfoCardInterface(ScrollArea):
 
         self.scrollWidget.setObjectName('scrollWidget')
 
+        self._card = InfoCardItem(self.scrollWidget) # 唯一的信息卡片，选中项改变时重新绑定
+        self._card.hide()
+        self.vBoxLayout.addWidget(self._card)
+
         StyleSheet.ACCURACY_INTERFACE.apply(self)
     
 
     def show_item(self, data_item:DataItemInfo):
 
-        self.all_hide()
-
-        if data_item is None:
-            return
-        
-        if not cl.is_show(data_item.caseLabel):
+        if data_item is None or not cl.is_show(data_item.caseLabel):
+            self.all_hide()
             return
 
-        widget = InfoCardItem(data_item, self.scrollWidget)
+        self._card.bind(data_item)
+        self._card.show()
 
-        self.vBoxLayout.addWidget(widget)
+    def _on_attr_changed(self):
+        self._card.clear_attr_groups()
+        self.show_item(dm.current_data_item)
     
-   
     def all_hide(self):
-    
-        for i in reversed(range(self.vBoxLayout.count())): 
-            w = self.vBoxLayout.itemAt(i).widget()
-            
-            if isinstance(w, InfoCardItem):
-                w.hide() # 移除部件
-                w.deleteLater()
-            
-
- 
\ No newline at end of file
+        self._card.unbind()
@@ -0,0 +1,192 @@
+# coding:utf-8
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QItemSelectionModel
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListView, QAbstractItemView
+
+from QtUniversalToolFrameWork.components.widgets.combo_box import ComboBox
+
+from common.annotation import AnnotationType
+from common.case_label import cl
+from common.data_control_manager import dm, DataItemInfo
+
+
+class DataItemListModel(QAbstractListModel):
+    """ 当前图像所有标注项的列表模型，直接读取dm.data_items，按DataManager的插入/删除通知增量更新行 """
+
+    LabelRole = Qt.UserRole + 1
+    TypeRole = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._count = len(dm.data_items) # 模型当前的行数，只在begin/end通知之间修改
+
+        dm.items_inserted.connect(self._on_items_inserted)
+        dm.items_removed.connect(self._on_items_removed)
+        dm.items_reset.connect(self._on_items_reset)
+        dm.data_changed.connect(self._on_data_changed)
+        cl.color_label_changed.connect(lambda label: self._emit_all_changed())
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+
+        if not index.isValid() or index.row() >= len(dm.data_items):
+            return None
+
+        item = dm.data_items[index.row()]
+
+        if role == Qt.DisplayRole:
+            return f"{index.row() + 1:>5}   {item.annotation_type.value.upper():<8}{item.caseLabel}"
+        if role == Qt.DecorationRole:
+            return cl.get_color(item.caseLabel)
+        if role == self.LabelRole:
+            return item.caseLabel
+        if role == self.TypeRole:
+            return item.annotation_type
+
+        return None
+
+    def item(self, row: int) -> DataItemInfo:
+        return dm.data_items[row]
+
+    def _on_items_inserted(self, first: int, last: int):
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._count += last - first + 1
+        self.endInsertRows()
+
+    def _on_items_removed(self, first: int, last: int):
+        self.beginRemoveRows(QModelIndex(), first, last)
+        self._count -= last - first + 1
+        self.endRemoveRows()
+
+    def _on_items_reset(self):
+        self.beginResetModel()
+        self._count = len(dm.data_items)
+        self.endResetModel()
+
+    def _on_data_changed(self, item_ids: list, rect):
+        """标签等显示内容变化：通常只涉及当前选中项，只刷新该行"""
+
+        current = dm.current_data_item
+
+        if current is not None and item_ids == [current.id]:
+            index = self.index(dm.current_item_index)
+            self.dataChanged.emit(index, index)
+            return
+
+        self._emit_all_changed()
+
+    def _emit_all_changed(self):
+        if self._count:
+            self.dataChanged.emit(self.index(0), self.index(self._count - 1))
+
+
+class DataItemFilterProxyModel(QSortFilterProxyModel):
+    """ 按标签和标注类型过滤 """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._label = None # None表示不过滤
+        self._annotation_type = None
+
+    def set_label(self, label: str):
+        self._label = label
+        self.invalidateFilter()
+
+    def set_annotation_type(self, annotation_type: AnnotationType):
+        self._annotation_type = annotation_type
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+
+        if self._label is None and self._annotation_type is None:
+            return True
+
+        item = self.sourceModel().item(source_row)
+
+        if self._label is not None and item.caseLabel != self._label:
+            return False
+
+        return self._annotation_type is None or item.annotation_type == self._annotation_type
+
+
+class DataItemListInterface(QWidget):
+    """ 标注列表：浏览、筛选并选择当前图像的所有标注项，只为可见行创建绘制内容，万级标注项也能流畅滚动 """
+
+    ALL = "全部"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._model = DataItemListModel(self)
+        self._proxy = DataItemFilterProxyModel(self)
+        self._proxy.setSourceModel(self._model)
+
+        self._label_comboBox = ComboBox(self)
+        self._type_comboBox = ComboBox(self)
+        self._view = QListView(self)
+
+        self._init_ui()
+
+        self._label_comboBox.currentTextChanged.connect(self._on_label_filter_changed)
+        self._type_comboBox.currentTextChanged.connect(self._on_type_filter_changed)
+        self._view.clicked.connect(self._on_item_clicked)
+
+        cl.add_label_changed.connect(self._label_comboBox.addItem)
+        cl.del_label_changed.connect(self._on_label_removed)
+
+        dm.selection_changed.connect(self._on_selection_changed)
+
+    def _init_ui(self):
+
+        self._label_comboBox.addItems([self.ALL] + list(cl.get_all_labels()))
+        self._type_comboBox.addItems([self.ALL] + [t.value.upper() for t in AnnotationType])
+
+        self._view.setModel(self._proxy)
+        self._view.setUniformItemSizes(True) # 行高一致，滚动时无需逐行计算尺寸
+        self._view.setLayoutMode(QListView.Batched)
+        self._view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(10)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(self._label_comboBox, 1)
+        filter_layout.addWidget(self._type_comboBox, 1)
+
+        vBoxLayout = QVBoxLayout(self)
+        vBoxLayout.setSpacing(10)
+        vBoxLayout.setContentsMargins(0, 10, 0, 0)
+        vBoxLayout.addLayout(filter_layout)
+        vBoxLayout.addWidget(self._view)
+
+    def _on_label_filter_changed(self, text: str):
+        self._proxy.set_label(None if text == self.ALL else text)
+
+    def _on_type_filter_changed(self, text: str):
+        self._proxy.set_annotation_type(None if text == self.ALL else AnnotationType(text.lower()))
+
+    def _on_label_removed(self, label: str):
+        index = self._label_comboBox.findText(label)
+        if index != -1:
+            self._label_comboBox.removeItem(index)
+
+    def _on_item_clicked(self, index: QModelIndex):
+        dm.current_item_index = self._proxy.mapToSource(index).row()
+
+    def _on_selection_changed(self, data_item: DataItemInfo):
+        """画布上选中标注项时同步选中并滚动到对应行"""
+
+        if data_item is None:
+            self._view.clearSelection()
+            return
+
+        index = self._proxy.mapFromSource(self._model.index(dm.current_item_index))
+        if not index.isValid(): # 被筛选隐藏
+            self._view.clearSelection()
+            return
+
+        self._view.selectionModel().setCurrentIndex(index, QItemSelectionModel.ClearAndSelect)
+        self._view.scrollTo(index)
@@ -12,6 +12,7 @@ from QtUniversalToolFrameWork.components.window.stacked_widget import StackedWid
 from components.info_card import InfoCardInterface
 from components.label_card import LabelCardInterface
 from components.issue_card import IssueCardInterface
+from components.item_list import DataItemListInterface
 from common.data_structure import DataItemInfo
 
 
@@ -29,10 +30,12 @@ class PivotStacked(QWidget):
         self.annotationInterface = InfoCardInterface(self)
         self.labelInterface = LabelCardInterface(self)
         self.issueInterface = IssueCardInterface(self)
+        self.itemListInterface = DataItemListInterface(self)
 
         self.addSubInterface(self.annotationInterface, 'annotationInterface', '标注')
         self.addSubInterface(self.labelInterface, 'labelInterface', '标签')
         self.addSubInterface(self.issueInterface, 'issueInterface', '批注')
+        self.addSubInterface(self.itemListInterface, 'itemListInterface', '列表')
 
         self.stackedWidget.setCurrentWidget(self.annotationInterface) # 初始化时显示标注界面
 
@@ -0,0 +1,85 @@
+# coding: utf-8
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter
+
+from QtUniversalToolFrameWork.common.config import qconfig
+
+from common import config
+
+
+class RenderQualityController(QObject):
+    """
+    画布渲染质量控制器
+
+    平移、缩放、拖动期间使用快速的渲染选项（关闭抗锯齿、最近邻缩放），交互停止SETTLE_MS毫秒后
+    发出settled信号，由画布按高质量重绘一次；同时统计每帧耗时，供调优使用
+    """
+
+    settled = pyqtSignal() # 交互结束，需要高质量重绘
+
+    SETTLE_MS = 150 # 最后一次交互后多久恢复高质量渲染
+    FRAME_HISTORY = 240 # 保留的帧耗时数量
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._interacting = False
+        self._enabled = qconfig.get(qconfig.adaptiveQuality)
+
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(self.SETTLE_MS)
+        self._settle_timer.timeout.connect(self._on_settled)
+
+        self._frame_times = {True: deque(maxlen=self.FRAME_HISTORY), False: deque(maxlen=self.FRAME_HISTORY)} # {是否快速渲染: 帧耗时ms}
+
+        qconfig.adaptiveQuality.valueChanged.connect(self._set_enabled)
+
+    @property
+    def fast(self) -> bool:
+        """当前帧是否使用快速渲染"""
+        return self._enabled and self._interacting
+
+    def interaction(self):
+        """记录一次交互（平移、缩放、拖动），交互停止后恢复高质量渲染"""
+        self._interacting = True
+        self._settle_timer.start()
+
+    def _on_settled(self):
+        self._interacting = False
+        if self._enabled:
+            self.settled.emit()
+
+    def _set_enabled(self, enabled: bool):
+        self._enabled = enabled
+        self.settled.emit()
+
+    def apply_hints(self, painter: QPainter):
+        """按当前质量设置painter的渲染选项"""
+
+        high_quality = not self.fast
+
+        painter.setRenderHint(QPainter.Antialiasing, high_quality)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, high_quality)
+        painter.setRenderHint(QPainter.TextAntialiasing, high_quality)
+        painter.setRenderHint(QPainter.HighQualityAntialiasing, high_quality)
+
+    def record_frame(self, elapsed_ms: float, fast: bool):
+        self._frame_times[fast].append(elapsed_ms)
+
+    def get_metrics(self) -> dict:
+        """帧耗时统计：快速/高质量渲染各自的帧数、平均、P95和最大耗时（ms）"""
+
+        metrics = {"adaptive_quality": self._enabled}
+
+        for fast, name in ((True, "fast"), (False, "quality")):
+            times = sorted(self._frame_times[fast])
+            count = len(times)
+            metrics[f"{name}_frames"] = count
+            metrics[f"{name}_avg_ms"] = sum(times) / count if count else 0.0
+            metrics[f"{name}_p95_ms"] = times[min(count - 1, int(count * 0.95))] if count else 0.0
+            metrics[f"{name}_max_ms"] = times[-1] if count else 0.0
+
+        return metrics
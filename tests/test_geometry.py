@@ -0,0 +1,43 @@
+# coding:utf-8
+import numpy as np
+
+from common import geometry
+
+
+SQUARE = np.array([[0, 0], [4, 0], [4, 4], [0, 4]], dtype=np.float64)
+
+
+def test_intersect_segments_crossing():
+    starts, ends = np.array([[0.0, 0.0]]), np.array([[4.0, 4.0]])
+    mask, t, u = geometry.intersect_segments(starts, ends, (0, 4), (4, 0))
+
+    assert mask.tolist() == [True]
+    assert np.isclose(t[0], 0.5) and np.isclose(u[0], 0.5)
+
+
+def test_intersect_segments_collinear_overlap_is_not_a_crossing():
+    starts, ends = np.array([[0.0, 0.0]]), np.array([[4.0, 0.0]])
+    mask, _, _ = geometry.intersect_segments(starts, ends, (2, 0), (6, 0))
+
+    assert mask.tolist() == [False]
+
+
+def test_intersect_segments_shared_endpoint():
+    starts, ends = np.array([[0.0, 0.0]]), np.array([[4.0, 0.0]])
+    mask, t, u = geometry.intersect_segments(starts, ends, (4, 0), (4, 4))
+
+    assert mask.tolist() == [True]
+    assert np.isclose(t[0], 1.0) and np.isclose(u[0], 0.0)
+
+
+def test_contains_point():
+    assert geometry.contains_point(SQUARE, 2, 2)
+    assert not geometry.contains_point(SQUARE, 5, 2)
+    assert not geometry.contains_point(SQUARE, -1, -1)
+
+
+def test_contains_point_concave():
+    u_shape = np.array([[0, 0], [6, 0], [6, 6], [4, 6], [4, 2], [2, 2], [2, 6], [0, 6]], dtype=np.float64)
+
+    assert geometry.contains_point(u_shape, 1, 5)
+    assert not geometry.contains_point(u_shape, 3, 5) # 凹口内
@@ -0,0 +1,49 @@
+# coding:utf-8
+import numpy as np
+from PyQt5.QtCore import QPointF
+
+from common.annotation import AnnotationType
+from common.data_structure import DataItemInfo
+from common.polygon_clip import polygon_clipper
+from common.polygon_validity import polygon_validator
+
+
+def test_polygon_inside_is_returned_unchanged():
+    array = np.array([[10, 10], [20, 10], [20, 20]], dtype=np.float64)
+    array.flags.writeable = False # 与标注项中存储的坐标一致
+
+    assert polygon_clipper.clip_array(array, 100, 100) is array
+
+
+def test_partially_outside_polygon():
+    array = np.array([[-10, 0], [10, 0], [10, 10], [-10, 10]], dtype=np.float64)
+    clipped = polygon_clipper.clip_array(array, 100, 100)
+
+    assert clipped.min(axis=0).tolist() == [0, 0]
+    assert abs(polygon_validator.area(clipped)) == 100
+
+
+def test_polygon_fully_outside():
+    array = np.array([[-10, -10], [-5, -10], [-5, -5]], dtype=np.float64)
+
+    assert len(polygon_clipper.clip_array(array, 100, 100)) == 0
+    assert polygon_clipper.clip_coords([AnnotationType.POLYGON], [array], 100, 100) == [None]
+
+
+def test_bbox_fully_outside_is_degenerate():
+    bbox = np.array([[-10, -10], [-1, -1]], dtype=np.float64)
+
+    assert polygon_clipper.clip_coords([AnnotationType.BBOX], [bbox], 100, 100) == [None]
+
+
+def test_clip_items_reports_degenerate_items_without_modifying_them():
+    outside = DataItemInfo("0", "polygon", "a", [QPointF(-10, -10), QPointF(-5, -10), QPointF(-5, -5)])
+    crossing = DataItemInfo("1", "polygon", "a", [QPointF(-10, 0), QPointF(10, 0), QPointF(10, 10)])
+    coords = outside.origin_coords
+
+    changed, degenerate = polygon_clipper.clip_items([outside, crossing], 100, 100)
+
+    assert changed == [crossing]
+    assert degenerate == [outside]
+    assert outside.origin_coords is coords
+    assert crossing.origin_coords.min(axis=0).tolist() == [0, 0]
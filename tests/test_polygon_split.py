@@ -0,0 +1,50 @@
+# coding:utf-8
+import numpy as np
+
+from common.polygon_split import polygon_splitter
+from common.polygon_validity import polygon_validator
+
+
+SQUARE = np.array([[0, 0], [4, 0], [4, 4], [0, 4]], dtype=np.float64)
+
+
+def areas(pieces) -> list[float]:
+    return sorted(abs(polygon_validator.area(piece)) for piece in pieces)
+
+
+def test_straight_cut():
+    pieces = polygon_splitter.split(SQUARE, np.array([[2, -1], [2, 5]], dtype=np.float64))
+
+    assert areas(pieces) == [8, 8]
+    assert all(polygon_validator.check(piece).is_valid for piece in pieces)
+
+
+def test_cut_through_vertices():
+    pieces = polygon_splitter.split(SQUARE, np.array([[-1, -1], [5, 5]], dtype=np.float64))
+
+    assert areas(pieces) == [8, 8]
+    assert sorted(len(piece) for piece in pieces) == [3, 3]
+
+
+def test_polyline_cut_in_concave_polygon():
+    u_shape = np.array([[0, 0], [6, 0], [6, 6], [4, 6], [4, 2], [2, 2], [2, 6], [0, 6]], dtype=np.float64)
+    pieces = polygon_splitter.split(u_shape, np.array([[-1, 1], [3, 1], [3, -1]], dtype=np.float64))
+
+    assert pieces is not None
+    assert sum(areas(pieces)) == abs(polygon_validator.area(u_shape))
+
+
+def test_cut_outside_polygon():
+    assert polygon_splitter.split(SQUARE, np.array([[5, -1], [5, 5]], dtype=np.float64)) is None
+
+
+def test_cut_along_an_edge_is_rejected():
+    # 沿边界的分割线只能得到零面积的一块
+    assert polygon_splitter.split(SQUARE, np.array([[-1, 0], [5, 0]], dtype=np.float64)) is None
+
+
+def test_cut_doubling_back_is_rejected():
+    # 分割线在内部原路折回，其中一块在折回处形成折返顶点
+    cut = np.array([[2, -1], [2, 3], [2, 1], [5, 1]], dtype=np.float64)
+
+    assert polygon_splitter.split(SQUARE, cut) is None
@@ -0,0 +1,98 @@
+# coding:utf-8
+import itertools
+
+import numpy as np
+import pytest
+
+from common.annotation import AnnotationType
+from common.polygon_validity import ValidityIssue, _SweepStatus, polygon_validator
+
+
+def brute_force_intersects(array: np.ndarray) -> bool:
+    """逐对比较不相邻的边"""
+    count = len(array)
+    for i, j in itertools.combinations(range(count), 2):
+        if j - i == 1 or (i == 0 and j == count - 1):
+            continue
+        if polygon_validator._segments_intersect(array[i].tolist(), array[(i + 1) % count].tolist(),
+                                                 array[j].tolist(), array[(j + 1) % count].tolist()):
+            return True
+    return False
+
+
+def test_simple_polygon_is_valid():
+    square = np.array([[0, 0], [4, 0], [4, 4], [0, 4]], dtype=np.float64)
+    assert polygon_validator.check(square).is_valid
+
+
+def test_crossing_edges():
+    bowtie = np.array([[0, 0], [4, 4], [4, 0], [0, 4]], dtype=np.float64)
+    report = polygon_validator.check(bowtie)
+
+    assert ValidityIssue.SELF_INTERSECTION in report.issues
+    assert report.intersection == (0, 2)
+
+
+def test_collinear_overlap_of_non_adjacent_edges():
+    # 边(4,0)-(2,0)与底边(0,0)-(6,0)共线重叠，两条边不相邻
+    array = np.array([[0, 0], [6, 0], [6, 2], [4, 2], [4, 0], [2, 0], [2, 3], [0, 3]], dtype=np.float64)
+
+    assert polygon_validator.find_self_intersection(array) is not None
+
+
+def test_shared_vertex_between_non_adjacent_edges():
+    # 两个三角形在(2,2)处接触
+    array = np.array([[0, 0], [2, 2], [4, 0], [4, 4], [2, 2], [0, 4]], dtype=np.float64)
+
+    assert ValidityIssue.SELF_INTERSECTION in polygon_validator.check(array).issues
+
+
+def test_adjacent_edges_sharing_a_vertex_do_not_count():
+    triangle_fan = np.array([[0, 0], [4, 0], [4, 4], [2, 1], [0, 4]], dtype=np.float64)
+
+    assert polygon_validator.find_self_intersection(triangle_fan) is None
+
+
+def test_spike_and_duplicate():
+    array = np.array([[0, 0], [4, 0], [4, 0], [4, 4], [4, 6], [4, 4], [0, 4]], dtype=np.float64)
+    issues = polygon_validator.check(array).issues
+
+    assert ValidityIssue.DUPLICATE_VERTEX in issues
+    assert ValidityIssue.SPIKE in issues
+
+
+def test_repair_untangles_bowtie():
+    bowtie = np.array([[0, 0], [4, 4], [4, 0], [0, 4]], dtype=np.float64)
+    repaired, report = polygon_validator.repair(bowtie, AnnotationType.POLYGON, untangle=True)
+
+    assert report.is_valid
+    assert sorted(map(tuple, repaired.tolist())) == sorted(map(tuple, bowtie.tolist()))
+
+
+def test_repair_coords_keeps_items_below_minimum():
+    # 删除重复顶点后只剩2个顶点，不满足多边形要求，不修改
+    array = np.array([[0, 0], [0, 0], [4, 4]], dtype=np.float64)
+
+    assert polygon_validator.repair_coords(array, AnnotationType.POLYGON) is None
+
+
+@pytest.mark.parametrize("load", [1, _SweepStatus.LOAD])
+def test_sweep_matches_brute_force(monkeypatch, load):
+    monkeypatch.setattr(_SweepStatus, "LOAD", load) # LOAD为1时每次插入都会分块，覆盖跨块查找
+    rng = np.random.default_rng(0)
+
+    for trial in range(300):
+        count = int(rng.integers(4, 30))
+        angles = np.sort(rng.random(count) * 2 * np.pi)
+        radius = rng.random(count) * 5 + 5
+        array = np.round(np.column_stack((np.cos(angles) * radius, np.sin(angles) * radius)))
+
+        for _ in range(int(rng.integers(0, 3))): # 随机交换顶点产生自相交
+            i, j = rng.integers(0, count, 2)
+            array[[i, j]] = array[[j, i]]
+
+        array = polygon_validator.remove_duplicates(array)
+        if len(array) < 4 or polygon_validator.spike_mask(array).any():
+            continue
+
+        assert (polygon_validator.find_self_intersection(array) is not None) == brute_force_intersects(array), array.tolist()
@@ -2,13 +2,13 @@ import os
 from natsort import natsorted
 import shutil
 import threading
-import time
 from PyQt5.QtCore import Qt,pyqtSlot,QPoint,QThread,pyqtSignal,QUrl
-from PyQt5.QtGui import QFont,QPixmap,QDesktopServices
+from PyQt5.QtGui import QFont,QPixmap,QDesktopServices,QImageReader
 from PyQt5.QtWidgets import (QWidget, QPushButton, QFrame, QHBoxLayout, QVBoxLayout, 
                            QApplication, QFileDialog, QMessageBox,QTextBrowser,QDialog)
 
 from QtUniversalToolFrameWork.common.font import getFont
+from QtUniversalToolFrameWork.common.config import qconfig
 from QtUniversalToolFrameWork.common.cache import LRUCache
 from QtUniversalToolFrameWork.common.image_utils import ImageManager,get_image_paths
 from QtUniversalToolFrameWork.common.icon import Action,FluentIcon as FIF
@@ -29,6 +29,10 @@ from common.style_sheet import StyleSheet
 from common.utils import Utils
 from components.image_canvas import PolygonsDrawImageCanvas
 from common.data_structure import DataInfo,DataItemInfo,jsonFileManager
+from common.dataset_index import datasetIndex
+from common.annotation_prefetcher import AnnotationPrefetcher
+from common.polygon_validity import polygon_validator
+from common import config
 from common.annotation import AnnotationType,AnnotationFrameBase
 from common.key_manager import keyManager
 from common.data_control_manager import dm
@@ -129,31 +133,98 @@ class ClearAllItemsMessageBox(MessageBox):
 
 class DataLoadThread(QThread):
    
+    load_progress = pyqtSignal(int, int) # 加载进度信号，参数为已完成数、总数
     load_finished = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, json_path: callable):
         super().__init__()
+        self._json_path = json_path
         self._stop_event = threading.Event() # 用于停止线程的事件
 
     def run(self):
-        """子线程中执行耗时的数据加载"""
+        """子线程中并行解析所有标注文件，建立数据集索引"""
         try:
             
-            total_steps = 10 # 模拟加载步骤数
-            for i in range(total_steps):
-
-                if self._stop_event.is_set(): # 检查是否需要停止线程
-                    break
-                time.sleep(0.3) # 模拟耗时操作
-               
-            # 加载完成，发送数据
-            self.load_finished.emit()
+            completed = datasetIndex.build(self._json_path, self._stop_event, self.load_progress.emit)
+
+            if completed: # 被新的文件夹选择取消时不发送完成信号
+                self.load_finished.emit()
         except Exception as e:
             message.show_error_message("错误", str(e))
     
     def stop(self):
         self._stop_event.set()
 
+class DatasetCheckThread(QThread):
+    """ 后台检查数据集中所有标注的几何有效性 """
+
+    check_progress = pyqtSignal(int, int)
+    check_finished = pyqtSignal(dict) # {图像路径: [(标注项序号, 检查结果), ...]}
+
+    def __init__(self, image_paths: list[str], json_path: callable):
+        super().__init__()
+        self._image_paths = image_paths
+        self._json_path = json_path
+        self._stop_event = threading.Event()
+
+    def run(self):
+        result = polygon_validator.check_dataset(self._image_paths, self._json_path, self._stop_event, self.check_progress.emit)
+        if result is not None:
+            self.check_finished.emit(result)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class DatasetRepairThread(QThread):
+    """
+    后台修复数据集中有问题的标注（不包括当前正在编辑的图像）
+
+    修复期间界面打开某张图像前调用claim：等待该图像正在进行的修复保存完成后再加载，之后的修复跳过该图像，
+    DataManager与修复线程不会同时修改同一个标注文件
+    """
+
+    repair_progress = pyqtSignal(int, int)
+    repair_finished = pyqtSignal(int) # 修改过的图像数
+
+    def __init__(self, image_paths: list[str], json_path: callable):
+        super().__init__()
+        self._image_paths = image_paths
+        self._json_path = json_path
+        self._stop_event = threading.Event()
+
+        self._cond = threading.Condition()
+        self._claimed = set() # 修复期间被界面打开的图像
+        self._repairing = set() # 正在修复的图像
+
+    def run(self):
+        count = polygon_validator.repair_dataset(self._image_paths, self._json_path, lambda path: QImageReader(path).size(),
+                                                 self._stop_event, self.repair_progress.emit, self._acquire, self._release)
+        if count is not None:
+            self.repair_finished.emit(count)
+
+    def claim(self, image_path: str):
+        """界面打开图像前调用（界面线程）"""
+        with self._cond:
+            self._claimed.add(image_path)
+            self._cond.wait_for(lambda: image_path not in self._repairing)
+
+    def _acquire(self, image_path: str) -> bool:
+        with self._cond:
+            if image_path in self._claimed:
+                return False
+            self._repairing.add(image_path)
+            return True
+
+    def _release(self, image_path: str):
+        with self._cond:
+            self._repairing.discard(image_path)
+            self._cond.notify_all()
+
+    def stop(self):
+        self._stop_event.set()
+
+
 class AccuracyInterface(QWidget):
     """OCR精度调整工具模块，用于调整OCR识别区域的多边形标注"""
 
@@ -168,6 +239,7 @@ class AccuracyInterface(QWidget):
         self._progress_widget = ImageProgressWidget(self)
 
         self._image_manager = ImageManager(self,self.CACHE_CAPACITY)
+        self._annotation_prefetcher = AnnotationPrefetcher(self.json_path) # 与图像缓存配合，按浏览方向预取标注
         
         self._image_canvas = PolygonsDrawImageCanvas(self)
         self._image_name_label = CommandBarLabel(self)
@@ -191,6 +263,8 @@ class AccuracyInterface(QWidget):
 
         self._current_dir = ""
         self._load_thread = None
+        self._validity_thread = None # 数据集检查/修复线程
+        self._validity_tooltip = None
 
         self.helpButton.clicked.connect(self._help_message_box.show)
         self.sourceButton.clicked.connect(lambda: QDesktopServices.openUrl(QUrl(self.EXAMPLE_URL)))
@@ -204,7 +278,8 @@ class AccuracyInterface(QWidget):
         self._image_manager.item_inserted.connect(self._set_progress_range)
         self._image_manager.model_reset.connect(self._set_progress_range)
 
-        dm.update_data_item.connect(self._save_annotations)
+        dm.data_changed.connect(self._on_data_changed)
+        dm.drag_finished.connect(self._save_annotations)
 
         keyManager.N.connect(self._on_n_pressed)
         keyManager.S.connect(self._on_s_pressed)
@@ -215,6 +290,7 @@ class AccuracyInterface(QWidget):
 
         signalBus.annotationTypeChanged.connect(self._annotation_type_changed)
         signalBus.splitPolygonFunction.connect(self._on_s_pressed)
+        signalBus.checkDatasetValidity.connect(self._on_check_dataset)
         
         self._clear_all_items_message_box.yesSignal.connect(self._clear_all_items)
 
@@ -327,27 +403,38 @@ class AccuracyInterface(QWidget):
         )
 
         if folder:
+
+            if self._load_thread and self._load_thread.isRunning(): # 取消上一个文件夹的加载
+                self._load_thread.stop()
+                self._load_thread.wait()
+
+            self._stop_validity_thread()
+
             self.stateTooltip = None
             self._current_dir = folder
             image_paths = get_image_paths(self._current_dir)
+            self._annotation_prefetcher.cancel()
             self._image_manager.set_items(image_paths)
+            datasetIndex.reset(self._image_manager.items)
 
             self.stateTooltip = StateToolTip("标注数据加载", "请耐心等待...", self.window())
             self.stateTooltip.move(self.stateTooltip.getSuitablePos())
             self.stateTooltip.show()
 
-            if self._load_thread and self._load_thread.isRunning():
-                self._load_thread.stop()
-                self._load_thread.wait()
-
-            self._load_thread = DataLoadThread()
+            self._load_thread = DataLoadThread(self.json_path)
+            self._load_thread.load_progress.connect(self._on_load_label_progress)
             self._load_thread.load_finished.connect(self._on_load_label_finished)
 
             self._load_thread.start()
 
+    def _on_load_label_progress(self, done: int, total: int):
+        if self.stateTooltip:
+            self.stateTooltip.setContent(f"正在解析标注文件 {done}/{total}")
+
     def _on_load_label_finished(self):
         if self.stateTooltip:
-            self.stateTooltip.setContent("标注数据已加载完成！" + ' 😆')
+            stats = datasetIndex.stats()
+            self.stateTooltip.setContent(f"标注数据已加载完成！共{stats['annotated_images']}张已标注图像，{stats['items']}个标注框" + ' 😆')
             self.stateTooltip.setState(True)
             self.stateTooltip = None
 
@@ -356,9 +443,11 @@ class AccuracyInterface(QWidget):
     def _display_current_image(self, pixmap: QPixmap):
         if not pixmap:
             return
+        self._image_canvas.cancel_pending_move()
         self._image_canvas.load_pixmap(pixmap)
         self._image_name_label.setText(self._image_manager.current_item)
         self._load_annotations()
+        self._annotation_prefetcher.request(self._image_manager.items, self._image_manager.current_index)
 
     def _on_show_annotations_toggled(self):
 
@@ -376,6 +465,9 @@ class AccuracyInterface(QWidget):
 
         json_path = self.json_path(self._image_manager.current_item)
 
+        if isinstance(self._validity_thread, DatasetRepairThread) and self._validity_thread.isRunning():
+            self._validity_thread.claim(self._image_manager.current_item)
+
         try:
             di = jsonFileManager.load_json(json_path)
             if di is None:
@@ -390,25 +482,159 @@ class AccuracyInterface(QWidget):
 
         self._on_show_annotations_toggled()
 
+    def _on_data_changed(self, item_ids: list, rect):
+        if dm.dragging: # 拖动期间不保存，松开鼠标时统一保存
+            return
+        self._save_annotations()
+
     def _save_annotations(self):
         
         name = self._image_manager.current_item
+        json_path = self.json_path(name)
+
+        self._validate_annotations()
+
+        if not jsonFileManager.is_modified(json_path, dm.data_info): # 仅选中状态等界面变化，无需保存
+            return
+
         dm.data_info.file_name = os.path.basename(name)
         dm.data_info.label = ""
         dm.data_info.issues = []
 
         try:
-            jsonFileManager.save_json(self.json_path(name), dm.data_info)
+            jsonFileManager.save_json(json_path, dm.data_info)
         except Exception as e:
             message.show_error_message("错误","标签文件保存失败！")
             return
 
+        datasetIndex.update(name, dm.data_info)
+
+    def _validate_annotations(self):
+        """保存前检查修改过的标注项，按设置自动修复，修复后的数据通过data_changed再次触发保存"""
+
+        repaired, invalid = dm.validate_items(qconfig.get(qconfig.autoRepairPolygons))
+
+        if repaired:
+            message.show_info_message("标注检查", f"已自动修复{len(repaired)}个标注框")
+
+        if invalid:
+            item, report = invalid[0]
+            message.show_error_message("标注检查", f"{len(invalid)}个标注框存在问题：第{dm.data_items.index(item) + 1}个{report}")
+
+    def stop_background_jobs(self):
+        """
+        关闭窗口前调用（之后不能再使用）：停止并等待所有后台线程，保证jsonFileManager.exit_handler落盘时
+        不再有线程读写标注缓存；已开始的修复在保存完成后才返回，正在建立的数据集索引等待已开始的解析结束
+        """
+        self._stop_validity_thread()
+
+        if self._load_thread and self._load_thread.isRunning():
+            self._load_thread.stop()
+            self._load_thread.wait() # datasetIndex.build退出时会等待其线程池中已开始的任务
+
+        self._annotation_prefetcher.stop()
+
+    def _stop_validity_thread(self):
+        if self._validity_thread and self._validity_thread.isRunning():
+            self._validity_thread.stop()
+            self._validity_thread.wait()
+
+        if self._validity_tooltip:
+            self._validity_tooltip.close()
+            self._validity_tooltip = None
+
+    def _show_validity_tooltip(self, title: str):
+        self._validity_tooltip = StateToolTip(title, "请耐心等待...", self.window())
+        self._validity_tooltip.move(self._validity_tooltip.getSuitablePos())
+        self._validity_tooltip.show()
+
+    def _on_validity_progress(self, done: int, total: int):
+        if self._validity_tooltip:
+            self._validity_tooltip.setContent(f"{done}/{total}")
+
+    def _finish_validity_tooltip(self, content: str):
+        if self._validity_tooltip:
+            self._validity_tooltip.setContent(content)
+            self._validity_tooltip.setState(True)
+            self._validity_tooltip = None
+
+    def _on_check_dataset(self):
+
+        if not self._image_manager.items:
+            message.show_error_message("错误", "请先加载图像文件夹！")
+            return
+
+        if self._validity_thread and self._validity_thread.isRunning():
+            return
+
+        if dm.data_info is not None:
+            self._save_annotations() # 当前图像的修改先写入缓存，检查读取的是最新数据
+
+        self._show_validity_tooltip("标注检查")
+
+        self._validity_thread = DatasetCheckThread(list(self._image_manager.items), self.json_path)
+        self._validity_thread.check_progress.connect(self._on_validity_progress)
+        self._validity_thread.check_finished.connect(self._on_check_dataset_finished)
+        self._validity_thread.start()
+
+    def _on_check_dataset_finished(self, result: dict):
+
+        item_count = sum(len(reports) for reports in result.values())
+
+        if not result:
+            self._finish_validity_tooltip("所有标注均有效 😆")
+            return
+
+        self._finish_validity_tooltip(f"{len(result)}张图像中共{item_count}个标注框存在问题")
+
+        lines = []
+        for image_path, reports in sorted(result.items()):
+            for index, report in reports:
+                lines.append(f"{os.path.basename(image_path)}  第{index + 1}个标注框：{report}")
+
+        MAX_LINES = 15
+        content = "\n".join(lines[:MAX_LINES]) + (f"\n……共{len(lines)}项" if len(lines) > MAX_LINES else "")
+
+        w = MessageBox("标注检查", content, self.window())
+        w.yesButton.setText("自动修复")
+        w.cancelButton.setText("取消")
+        if w.exec():
+            self._repair_dataset(list(result.keys()))
+
+    def _repair_dataset(self, image_paths: list[str]):
+        """修复有问题的图像：当前图像的数据由DataManager持有，在界面线程修复，其余图像在后台修复"""
+
+        current = self._image_manager.current_item
+
+        if current in image_paths:
+            image_paths.remove(current)
+            dm.validate_items(repair=True, force=True, untangle=True)
+            _, removed = dm.clip_items(self._image_canvas.get_origin_image_size())
+            if removed:
+                message.show_info_message("标注检查", f"删除了{len(removed)}个完全在图像外的标注框")
+
+        if not image_paths:
+            message.show_success_message("标注检查", "修复完成")
+            return
+
+        self._show_validity_tooltip("标注修复")
+
+        self._validity_thread = DatasetRepairThread(image_paths, self.json_path)
+        self._validity_thread.repair_progress.connect(self._on_validity_progress)
+        self._validity_thread.repair_finished.connect(
+            lambda count: self._finish_validity_tooltip(f"已修复{count}张图像的标注 😆"))
+        self._validity_thread.start()
+
     @pyqtSlot(str)
     def _on_search_signal(self, search_text: str):
         if search_text:
-            try:
-                image_index = self._image_manager.items.index(os.path.join(self._current_dir, search_text))    
-            except ValueError:
+
+            image_index = datasetIndex.position(os.path.join(self._current_dir, search_text))
+
+            if image_index == -1: # 不是图像名称时，按标签、属性或批注在索引中查找下一张图像
+                image_index = datasetIndex.find_next(search_text, self._image_manager.current_index + 1)
+
+            if image_index == -1:
                 message.show_error_message("错误", f"未找到图像 {search_text}")
                 return
                 
@@ -434,6 +660,7 @@ class AccuracyInterface(QWidget):
             if os.path.exists(json_path):
                 shutil.move(json_path, os.path.join(delete_path, image_name.split('.')[0] + '.json'))
 
+            datasetIndex.remove(self._image_manager.current_item)
             self._image_manager.delete_current()
 
             message.show_success_message("提示",f"图像 {image_name} 删除成功！")
@@ -446,6 +673,8 @@ class AccuracyInterface(QWidget):
         image_name = os.path.basename(self._image_manager.current_item)
         dm.data_info = DataInfo(file_name=image_name, items=[])
         dm.init_vars()
+        dm.init_data_items()
+        self._save_annotations() # init_vars只通知界面刷新，不会触发保存
 
 
     def _on_space_pressed(self, pressed):
@@ -477,6 +706,7 @@ class AccuracyInterface(QWidget):
         if pressed:
             if dm.creating_data_item:
 
+                self._image_canvas.cancel_pending_move()
                 self._image_canvas.setMouseTracking(False)
                 self._image_canvas.setCursor(Qt.ArrowCursor)
                 dm.finish_create(self._image_canvas.get_origin_image_size())
@@ -487,6 +717,7 @@ class AccuracyInterface(QWidget):
                 self._image_canvas.setCursor(Qt.BlankCursor) # 隐藏鼠标光标
                 
         elif dm.creating_data_item:
+            self._image_canvas.cancel_pending_move()
             dm.creating_data_item = False
             dm.annotion_frame = None
             self._image_canvas.setMouseTracking(False)
@@ -495,6 +726,8 @@ class AccuracyInterface(QWidget):
             
     def _on_s_pressed(self, pressed):
 
+        self._image_canvas.cancel_pending_move()
+
         if pressed:
             dm.creating_split_vertex = True
             dm.split_item_index = -1
@@ -59,6 +59,7 @@ class mWindow(MainWindow):
 
     
     def closeEvent(self, e):
+        self.accuracy_interface.stop_background_jobs() # 先停止后台线程（修复、预取、索引），保证其读写在exit_handler之前完成
         jsonFileManager.exit_handler()
         super().closeEvent(e)
 
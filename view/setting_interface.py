@@ -4,10 +4,14 @@ from PyQt5.QtWidgets import QWidget, QLabel, QFileDialog
 
 from QtUniversalToolFrameWork.common.config import qconfig
 from QtUniversalToolFrameWork.view.setting_interface import SettingInterface, SettingCardGroup
+from QtUniversalToolFrameWork.components.settings.setting_card import SwitchSettingCard, PushSettingCard
+from QtUniversalToolFrameWork.common.icon import FluentIcon
 
 from components.attr_setting import AttributeListSettingCard
 from components.label_setting import LabelListSettingCard
 from common.case_label import cl    
+from common import config
+from common.signal_bus import signalBus
 
 
 class SetInterface(SettingInterface):
@@ -29,6 +33,50 @@ class SetInterface(SettingInterface):
                 parent=self.labelGroup
             )
 
+            self.canvasGroup = SettingCardGroup("画布", self.scrollWidget)
+
+            self.adaptiveQualityCard = SwitchSettingCard(
+                FluentIcon.SPEED_HIGH,
+                "自适应渲染质量",
+                "平移、缩放、拖动标注时降低渲染质量以保持流畅，停止操作后恢复高质量",
+                qconfig.adaptiveQuality,
+                parent=self.canvasGroup
+            )
+
+            self.canvasMetricsCard = SwitchSettingCard(
+                FluentIcon.INFO,
+                "性能统计",
+                "在画布左上角显示绘制耗时、绘制/裁剪的标注数、点击检测耗时和输入延迟",
+                qconfig.canvasMetrics,
+                parent=self.canvasGroup
+            )
+
+            self.dumpMetricsCard = PushSettingCard(
+                "导出",
+                FluentIcon.SAVE,
+                "导出性能统计",
+                "将最近记录的每帧统计数据导出为CSV文件",
+                parent=self.canvasGroup
+            )
+
+            self.validityGroup = SettingCardGroup("标注检查", self.scrollWidget)
+
+            self.autoRepairCard = SwitchSettingCard(
+                FluentIcon.CHECKBOX,
+                "保存时自动修复",
+                "保存前检查修改过的标注，自动删除重复顶点、折返顶点，自相交只提示不修改",
+                qconfig.autoRepairPolygons,
+                parent=self.validityGroup
+            )
+
+            self.checkDatasetCard = PushSettingCard(
+                "检查",
+                FluentIcon.SEARCH,
+                "检查数据集",
+                "检查当前文件夹所有标注的重复顶点、折返顶点、自相交和零面积问题，并可一键修复",
+                parent=self.validityGroup
+            )
+
         def _initLayout(self):
             
             self.post_init()
@@ -39,6 +87,11 @@ class SetInterface(SettingInterface):
             # 将卡片添加到对应设置组
             self.labelGroup.addSettingCard(self.labelCard)
             self.labelGroup.addSettingCard(self.attrCard)
+            self.canvasGroup.addSettingCard(self.adaptiveQualityCard)
+            self.canvasGroup.addSettingCard(self.canvasMetricsCard)
+            self.canvasGroup.addSettingCard(self.dumpMetricsCard)
+            self.validityGroup.addSettingCard(self.autoRepairCard)
+            self.validityGroup.addSettingCard(self.checkDatasetCard)
             self.personalGroup.addSettingCard(self.themeCard)
             self.personalGroup.addSettingCard(self.themeColorCard) 
             self.personalGroup.addSettingCard(self.zoomCard)
@@ -49,6 +102,8 @@ class SetInterface(SettingInterface):
             self.expandLayout.setContentsMargins(36, 10, 36, 0)
             #self.expandLayout.addWidget(self.pathGroup)
             self.expandLayout.addWidget(self.labelGroup)
+            self.expandLayout.addWidget(self.canvasGroup)
+            self.expandLayout.addWidget(self.validityGroup)
             self.expandLayout.addWidget(self.personalGroup)
             self.expandLayout.addWidget(self.aboutGroup)        
 
@@ -56,6 +111,14 @@ class SetInterface(SettingInterface):
         def _connectSignalToSlot(self):
             """ 连接信号与槽函数：建立UI交互与业务逻辑的关联 """
             super()._connectSignalToSlot()
+
+            self.dumpMetricsCard.clicked.connect(self._on_dump_metrics_clicked)
+            self.checkDatasetCard.clicked.connect(signalBus.checkDatasetValidity)
+
+        def _on_dump_metrics_clicked(self):
+            path, _ = QFileDialog.getSaveFileName(self, "导出性能统计", "canvas_metrics.csv", "CSV (*.csv)")
+            if path:
+                signalBus.dumpCanvasMetrics.emit(path)
             
 
     